@@ -0,0 +1,74 @@
+import pathlib
+import sys
+
+import click
+import pandas as pd
+
+from benchmark.suite import (
+    WORKLOADS_PATH,
+    TracerPaths,
+    run_benchmarks,
+    tracer_configurations,
+    write_results,
+)
+from benchmark.workloads import WORKLOADS
+
+
+@click.command(name="benchmark", help="Benchmark the overhead of the tracers on synthetic workloads")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+    help="Path to the JSON file the results are stored in",
+    required=True,
+)
+@click.option(
+    "-w",
+    "--workload",
+    "workloads",
+    type=click.Choice(list(WORKLOADS)),
+    multiple=True,
+    help="Workload to run, may be given multiple times. Runs all workloads if omitted",
+)
+@click.option(
+    "-t",
+    "--tracer",
+    "tracers",
+    type=click.Choice(list(tracer_configurations())),
+    multiple=True,
+    help="Tracer configuration to run the workloads with, may be given multiple times. Uses all configurations if omitted",
+)
+@click.option(
+    "-r",
+    "--repetitions",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Amount of times each execution time is measured, of which the fastest is reported",
+)
+def main(**params):
+    output: pathlib.Path = params["output"]
+    workloads = {
+        name: workload
+        for name, workload in WORKLOADS.items()
+        if not params["workloads"] or name in params["workloads"]
+    }
+    configurations = {
+        name: factory
+        for name, factory in tracer_configurations().items()
+        if not params["tracers"] or name in params["tracers"]
+    }
+    paths = TracerPaths(
+        proj_path=WORKLOADS_PATH,
+        stdlib_path=pathlib.Path(pathlib.__file__).parent,
+        venv_path=pathlib.Path(sys.prefix),
+    )
+
+    results = run_benchmarks(workloads, configurations, paths, params["repetitions"])
+
+    with pd.option_context("display.max_rows", None, "display.width", None):
+        print(pd.DataFrame(results).to_string(index=False))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_results(output, results, params["repetitions"])
+    print(f"Stored results in {output}")
@@ -0,0 +1,252 @@
+import dataclasses
+import datetime
+import functools
+import json
+import os
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from common.compact_schema import CompactTraceDataSchema
+from tracing.sink import TraceDataFileSink
+from tracing.tracer import NoOperationTracer, Tracer, TracerBase
+
+import benchmark.workloads
+
+UNTRACED = "untraced"
+"""Name under which the workloads' results without any tracer are reported"""
+
+WORKLOADS_PATH = pathlib.Path(benchmark.workloads.__file__).parent
+"""The directory of the workloads, which is the project traced by the tracers"""
+
+
+@dataclasses.dataclass(frozen=True)
+class TracerPaths:
+    """The paths every tracer is constructed with"""
+
+    proj_path: pathlib.Path
+    stdlib_path: pathlib.Path
+    venv_path: pathlib.Path
+
+
+TracerFactory = typing.Callable[[TracerPaths, pathlib.Path], TracerBase]
+"""Creates a tracer from the paths to trace, and a scratch directory for the files the tracer writes"""
+
+
+def _file_sink_tracer(paths: TracerPaths, scratch: pathlib.Path) -> TracerBase:
+    fd, path = tempfile.mkstemp(suffix=".parquet", dir=scratch)
+    os.close(fd)
+    sink = TraceDataFileSink(pathlib.Path(path))
+    return Tracer(paths.proj_path, paths.stdlib_path, paths.venv_path, sink=sink)
+
+
+def tracer_configurations() -> dict[str, TracerFactory]:
+    """
+    :returns: Every tracer configuration available on the running interpreter, mapped to its name
+    """
+    configurations: dict[str, TracerFactory] = {
+        NoOperationTracer.__name__: lambda paths, _: NoOperationTracer(
+            paths.proj_path, paths.stdlib_path, paths.venv_path
+        ),
+        Tracer.__name__: lambda paths, _: Tracer(
+            paths.proj_path, paths.stdlib_path, paths.venv_path
+        ),
+        f"{Tracer.__name__}[apply_opts]": lambda paths, _: Tracer(
+            paths.proj_path, paths.stdlib_path, paths.venv_path, apply_opts=True
+        ),
+        f"{Tracer.__name__}[compact_schema]": lambda paths, _: Tracer(
+            paths.proj_path,
+            paths.stdlib_path,
+            paths.venv_path,
+            compact_schema=CompactTraceDataSchema(),
+        ),
+        f"{Tracer.__name__}[sink]": _file_sink_tracer,
+    }
+
+    if sys.version_info >= (3, 12):
+        from tracing.monitoring import MonitoringTracer
+
+        configurations[MonitoringTracer.__name__] = lambda paths, _: MonitoringTracer(
+            paths.proj_path, paths.stdlib_path, paths.venv_path
+        )
+        configurations[f"{MonitoringTracer.__name__}[apply_opts]"] = lambda paths, _: MonitoringTracer(
+            paths.proj_path, paths.stdlib_path, paths.venv_path, apply_opts=True
+        )
+
+    return configurations
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkResult:
+    """The measurements of one workload, run by one tracer configuration"""
+
+    workload: str
+    """The name of the workload"""
+
+    tracer: str
+    """The name of the tracer configuration, or `UNTRACED`"""
+
+    events: int
+    """The amount of events `sys.settrace` emits for the workload, independent of the tracer configuration"""
+
+    seconds: float
+    """The fastest execution time of the workload, including starting and stopping the trace"""
+
+    overhead_per_event_ns: float
+    """The time added to the untraced execution time, per event"""
+
+    rows: int
+    """The amount of rows of trace data produced"""
+
+    peak_memory_bytes: int
+    """The peak of the memory allocated while tracing the workload, as measured by `tracemalloc`"""
+
+
+def count_events(workload: typing.Callable[[], None]) -> int:
+    """
+    Count the events emitted by `sys.settrace` while running the workload.
+    The count serves as the common denominator of the overhead of all tracer configurations,
+    as some of them disable events that do not need to be traced.
+
+    :param workload: The workload to run
+    :returns: The amount of call, line, return and exception events emitted
+    """
+    events = 0
+
+    def count(frame, event, arg: typing.Any) -> typing.Callable:
+        nonlocal events
+        events += 1
+        return count
+
+    old_trace = sys.gettrace()
+    sys.settrace(count)
+    try:
+        workload()
+    finally:
+        sys.settrace(old_trace)
+    return events
+
+
+def _rows(tracer: TracerBase) -> int:
+    if isinstance(tracer.sink, TraceDataFileSink):
+        tracer.sink.close()
+        return tracer.sink.rows_written
+    return len(tracer.trace_data)
+
+
+def _run_untraced(workload: typing.Callable[[], None]) -> float:
+    start = time.perf_counter()
+    workload()
+    return time.perf_counter() - start
+
+
+def _run_traced(
+    workload: typing.Callable[[], None],
+    create_tracer: typing.Callable[[], TracerBase],
+) -> tuple[float, int]:
+    tracer = create_tracer()
+    start = time.perf_counter()
+    with tracer.active_trace():
+        workload()
+    seconds = time.perf_counter() - start
+    return seconds, _rows(tracer)
+
+
+def _peak_memory(run: typing.Callable[[], typing.Any]) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(
+    workloads: dict[str, typing.Callable[[], None]],
+    configurations: dict[str, TracerFactory],
+    paths: TracerPaths,
+    repetitions: int,
+) -> list[BenchmarkResult]:
+    """
+    Run each workload untraced, and traced by each tracer configuration.
+    Every execution gets a fresh tracer, which is created outside of the measured time.
+    Execution times are measured `repetitions` times, of which the fastest is reported;
+    the peak memory is measured in a separate execution, as `tracemalloc` slows down the execution considerably.
+
+    :param workloads: The workloads to run, mapped to their names
+    :param configurations: The tracer configurations to run the workloads with, mapped to their names
+    :param paths: The paths the tracers are constructed with
+    :param repetitions: The amount of times the execution time of each workload is measured per configuration
+    :returns: The results of each workload, untraced and traced by each configuration, in that order
+    """
+    results: list[BenchmarkResult] = list()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch_path = pathlib.Path(scratch)
+
+        for workload_name, workload in workloads.items():
+            # Warm up, e.g. to fill caches of the interpreter
+            workload()
+            events = count_events(workload)
+
+            untraced_seconds = min(
+                _run_untraced(workload) for _ in range(repetitions)
+            )
+            results.append(
+                BenchmarkResult(
+                    workload=workload_name,
+                    tracer=UNTRACED,
+                    events=events,
+                    seconds=untraced_seconds,
+                    overhead_per_event_ns=0.0,
+                    rows=0,
+                    peak_memory_bytes=_peak_memory(workload),
+                )
+            )
+
+            for tracer_name, factory in configurations.items():
+                create_tracer = functools.partial(factory, paths, scratch_path)
+
+                measurements = [_run_traced(workload, create_tracer) for _ in range(repetitions)]
+                seconds = min(seconds for seconds, _ in measurements)
+                _, rows = measurements[-1]
+
+                results.append(
+                    BenchmarkResult(
+                        workload=workload_name,
+                        tracer=tracer_name,
+                        events=events,
+                        seconds=seconds,
+                        overhead_per_event_ns=(seconds - untraced_seconds) / max(events, 1) * 1e9,
+                        rows=rows,
+                        peak_memory_bytes=_peak_memory(lambda: _run_traced(workload, create_tracer)),
+                    )
+                )
+
+    return results
+
+
+def write_results(path: pathlib.Path, results: list[BenchmarkResult], repetitions: int) -> None:
+    """
+    Store the results as JSON, together with a description of the environment they were measured in,
+    so that results of different revisions can be compared.
+
+    :param path: Path to the JSON file; it is created, or overwritten if it exists
+    :param results: The results of `run_benchmarks`
+    :param repetitions: The amount of repetitions `run_benchmarks` was run with
+    """
+    document = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "repetitions": repetitions,
+        "results": [dataclasses.asdict(result) for result in results],
+    }
+    with path.open("w") as file:
+        json.dump(document, file, indent=2)
@@ -0,0 +1,24 @@
+"""
+Synthetic workloads of distinct shapes, that stress different parts of the tracers.
+Each workload is a module of its own, as the tracers handle global variables per file.
+"""
+import typing
+
+from benchmark.workloads import (
+    classes,
+    generators,
+    large_globals,
+    loops,
+    many_locals,
+    recursion,
+)
+
+WORKLOADS: dict[str, typing.Callable[[], None]] = {
+    "deep_recursion": recursion.run,
+    "tight_loops": loops.run,
+    "many_locals": many_locals.run,
+    "large_globals": large_globals.run,
+    "class_heavy": classes.run,
+    "generators": generators.run,
+}
+"""Maps the name of each workload to the function that runs it"""
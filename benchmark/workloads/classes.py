@@ -0,0 +1,57 @@
+INSTANCES = 40
+
+
+class Shape:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def area(self) -> float:
+        return 0.0
+
+    def describe(self) -> str:
+        return f"{self.name}: {self.area()}"
+
+
+class Rectangle(Shape):
+    def __init__(self, width: float, height: float) -> None:
+        super().__init__("rectangle")
+        self.width = width
+        self.height = height
+
+    def area(self) -> float:
+        return self.width * self.height
+
+
+class Square(Rectangle):
+    def __init__(self, side: float) -> None:
+        super().__init__(side, side)
+        self.name = "square"
+
+
+class Circle(Shape):
+    def __init__(self, radius: float) -> None:
+        super().__init__("circle")
+        self.radius = radius
+
+    def area(self) -> float:
+        return 3.14159 * self.radius * self.radius
+
+    @property
+    def diameter(self) -> float:
+        return 2 * self.radius
+
+    @classmethod
+    def unit(cls) -> "Circle":
+        return cls(1.0)
+
+
+def run() -> None:
+    shapes: list[Shape] = []
+    for i in range(INSTANCES):
+        shapes.append(Rectangle(i, i + 1))
+        shapes.append(Square(i))
+        circle = Circle(i) if i % 2 else Circle.unit()
+        shapes.append(circle)
+        circle.diameter
+    for shape in shapes:
+        shape.describe()
@@ -0,0 +1,24 @@
+ITEMS = 300
+
+
+def numbers(amount: int):
+    for i in range(amount):
+        yield i
+
+
+def evens(values):
+    for value in values:
+        if value % 2 == 0:
+            yield value
+
+
+def labelled(values):
+    for value in values:
+        label = str(value)
+        yield label, value
+
+
+def run() -> None:
+    for label, value in labelled(evens(numbers(ITEMS))):
+        pass
+    list(value * 2 for value in range(ITEMS))
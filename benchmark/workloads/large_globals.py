@@ -0,0 +1,17 @@
+# Module-level variables are compared on every return from and line of this module's functions
+for _index in range(1_000):
+    globals()[f"constant_{_index}"] = _index
+
+counter = 0
+label = ""
+
+
+def bump(amount: int) -> None:
+    global counter, label
+    counter += amount
+    label = str(counter)
+
+
+def run() -> None:
+    for amount in range(200):
+        bump(amount)
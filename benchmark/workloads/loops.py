@@ -0,0 +1,9 @@
+ITERATIONS = 2_000
+
+
+def run() -> None:
+    total = 0
+    for i in range(ITERATIONS):
+        total += i * 2
+    while total > 0:
+        total //= 3
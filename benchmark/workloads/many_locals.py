@@ -0,0 +1,40 @@
+CALLS = 50
+
+
+def assign(seed: int) -> int:
+    a0 = seed
+    a1 = a0 + 1
+    a2 = float(a1)
+    a3 = str(a2)
+    a4 = [a0, a1]
+    a5 = (a3, a4)
+    a6 = {a3: a0}
+    a7 = a1 * 2
+    a8 = a2 / 2
+    a9 = a3 + "!"
+    b0 = a7 - a0
+    b1 = b0 > a1
+    b2 = b1 or a7
+    b3 = a4 + [b0]
+    b4 = len(b3)
+    b5 = {b4, a0}
+    b6 = a6.get(a3)
+    b7 = a9.upper()
+    b8 = b7 * 2
+    b9 = (b8, b6)
+    c0 = a8 + b4
+    c1 = int(c0)
+    c2 = c1 % 7
+    c3 = [c2] * 3
+    c4 = sum(c3)
+    c5 = c4 + b0
+    c6 = str(c5)
+    c7 = c6 + a9
+    c8 = len(c7)
+    c9 = c8 + len(b5) + len(a5) + len(b9) + int(b2)
+    return c9
+
+
+def run() -> None:
+    for seed in range(CALLS):
+        assign(seed)
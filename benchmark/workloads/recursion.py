@@ -0,0 +1,12 @@
+DEPTH = 250
+
+
+def descend(depth: int) -> int:
+    if depth == 0:
+        return 0
+    return descend(depth - 1) + 1
+
+
+def run() -> None:
+    for _ in range(2):
+        descend(DEPTH)
@@ -2,6 +2,8 @@ from .ptconfig import load_config, write_config
 from .resolver import Resolver
 from .data_file_collector import DataFileCollector
 from .trace_data_category import TraceDataCategory
+from .trace_data_file import read_trace_data
+from .compact_schema import CompactTraceDataSchema
 
 __all__ = [
     load_config.__name__,
@@ -9,4 +11,6 @@ __all__ = [
     Resolver.__name__,
     DataFileCollector.__name__,
     TraceDataCategory.__name__,
+    read_trace_data.__name__,
+    CompactTraceDataSchema.__name__,
 ]
@@ -0,0 +1,91 @@
+import typing
+
+import pandas as pd
+
+from constants import Schema
+
+
+STRING_COLUMNS: list[str] = [
+    column for column, dtype in Schema.TraceData.items() if isinstance(dtype, pd.StringDtype)
+]
+"""The columns of `Schema.TraceData` that hold strings, which compact trace data stores as categoricals"""
+
+
+def is_compact(trace_data: pd.DataFrame) -> bool:
+    """
+    :param trace_data: Trace data with the columns of `Schema.TraceData`
+    :returns: Whether the string columns of the trace data are stored as categoricals, see `CompactTraceDataSchema`
+    """
+    return all(isinstance(trace_data[column].dtype, pd.CategoricalDtype) for column in STRING_COLUMNS)
+
+
+class CompactTraceDataSchema:
+    """
+    Opt-in alternative to `Schema.TraceData`, that stores the string columns of trace data as categoricals.
+
+    The values of these columns repeat heavily, e.g. every row of a function holds the same file, class and function name.
+    As categoricals, each distinct value is stored once and every row only holds an integer code,
+    which shrinks trace data considerably and speeds up grouping by these columns.
+
+    The categories are shared by all trace data encoded by the same instance, and grow whenever new values are encountered.
+    Categories are only ever appended, so trace data that has been encoded before is cheaply brought up to date,
+    and trace data encoded by the same instance is concatenated without losing its categorical dtypes, see `concat`.
+    """
+
+    def __init__(self):
+        self._categories: dict[str, pd.Index] = {
+            column: pd.Index([], dtype=object) for column in STRING_COLUMNS
+        }
+
+    @property
+    def dtypes(self) -> dict[str, typing.Any]:
+        """The dtypes of compact trace data, given the categories encountered so far"""
+        return {
+            column: pd.CategoricalDtype(self._categories[column]) if column in self._categories else dtype
+            for column, dtype in Schema.TraceData.items()
+        }
+
+    def empty(self) -> pd.DataFrame:
+        """
+        :returns: Compact trace data without any rows
+        """
+        return pd.DataFrame(columns=list(Schema.TraceData.keys())).astype(self.dtypes)
+
+    def encode(self, trace_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert trace data into compact trace data, adding its values to the shared categories.
+
+        :param trace_data: Trace data adhering to `Schema.TraceData`, or compact trace data
+        :returns: The trace data, with its string columns stored as categoricals of the shared categories
+        """
+        for column in STRING_COLUMNS:
+            values = trace_data[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                encountered = values.cat.categories
+            else:
+                encountered = pd.Index(values.dropna().unique())
+            self._add_categories(column, encountered.astype(object))
+
+        return trace_data.astype(self.dtypes)
+
+    def concat(self, trace_data: typing.Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Encode and concatenate trace data.
+
+        :param trace_data: Trace data adhering to `Schema.TraceData`, or compact trace data
+        :returns: The concatenated compact trace data
+        """
+        encoded = [self.encode(frame) for frame in trace_data]
+        if not encoded:
+            return self.empty()
+
+        # Trace data encoded before the categories last grew lacks the newest categories
+        dtypes = self.dtypes
+        return pd.concat([frame.astype(dtypes) for frame in encoded], ignore_index=True, sort=False)
+
+    def _add_categories(self, column: str, encountered: pd.Index) -> None:
+        known = self._categories[column]
+        unknown = encountered[~encountered.isin(known)]
+        if len(unknown):
+            self._categories[column] = known.append(unknown)
+
@@ -1,41 +1,117 @@
+import concurrent.futures
+import functools
+import math
 import typing
 import pathlib
 from abc import ABC, abstractmethod
 import logging
 
+import constants
+
 logger = logging.getLogger(__name__)
 
 
 class DataFileCollector(ABC):
     """Collects data files in a given path."""
 
-    def __init__(self, file_pattern: str):
+    def __init__(self, file_pattern: str, jobs: int = 1, use_processes: bool = False):
         """Creates an instance of DataFileCollector.
-        :param file_pattern: The file pattern of the data files to be collected."""
+        :param file_pattern: The file pattern of the data files to be collected.
+        :param jobs: The amount of workers that load files concurrently.
+        :param use_processes: Whether the workers are processes instead of threads."""
         self.file_pattern = file_pattern
+        self.jobs = jobs
+        self.use_processes = use_processes
         self.collected_data: list[typing.Any] = list()
 
+    def __getstate__(self) -> dict[str, typing.Any]:
+        # Workers only load files, so do not send them what has been collected so far
+        state = self.__dict__.copy()
+        state["collected_data"] = list()
+        return state
+
     def collect_data(
         self, path: pathlib.Path, include_also_files_in_subdirectories: bool = True
     ) -> None:
         """Collects the data in a given path.
-        :param path: The path of the folder containing the files. 
+        :param path: The path of the folder containing the files.
         :param include_also_files_in_subdirectories: Whether the data files in the subfolders should also be collected."""
         self.collected_data.clear()
+        file_paths = self._find_data_files(path, include_also_files_in_subdirectories)
+        self.collected_data.extend(self._load_files(file_paths))
+
+    def _find_data_files(
+        self, path: pathlib.Path, include_also_files_in_subdirectories: bool
+    ) -> list[pathlib.Path]:
+        """Finds the data files in a given path.
+        :param path: The path of the folder containing the files.
+        :param include_also_files_in_subdirectories: Whether the data files in the subfolders should also be found.
+        :returns: The paths of the data files, sorted."""
         if include_also_files_in_subdirectories:
             potential_trace_data_file_paths = path.rglob(self.file_pattern)
         else:
             potential_trace_data_file_paths = path.glob(self.file_pattern)
 
         # Ensures that the order is deterministic.
-        sorted_potential_trace_data_file_paths = sorted(potential_trace_data_file_paths)
-        for potential_trace_data_file_path in sorted_potential_trace_data_file_paths:
+        return sorted(potential_trace_data_file_paths)
+
+    def _load_files(
+        self, file_paths: list[pathlib.Path], combine: bool = True
+    ) -> list[typing.Any]:
+        """Loads the given files, concurrently if multiple jobs have been requested.
+        :param file_paths: The paths of the files to load.
+        :param combine: Whether the data of each batch of files is combined by `_combine_batch`.
+        :returns: The loaded data in the order of the given paths; if not combined, as pairs of each valid file's path and its data."""
+        if not file_paths:
+            return list()
+
+        if self.jobs <= 1:
+            return self._load_batch(file_paths, combine)
+
+        # Give each worker a few batches, so that uneven file sizes even out
+        batch_size = min(
+            constants.DATA_FILE_BATCH_SIZE,
+            math.ceil(len(file_paths) / (self.jobs * 4)),
+        )
+        # Paths are sent as strings, which are cheaper to pickle for process workers
+        batches = [
+            list(map(str, file_paths[i : i + batch_size]))
+            for i in range(0, len(file_paths), batch_size)
+        ]
+
+        executor_type: (
+            type[concurrent.futures.ProcessPoolExecutor]
+            | type[concurrent.futures.ThreadPoolExecutor]
+        ) = (
+            concurrent.futures.ProcessPoolExecutor
+            if self.use_processes
+            else concurrent.futures.ThreadPoolExecutor
+        )
+        loaded: list[typing.Any] = list()
+        with executor_type(max_workers=self.jobs) as executor:
+            # map preserves the order of the batches
+            for batch in executor.map(
+                functools.partial(self._load_batch, combine=combine), batches
+            ):
+                loaded.extend(batch)
+        return loaded
+
+    def _load_batch(
+        self, file_paths: typing.Sequence[str | pathlib.Path], combine: bool = True
+    ) -> list[typing.Any]:
+        """Loads the given files, skipping those that are invalid or cannot be loaded.
+        Executed by the workers when loading concurrently.
+        :param file_paths: The paths of the files to load.
+        :param combine: Whether the loaded data is combined by `_combine_batch`.
+        :returns: The loaded data; if not combined, as pairs of each valid file's path and its data."""
+        loaded: list[tuple[str, typing.Any]] = list()
+        for potential_trace_data_file_path in file_paths:
             try:
                 potential_data = self._on_potential_file_path_found(
-                    potential_trace_data_file_path
+                    pathlib.Path(potential_trace_data_file_path)
                 )
                 if potential_data is not None:
-                    self.collected_data.append(potential_data)
+                    loaded.append((str(potential_trace_data_file_path), potential_data))
             except Exception as exception:
                 print(exception)
                 logger.error(
@@ -44,6 +120,16 @@ class DataFileCollector(ABC):
                 logger.error(exception)
                 continue
 
+        if not combine:
+            return loaded
+        return self._combine_batch([data for _, data in loaded])
+
+    def _combine_batch(self, loaded: list[typing.Any]) -> list[typing.Any]:
+        """Combines the data loaded from a batch of files, before it is added to the collected data.
+        :param loaded: The data of each valid file in the batch, in order.
+        :returns: The data to add to the collected data."""
+        return loaded
+
     @abstractmethod
     def _on_potential_file_path_found(self, file_path: pathlib.Path) -> typing.Any:
         pass
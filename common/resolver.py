@@ -1,12 +1,16 @@
-from dataclasses import dataclass
+import collections
+from dataclasses import dataclass, field
 import functools
 import importlib.util
 from importlib.machinery import SourceFileLoader
+import json
 import logging
 import os
 import pathlib
 import sys
 from types import ModuleType, NoneType
+import typing
+import weakref
 
 import pandas as pd
 
@@ -23,9 +27,18 @@ def _attempt_module_lookup(
         if spec is not None:
             module = importlib.util.module_from_spec(spec)
 
+            # The module must be registered while it executes, e.g. for dataclasses;
+            # afterwards, restore whatever module was registered under the same name before,
+            # so that importing it regularly still yields the original module
+            previous = sys.modules.get(module_name)
             sys.modules[module_name] = module
-            loader.exec_module(module)
-            del sys.modules[module_name]
+            try:
+                loader.exec_module(module)
+            finally:
+                if previous is not None:
+                    sys.modules[module_name] = previous
+                else:
+                    sys.modules.pop(module_name, None)
 
             logger.debug(f"Imported {module_name} from {str(root / lookup_path)}")
             return module
@@ -36,6 +49,81 @@ def _attempt_module_lookup(
     return None
 
 
+class CacheInfo(typing.NamedTuple):
+    """Statistics of a `Resolver`'s type cache, modelled after `functools.lru_cache`"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _WeakTypeCache:
+    """
+    Bounded LRU mapping of types to the result of resolving them.
+    Types are only weakly referenced, so that dynamically created classes can still be collected.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: collections.OrderedDict[weakref.ref, tuple[str | None, str] | None] = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, ty: type) -> tuple[bool, tuple[str | None, str] | None]:
+        """Returns whether the type is cached, and if so, the cached result"""
+        try:
+            key = weakref.ref(ty)
+            result = self._entries[key]
+        except (KeyError, TypeError):
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, result
+
+    def store(self, ty: type, result: tuple[str | None, str] | None) -> None:
+        """Caches the result for the given type, evicting the least recently used entry when full"""
+        try:
+            key = weakref.ref(ty, self._on_collected)
+        except TypeError:
+            # Not weakly referenceable, do not cache
+            return
+
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _on_collected(self, key: weakref.ref) -> None:
+        self._entries.pop(key, None)
+
+
+class _MroEntry(typing.NamedTuple):
+    """The MRO of a type, and the state of the source files it was resolved from"""
+
+    mro: list[tuple[str | None, str]]
+    sources: dict[str, tuple[int, int]]
+
+    def is_current(self) -> bool:
+        """Whether none of the source files have changed since the MRO was resolved"""
+        for source, (size, mtime_ns) in self.sources.items():
+            try:
+                stat = os.stat(source)
+            except OSError:
+                return False
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                return False
+        return True
+
+
 @dataclass
 class Resolver:
     """
@@ -44,6 +132,9 @@ class Resolver:
     :param proj_path: Path to root directory containing the project's types
     :param stdlib_path: Path to standard library's directory of the Python binary, containing stdlib types
     :param venv_path: Path to project's virtual environment's directory containing third-party deps
+    :param cache_size: Maximum amount of types whose module and name are memoised by `get_module_and_name`
+    :param mro_cache_path: If given, the MROs resolved by `mro_lookup` are loaded from and saved to this file,
+        see `save_mro_cache`
 
     :raises ValueError: If any of the three specified paths is not a directory
     """
@@ -51,12 +142,38 @@ class Resolver:
     stdlib_path: pathlib.Path
     proj_path: pathlib.Path
     venv_path: pathlib.Path
+    cache_size: int = field(default=4096, repr=False, compare=False)
+    mro_cache_path: pathlib.Path | None = field(default=None, repr=False, compare=False)
+
+    _type_cache: _WeakTypeCache = field(init=False, repr=False, compare=False)
+    _module_cache: dict[str, ModuleType | None] = field(init=False, repr=False, compare=False)
+    _mro_cache: dict[tuple[str | None, str], _MroEntry] = field(init=False, repr=False, compare=False)
+    _mro_cache_changed: bool = field(init=False, repr=False, compare=False)
+
+    _MRO_CACHE_VERSION = 1
 
     def __post_init__(self):
         for path in (self.stdlib_path, self.proj_path, self.venv_path):
             if not path.is_dir():
                 raise ValueError(f"{path} is not a directory; Please check your config file")
 
+        self._type_cache = _WeakTypeCache(maxsize=self.cache_size)
+        self._module_cache = dict()
+        self._mro_cache = self._load_mro_cache()
+        self._mro_cache_changed = False
+
+    def cache_info(self) -> CacheInfo:
+        """Report how effective memoising `get_module_and_name` has been
+
+        :return: Hits, misses, maximum and current size of the type cache
+        """
+        return CacheInfo(
+            hits=self._type_cache.hits,
+            misses=self._type_cache.misses,
+            maxsize=self._type_cache.maxsize,
+            currsize=len(self._type_cache),
+        )
+
     @functools.cached_property
     def site_packages(self) -> pathlib.Path:
         major, minor = sys.version_info[:2]
@@ -87,26 +204,8 @@ class Resolver:
             return builtin_ty
 
         else:
-            # recreate filename
-            lookup_path = pathlib.Path(module_name.replace(".", os.path.sep) + ".py")
-
-            # 1. project path
-            # logger.debug(f"{(module_name, type_name)} as project path?")
-            module = _attempt_module_lookup(module_name, self.proj_path, lookup_path)
+            module = self._module_lookup(module_name)
             if module is None:
-                # 2. stdlib
-                # logger.debug(f"{(module_name, type_name)} as stdlib?")
-                module = _attempt_module_lookup(module_name, self.stdlib_path, lookup_path)
-
-            if module is None:
-                # 3. venv
-                # logger.debug(f"{(module_name, type_name)} as venv dep?")
-                module = _attempt_module_lookup(module_name, self.site_packages, lookup_path)
-
-            if module is None:
-                logger.warning(
-                    f"Failed to import {module_name} from {self.stdlib_path}, {self.venv_path}, {self.proj_path}"
-                )
                 return None
 
             # Resolve inner classes too!
@@ -114,17 +213,133 @@ class Resolver:
             variable_type: type = functools.reduce(getattr, type_name.split("."), module)  # type: ignore
             return variable_type
 
+    def mro_lookup(
+        self, module_name: str | None | pd._libs.missing.NAType, type_name: str
+    ) -> list[tuple[str | None, str]] | None:
+        """Resolve the MRO of a type given by its module path and qualified type name.
+        Results are memoised, and persisted if `mro_cache_path` is given;
+        persisted MROs are only reused as long as the source files they were resolved from are unchanged.
+
+        :param module_name: The module of the type e.g. pathlib
+        :param type_name: The fully qualified name of the type, e.g. Path
+        :return: The pairs of (module name, type name) of the type and its base types in method resolution order,
+            where module_name is None for builtins, if the type is found, else None
+        """
+        key = (module_name if isinstance(module_name, str) else None, type_name)
+
+        entry = self._mro_cache.get(key)
+        if entry is not None:
+            return entry.mro
+
+        variable_type = self.type_lookup(module_name, type_name)
+        if variable_type is None:
+            return None
+
+        mro: list[tuple[str | None, str]] = list()
+        sources: dict[str, tuple[int, int]] = dict()
+        for base in variable_type.mro():
+            mro.append((base.__module__ if base.__module__ != "builtins" else None, base.__name__))
+
+            module = self._module_cache.get(base.__module__) or sys.modules.get(base.__module__)
+            source = getattr(module, "__file__", None)
+            if source is not None and source not in sources:
+                stat = os.stat(source)
+                sources[source] = (stat.st_size, stat.st_mtime_ns)
+
+        self._mro_cache[key] = _MroEntry(mro=mro, sources=sources)
+        self._mro_cache_changed = True
+        return mro
+
+    def save_mro_cache(self) -> None:
+        """Persist the MROs resolved so far to `mro_cache_path`, if given and if any have been resolved"""
+        if self.mro_cache_path is None or not self._mro_cache_changed:
+            return
+
+        contents = {
+            "version": Resolver._MRO_CACHE_VERSION,
+            "entries": [
+                {"module": module_name, "type": type_name, "mro": entry.mro, "sources": entry.sources}
+                for (module_name, type_name), entry in self._mro_cache.items()
+            ],
+        }
+
+        self.mro_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = self.mro_cache_path.with_suffix(".partial")
+        partial_path.write_text(json.dumps(contents))
+        partial_path.replace(self.mro_cache_path)
+        self._mro_cache_changed = False
+
+    def _load_mro_cache(self) -> dict[tuple[str | None, str], _MroEntry]:
+        if self.mro_cache_path is None or not self.mro_cache_path.exists():
+            return dict()
+
+        try:
+            contents = json.loads(self.mro_cache_path.read_text())
+            if contents["version"] != Resolver._MRO_CACHE_VERSION:
+                return dict()
+
+            mro_cache = dict()
+            for item in contents["entries"]:
+                entry = _MroEntry(
+                    mro=[(module_name, type_name) for module_name, type_name in item["mro"]],
+                    sources={source: (size, mtime_ns) for source, (size, mtime_ns) in item["sources"].items()},
+                )
+                if entry.is_current():
+                    mro_cache[(item["module"], item["type"])] = entry
+            return mro_cache
+
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable MRO cache {self.mro_cache_path}: {e}")
+            return dict()
+
+    def _module_lookup(self, module_name: str) -> ModuleType | None:
+        # Importing executes the module's code, so every module is only imported once
+        if module_name in self._module_cache:
+            return self._module_cache[module_name]
+
+        # recreate filename
+        lookup_path = pathlib.Path(module_name.replace(".", os.path.sep) + ".py")
+
+        # 1. project path
+        # logger.debug(f"{module_name} as project path?")
+        module = _attempt_module_lookup(module_name, self.proj_path, lookup_path)
+        if module is None:
+            # 2. stdlib
+            # logger.debug(f"{module_name} as stdlib?")
+            module = _attempt_module_lookup(module_name, self.stdlib_path, lookup_path)
+
+        if module is None:
+            # 3. venv
+            # logger.debug(f"{module_name} as venv dep?")
+            module = _attempt_module_lookup(module_name, self.site_packages, lookup_path)
+
+        if module is None:
+            logger.warning(
+                f"Failed to import {module_name} from {self.stdlib_path}, {self.venv_path}, {self.proj_path}"
+            )
+
+        self._module_cache[module_name] = module
+        return module
+
     def get_module_and_name(self, ty: type) -> tuple[str | None, str] | None:
         """Retrieve module path and qualified type name from a type.
         Fails if the type lies outside of the three paths specified in the constructor.
+        Results are memoised per type, see `cache_info`.
 
         :param ty: Any given type whose defining file is relative to the specified paths
         :return: a pair of (module name, type name) if successful, where module_name is None is the type is a builtin
         """
+        cached, modname = self._type_cache.lookup(ty)
+        if not cached:
+            modname = self._resolve_module_and_name(ty)
+            self._type_cache.store(ty, modname)
+        return modname
+
+    def _resolve_module_and_name(self, ty: type) -> tuple[str | None, str] | None:
         # 0. builtin types
         module = sys.modules[ty.__module__]
         if module.__name__ == "builtins":
-            logger.info(f"{(module.__name__, ty.__name__)} is builtin")
+            logger.debug(f"{(module.__name__, ty.__name__)} is builtin")
             return None, ty.__qualname__
 
         # Special case:
@@ -139,17 +354,17 @@ class Resolver:
 
         # 1. project path
         if module_file.is_relative_to(self.proj_path):
-            logger.info(f"{(module.__name__, ty.__qualname__)} is relative to project path")
+            logger.debug(f"{(module.__name__, ty.__qualname__)} is relative to project path")
             rel_path = module_file.relative_to(self.proj_path)
 
         # 2. stdlib
         elif module_file.is_relative_to(self.stdlib_path):
-            logger.info(f"{(module.__name__, ty.__qualname__)} is relative to stdlib path")
+            logger.debug(f"{(module.__name__, ty.__qualname__)} is relative to stdlib path")
             rel_path = module_file.relative_to(self.stdlib_path)
 
         # 3. venv
         elif module_file.is_relative_to(self.site_packages):
-            logger.info(f"{(module.__name__, ty.__qualname__)} is a venv dependency")
+            logger.debug(f"{(module.__name__, ty.__qualname__)} is a venv dependency")
             rel_path = module_file.relative_to(self.site_packages)
 
         else:
@@ -0,0 +1,174 @@
+import pathlib
+import pickle
+import typing
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from common.compact_schema import STRING_COLUMNS
+from common.trace_data_category import TraceDataCategory
+from constants import Column, Schema
+
+
+_PARQUET_MAGIC = b"PAR1"
+
+
+def _empty_trace_data() -> pd.DataFrame:
+    return pd.DataFrame(columns=Schema.TraceData.keys()).astype(Schema.TraceData)
+
+
+ARROW_SCHEMA = pa.Schema.from_pandas(_empty_trace_data(), preserve_index=False)
+"""The Arrow schema of trace data files, derived from `Schema.TraceData`"""
+
+# Converting to the dtypes of `Schema.TraceData` directly is cheaper than
+# reconstructing them from the pandas metadata stored in the file
+PANDAS_DTYPES = {
+    pa.string(): pd.StringDtype(),
+    pa.uint64(): pd.UInt64Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+}
+
+
+class TraceDataWriter:
+    """
+    Writes trace data to a trace data file in chunks.
+
+    Trace data files are Parquet files, in which each chunk is stored as a row group.
+    The string columns are dictionary-encoded and the file is compressed,
+    which keeps files small, and allows filtering by column values while reading, see `read_trace_data`.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        """
+        :param path: Path to the trace data file; it is created, or truncated if it exists
+        """
+        self.path = path
+        self._writer = pq.ParquetWriter(
+            path,
+            ARROW_SCHEMA,
+            compression="zstd",
+            use_dictionary=True,
+        )
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Append a chunk of trace data.
+
+        :param chunk: Trace data adhering to `Schema.TraceData`
+        """
+        table = pa.Table.from_pandas(chunk, schema=ARROW_SCHEMA, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        """Finish the file. Files are only readable once their writer has been closed"""
+        self._writer.close()
+
+
+def write_trace_data(path: pathlib.Path, trace_data: pd.DataFrame) -> None:
+    """
+    Write trace data to a trace data file in one go.
+
+    :param path: Path to the trace data file
+    :param trace_data: Trace data adhering to `Schema.TraceData`
+    """
+    writer = TraceDataWriter(path)
+    try:
+        writer.write(trace_data)
+    finally:
+        writer.close()
+
+
+def read_trace_data(
+    path: pathlib.Path,
+    file_names: typing.Iterable[str] | None = None,
+    categories: typing.Iterable[TraceDataCategory] | None = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """
+    Read a trace data file.
+    The rows can be restricted to those of the given files and categories;
+    row groups that hold no such rows are skipped without being decoded.
+
+    Rows that occur in several chunks of the file are only read once.
+    Files written by older versions, that consist of pickled DataFrames, are also supported.
+
+    :param path: Path to the trace data file
+    :param file_names: If given, only rows whose `Filename` is one of these are read
+    :param categories: If given, only rows whose `Category` is one of these are read
+    :param compact: Whether the string columns are read as categoricals, straight from their dictionary encoding;
+        the categories are those of the file, see `CompactTraceDataSchema` for sharing them
+    :returns: The trace data in the file, adhering to `Schema.TraceData`, or with categorical string columns if compact
+    """
+    filters: list[tuple[str, str, list]] = list()
+    if file_names is not None:
+        filters.append((Column.FILENAME, "in", list(file_names)))
+    if categories is not None:
+        filters.append((Column.CATEGORY, "in", [int(category) for category in categories]))
+
+    with path.open("rb") as file:
+        is_parquet = file.read(len(_PARQUET_MAGIC)) == _PARQUET_MAGIC
+
+    if not is_parquet:
+        trace_data = _read_pickled_trace_data(path, filters)
+        if compact:
+            trace_data = trace_data.astype({column: "category" for column in STRING_COLUMNS})
+        return trace_data
+
+    parquet_file = pq.ParquetFile(path, read_dictionary=STRING_COLUMNS if compact else None)
+    if compact:
+        # The file's schema is kept, as the string columns would otherwise not be read dictionary-encoded
+        if filters:
+            table = pq.read_table(path, filters=filters, read_dictionary=STRING_COLUMNS)
+        else:
+            table = parquet_file.read()
+    elif filters:
+        table = pq.read_table(path, schema=ARROW_SCHEMA, filters=filters)
+    else:
+        table = parquet_file.read()
+    trace_data = table.to_pandas(types_mapper=PANDAS_DTYPES.get, ignore_metadata=True)
+
+    # Chunks are only deduplicated against the previous chunk while tracing, see `TraceDataBuffer`
+    if parquet_file.metadata.num_row_groups > 1:
+        trace_data = trace_data.drop_duplicates(ignore_index=True)
+    return trace_data
+
+
+def read_file_names(path: pathlib.Path) -> list[str]:
+    """
+    Read the distinct file names in a trace data file, without reading any other column.
+
+    :param path: Path to the trace data file
+    :returns: The distinct values of `Column.FILENAME`, in the order of their first occurrence
+    """
+    with path.open("rb") as file:
+        is_parquet = file.read(len(_PARQUET_MAGIC)) == _PARQUET_MAGIC
+
+    if not is_parquet:
+        file_names = _read_pickled_trace_data(path, filters=list())[Column.FILENAME]
+        return file_names.dropna().unique().tolist()
+
+    table = pq.read_table(path, columns=[Column.FILENAME], read_dictionary=[Column.FILENAME])
+    return table.column(Column.FILENAME).unique().dictionary_decode().drop_null().to_pylist()
+
+
+def _read_pickled_trace_data(
+    path: pathlib.Path, filters: list[tuple[str, str, list]]
+) -> pd.DataFrame:
+    chunks = list()
+    with path.open("rb") as file:
+        while True:
+            try:
+                chunks.append(pickle.load(file))
+            except EOFError:
+                break
+
+    if not chunks:
+        return _empty_trace_data()
+
+    trace_data = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, sort=False)
+    if filters:
+        for column, _, values in filters:
+            trace_data = trace_data[trace_data[column].isin(values)]
+        trace_data = trace_data.reset_index(drop=True)
+    return trace_data
@@ -15,6 +15,21 @@ TRACE_DATA_FILE_ENDING = ".pytype"
 
 NP_ARRAY_FILE_ENDING = ".npy_pytype"
 
+# Amount of distinct rows a tracer accumulates before handing them to its sink
+TRACE_DATA_CHUNK_SIZE = 100_000
+
+# Upper bound on the amount of data files a worker loads and combines at once
+DATA_FILE_BATCH_SIZE = 64
+
+# Amount of file comparisons each worker of `evaluate` has queued at most, ahead of the files yielded
+PENDING_COMPARISONS_PER_JOB = 4
+
+# Folder in which the manifest and store of already collected trace data files are kept
+TRACE_DATA_INDEX_FOLDER_NAME = ".pytypes_index"
+
+# File in the index folder in which the resolved MROs of traced types are kept across runs
+MRO_CACHE_FILE_NAME = "mro_cache.json"
+
 PYTEST_FUNCTION_PATTERN = re.compile(r"test_")
 
 
@@ -1,4 +1,8 @@
 import click
+import collections
+import concurrent.futures
+import logging
+import os
 import pathlib
 import filecmp
 
@@ -8,13 +12,15 @@ import numpy as np
 import pandas as pd
 
 import constants
-from typegen.trace_data_file_collector import TraceDataFileCollector
+from common.trace_data_file import read_file_names
 from evaluation.file_type_hints_collector import FileTypeHintsCollector
 from evaluation.metric_data_calculator import MetricDataCalculator
 from evaluation.performance_data_file_collector import (
     PerformanceDataFileCollector,
 )
 
+logger = logging.getLogger(__name__)
+
 __all__ = [
     FileTypeHintsCollector.__name__,
     MetricDataCalculator.__name__,
@@ -70,31 +76,37 @@ __all__ = [
     required=False,
     default="data",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    help="Amount of threads that compare files and processes that collect type hints in parallel, defaults to the amount of CPUs",
+    type=click.IntRange(min=1),
+    required=False,
+    default=os.cpu_count() or 1,
+    show_default=True,
+)
 def main(**params):
     original_path, traced_path, path_to_store, data_name = (params["original"], params["traced"], params["store"], params["data_name"])
     path_to_store.mkdir(parents=True, exist_ok=True)
 
     trace_data_path = traced_path / "pytypes"
 
-    # Gets the potentially changed file paths.
-    trace_data_file_collector = TraceDataFileCollector()
-    trace_data_file_collector.collect_data(trace_data_path, True)
-    trace_data = trace_data_file_collector.trace_data
-    potential_changed_files_relative_paths = trace_data[
-        constants.Column.FILENAME
-    ].unique()
-
-    # Gets the changed file paths.
-    (
-        original_file_paths_to_compare,
-        traced_file_paths_to_compare,
-    ) = _get_changed_file_paths(
-        original_path, traced_path, potential_changed_files_relative_paths
+    # Gets the changed file paths, while the potentially changed file paths are still being read from the trace data.
+    changed_file_paths = _get_changed_file_paths(
+        original_path, traced_path, _get_traced_file_names(trace_data_path), params["jobs"]
     )
+    traced_file_paths_to_compare: list[pathlib.Path] = []
+
+    def original_file_paths_to_compare() -> typing.Iterator[pathlib.Path]:
+        for original_file_path, traced_file_path in changed_file_paths:
+            traced_file_paths_to_compare.append(traced_file_path)
+            yield original_file_path
+
     metricdata_calculator = MetricDataCalculator()
-    file_typehints_collector = FileTypeHintsCollector()
+    file_typehints_collector = FileTypeHintsCollector(jobs=params["jobs"])
+    # The original files are parsed while the remaining files are still being compared.
     file_typehints_collector.collect_data(
-        original_path, original_file_paths_to_compare
+        original_path, original_file_paths_to_compare()
     )
     original_typehint_data = file_typehints_collector.typehint_data
     file_typehints_collector.collect_data(traced_path, traced_file_paths_to_compare)
@@ -115,19 +127,62 @@ def main(**params):
     np.save(performance_data_path, performance_data)
 
 
+def _get_traced_file_names(trace_data_path: pathlib.Path) -> typing.Iterator[str]:
+    """Gets the names of the files in the trace data, without reading the remaining trace data.
+    :param trace_data_path: The path of the folder containing the trace data files.
+    :returns: The distinct file names, in the order of the sorted trace data files."""
+    file_names: set[str] = set()
+    for trace_data_file_path in sorted(trace_data_path.rglob(f"*{constants.TRACE_DATA_FILE_ENDING}")):
+        try:
+            file_names_in_file = read_file_names(trace_data_file_path)
+        except Exception as exception:
+            logger.error(f"Error encountered for file: {str(trace_data_file_path)}")
+            logger.error(exception)
+            continue
+        for file_name in file_names_in_file:
+            if file_name not in file_names:
+                file_names.add(file_name)
+                yield file_name
+
+
 def _get_changed_file_paths(
     original_root_folder_path: pathlib.Path,
     traced_root_folder_path: pathlib.Path,
-    potential_changed_files_relative_paths: typing.Iterable[pathlib.Path],
-):
-    original_file_paths_to_compare = []
-    traced_file_paths_to_compare = []
-    for potential_file_relative_path in potential_changed_files_relative_paths:
+    potential_changed_files_relative_paths: typing.Iterable[str | pathlib.Path],
+    jobs: int = 1,
+) -> typing.Iterator[tuple[pathlib.Path, pathlib.Path]]:
+    """Compares the original and traced files concurrently, while the relative paths are still being iterated.
+    :param original_root_folder_path: The path of the original project.
+    :param traced_root_folder_path: The path of the traced project.
+    :param potential_changed_files_relative_paths: The paths of the files to compare, relative to the projects.
+    :param jobs: The amount of threads that compare files.
+    :returns: The original and traced file paths of the files whose contents differ, in the order of the relative paths."""
+    def compare(
+        potential_file_relative_path: str | pathlib.Path,
+    ) -> tuple[pathlib.Path, pathlib.Path, bool]:
         original_file_path = original_root_folder_path / potential_file_relative_path
         traced_file_path = traced_root_folder_path / potential_file_relative_path
-
+        # Files of equal size and modification time are considered equal, and files of differing size differ,
+        # without reading their contents.
         have_same_content = filecmp.cmp(original_file_path, traced_file_path)
-        if not have_same_content:
-            original_file_paths_to_compare.append(original_file_path)
-            traced_file_paths_to_compare.append(traced_file_path)
-    return original_file_paths_to_compare, traced_file_paths_to_compare
+        return original_file_path, traced_file_path, have_same_content
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        # Unlike map, which drains the relative paths up front, only a bounded amount of comparisons is submitted
+        # ahead of the files yielded; waiting on them in order of submission preserves the order of the relative paths
+        pending: collections.deque[
+            concurrent.futures.Future[tuple[pathlib.Path, pathlib.Path, bool]]
+        ] = collections.deque()
+        max_pending = max(jobs, 1) * constants.PENDING_COMPARISONS_PER_JOB
+
+        def compared() -> typing.Iterator[tuple[pathlib.Path, pathlib.Path, bool]]:
+            for potential_file_relative_path in potential_changed_files_relative_paths:
+                pending.append(executor.submit(compare, potential_file_relative_path))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        for original_file_path, traced_file_path, have_same_content in compared():
+            if not have_same_content:
+                yield original_file_path, traced_file_path
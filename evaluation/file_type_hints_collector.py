@@ -1,3 +1,7 @@
+import concurrent.futures
+import contextlib
+import hashlib
+import multiprocessing
 import pathlib
 from typing import Iterable
 import pandas as pd
@@ -14,10 +18,17 @@ class FileTypeHintsCollector:
 
     typehint_data: pd.DataFrame
 
-    def __init__(self):
-        """Creates an instance of FileTypeHintsCollector."""
+    def __init__(self, jobs: int = 1):
+        """Creates an instance of FileTypeHintsCollector.
+        :param jobs: The amount of processes that parse files concurrently.
+        """
+        self.jobs = jobs
         self.typehint_data = pd.DataFrame(columns=Schema.TypeHintData.keys())
 
+        # The rows of each parsed file content, by the content's hash. Files with the same content,
+        # e.g. those that have not been changed in a traced copy of a project, are only parsed once.
+        self._rows_by_content_hash: dict[bytes, list[tuple]] = dict()
+
     def collect_data_from_file(self, root: pathlib.Path, filename: str) -> None:
         """Collects the typehint data from a file.
 
@@ -65,27 +76,80 @@ class FileTypeHintsCollector:
         self, root: pathlib.Path, file_paths: Iterable[pathlib.Path]
     ) -> None:
         """Collects the typehint data from the files in the provided file paths.
+        If multiple jobs have been requested, the files are parsed by multiple processes while the file paths are still being iterated.
         :param root: The root folder path.
         :param file_paths: The file paths.
         """
-        self.typehint_data = self.typehint_data.iloc[0:0]
-        """Collects the type hints of the provided file paths."""
-        for file_path in file_paths:
-            if not file_path.is_relative_to(root):
-                raise ValueError(f"{file_path} is not relative to {root}")
-
-            with file_path.open() as file:
-                file_content = file.read()
-
-            module = cst.parse_module(source=file_content)
-            module_and_meta = cst.MetadataWrapper(module)
-            relative_path_str = str(file_path.relative_to(root))
-            visitor = _TypeHintVisitor(relative_path_str)
-            module_and_meta.visit(visitor)
-            typehint_data = visitor.typehint_data
-            self.typehint_data = pd.concat(
-                [self.typehint_data, typehint_data], ignore_index=True
-            ).astype(Schema.TypeHintData)
+        relative_paths: list[str] = []
+        content_hashes: list[bytes] = []
+        parsing: dict[bytes, concurrent.futures.Future] = {}
+        with contextlib.ExitStack() as stack:
+            executor = None
+            if self.jobs > 1:
+                # The file paths may be produced by threads that still run while the workers are started,
+                # see `evaluation._get_changed_file_paths`, and forking a process with running threads can deadlock
+                executor = stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.jobs, mp_context=_worker_context()
+                    )
+                )
+
+            for file_path in file_paths:
+                if not file_path.is_relative_to(root):
+                    raise ValueError(f"{file_path} is not relative to {root}")
+
+                with file_path.open() as file:
+                    file_content = file.read()
+
+                relative_path_str = str(file_path.relative_to(root))
+                content_hash = hashlib.blake2b(file_content.encode()).digest()
+                relative_paths.append(relative_path_str)
+                content_hashes.append(content_hash)
+                if content_hash in self._rows_by_content_hash or content_hash in parsing:
+                    continue
+                if executor is None:
+                    self._rows_by_content_hash[content_hash] = _collect_rows(
+                        relative_path_str, file_content
+                    )
+                else:
+                    parsing[content_hash] = executor.submit(
+                        _collect_rows, relative_path_str, file_content
+                    )
+
+            for content_hash, parsed in parsing.items():
+                self._rows_by_content_hash[content_hash] = parsed.result()
+
+        # The rows of files with the same content only differ by their file name
+        rows: list[tuple] = []
+        for relative_path_str, content_hash in zip(relative_paths, content_hashes):
+            rows.extend(
+                (relative_path_str, *row[1:])
+                for row in self._rows_by_content_hash[content_hash]
+            )
+        self.typehint_data = pd.DataFrame(
+            rows, columns=Schema.TypeHintData.keys()
+        ).astype(Schema.TypeHintData)
+
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    # The fork server is started from a single-threaded process, but is not available on every platform
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _collect_rows(relative_path: str, file_content: str) -> list[tuple]:
+    """Collects the typehint data rows of a file.
+    Executed by the workers when parsing concurrently.
+    :param relative_path: The path of the file relative to the root folder.
+    :param file_content: The content of the file.
+    :returns: The typehint data rows of the file.
+    """
+    module = cst.parse_module(source=file_content)
+    module_and_meta = cst.MetadataWrapper(module)
+    visitor = _TypeHintVisitor(relative_path)
+    module_and_meta.visit(visitor)
+    return list(visitor.typehint_data.itertuples(index=False, name=None))
 
 
 class _TypeHintVisitor(cst.CSTVisitor):
@@ -1,3 +1,6 @@
+import typing
+
+import numpy as np
 import pandas as pd
 
 from constants import Column, Schema
@@ -5,9 +8,6 @@ from constants import Column, Schema
 
 class MetricDataCalculator:
     """Calculates the metric data."""
-    INDEX = "Index"
-    INDEX2 = "Index 2"
-    CUMCOUNT = "CumCount"
 
     def __init__(self):
         """Creates an instance of MetricDataCalculator."""
@@ -22,79 +22,196 @@ class MetricDataCalculator:
     def get_metric_data(self, original_type_hint_data: pd.DataFrame, generated_type_hint_data: pd.DataFrame) \
             -> pd.DataFrame:
         """Calculates the metric data containing the correctness & completeness.
+        Rows of the original and generated typehint data which match (including type) are correct & complete.
+        The remaining rows are matched without their type.
+        Duplicate rows are matched in the order of their occurrence,
+        except for rows with missing values, which are matched with every row that is equal to them.
         :param original_type_hint_data: The original typehint data.
-        :param generated_type_hint_data: The generated typehint data."""
-        # Replaces the filenames of the traced type hint data with the original filename.
-        generated_type_hint_data = generated_type_hint_data.replace(
-            {Column.FILENAME: self.generated_filenames_by_original})
-
-        subset_merged = list(Schema.TypeHintData.keys())
-        subset_merged = subset_merged.copy()
-
-        # Used to sort the values.
-        original_type_hint_data[MetricDataCalculator.INDEX] = original_type_hint_data.index
-        generated_type_hint_data[MetricDataCalculator.INDEX2] = generated_type_hint_data.index
-
-        # Used to treat duplicate rows as separate rows (to merge the dataframes).
-        original_type_hint_data[MetricDataCalculator.CUMCOUNT] = original_type_hint_data.groupby(
-            subset_merged).cumcount()
-        generated_type_hint_data[MetricDataCalculator.CUMCOUNT] = generated_type_hint_data.groupby(
-            subset_merged).cumcount()
-        subset_merged.append(MetricDataCalculator.CUMCOUNT)
-
-        # Merges rows which match (including type).
-        merged_data = pd.merge(original_type_hint_data, generated_type_hint_data,
-                                            on=subset_merged, how='inner')  # type: ignore
-        merged_data = merged_data.drop(MetricDataCalculator.CUMCOUNT, axis=1)
-        merged_data[Column.VARTYPE_ORIGINAL] = merged_data[Column.VARTYPE]
-        merged_data[Column.VARTYPE_GENERATED] = merged_data[Column.VARTYPE]
-        merged_data = merged_data.drop(Column.VARTYPE, axis=1)
-        merged_data[Column.CORRECTNESS] = True
-        merged_data[Column.COMPLETENESS] = True
-
-        original_type_hint_data = original_type_hint_data[
-            ~original_type_hint_data[MetricDataCalculator.INDEX].isin(merged_data[MetricDataCalculator.INDEX])]
-        generated_type_hint_data = generated_type_hint_data[
-            ~generated_type_hint_data[MetricDataCalculator.INDEX2].isin(merged_data[MetricDataCalculator.INDEX2])]
-
-        subset_merged.remove(Column.VARTYPE)
-
-        original_type_hint_data = original_type_hint_data.rename(
-            {Column.VARTYPE: Column.VARTYPE_ORIGINAL}, axis=1)
-        generated_type_hint_data = generated_type_hint_data.rename(
-            {Column.VARTYPE: Column.VARTYPE_GENERATED}, axis=1)
-
-        original_type_hint_data[MetricDataCalculator.CUMCOUNT] = original_type_hint_data.groupby(
-            subset_merged).cumcount()
-        generated_type_hint_data[MetricDataCalculator.CUMCOUNT] = generated_type_hint_data.groupby(
-            subset_merged).cumcount()
-
-        # Merges remaining rows.
-        merged_data2 = pd.merge(original_type_hint_data, generated_type_hint_data,
-                                on=subset_merged, how='outer')  # type: ignore
-        merged_data2 = merged_data2.drop(MetricDataCalculator.CUMCOUNT, axis=1)
-        merged_data2[Column.CORRECTNESS] = False
-        merged_data2[Column.COMPLETENESS] = False
-        merged_data2.loc[
-            ~merged_data2[Column.VARTYPE_GENERATED].isna(), Column.COMPLETENESS] = True
-        indices_original_types_missing = merged_data2[Column.VARTYPE_ORIGINAL].isna()
-        merged_data2.loc[indices_original_types_missing, Column.COMPLETENESS] = None
-        merged_data2.loc[indices_original_types_missing, Column.CORRECTNESS] = None
-
-        columns_in_correct_order = list(Schema.Metrics.keys())
-        columns_in_correct_order.append(MetricDataCalculator.INDEX)
-        columns_in_correct_order.append(MetricDataCalculator.INDEX2)
-        merged_data2 = merged_data2[columns_in_correct_order]
-        merged_data = merged_data[columns_in_correct_order]
-        processed_data = pd.concat(
-            [merged_data, merged_data2], ignore_index=True
-        )
-        processed_data = processed_data.sort_values(by=[MetricDataCalculator.INDEX, MetricDataCalculator.INDEX2])\
-            .reset_index(drop=True)
-        processed_data = processed_data.drop([MetricDataCalculator.INDEX, MetricDataCalculator.INDEX2], axis=1)
-        processed_data = processed_data.astype(Schema.Metrics)
-
-        return processed_data
+        :param generated_type_hint_data: The generated typehint data.
+        :returns: The metric data, ordered by the original and then the generated typehint data rows."""
+        original_type_hint_data = _as_type_hint_data(original_type_hint_data)
+        generated_type_hint_data = _as_type_hint_data(generated_type_hint_data)
+        if self.generated_filenames_by_original:
+            # Replaces the filenames of the traced type hint data with the original filename.
+            generated_type_hint_data = generated_type_hint_data.assign(**{
+                Column.FILENAME: generated_type_hint_data[Column.FILENAME].replace(
+                    self.generated_filenames_by_original)
+            })
+        original_count = original_type_hint_data.shape[0]
+
+        # Keys of the variables and of the variables including type, shared by the rows of both typehint data.
+        key_columns = [column for column in Schema.TypeHintData.keys() if column != Column.VARTYPE]
+        variable_keys, variable_key_is_missing = _get_keys(
+            original_type_hint_data, generated_type_hint_data, key_columns)
+        typed_variable_keys, type_is_missing = _get_keys(
+            original_type_hint_data, generated_type_hint_data, [Column.VARTYPE], variable_keys)
+        typed_variable_key_is_missing = variable_key_is_missing | type_is_missing
+
+        # Matches rows which match (including type).
+        typed_occurrences = _count_occurrences(typed_variable_keys, original_count)
+        typed_occurrences[typed_variable_key_is_missing] = -1
+        original_matched, generated_matched = _match(typed_variable_keys, typed_occurrences, original_count)
+        is_unmatched = np.ones(len(variable_keys), dtype=bool)
+        is_unmatched[original_matched] = False
+        is_unmatched[original_count + generated_matched] = False
+
+        # Matches remaining rows. Their occurrences are counted among the remaining rows
+        # which are the same occurrence of rows that are equal including type.
+        remaining = np.flatnonzero(is_unmatched)
+        remaining_original_count = np.count_nonzero(remaining < original_count)
+        occurrence_groups = variable_keys * (len(variable_keys) + 1) + typed_occurrences + 1
+        remaining_occurrences = _count_occurrences(occurrence_groups[remaining], remaining_original_count)
+        remaining_occurrences[typed_variable_key_is_missing[remaining]] = -1
+        original_remaining, generated_remaining = _match(
+            variable_keys[remaining], remaining_occurrences, remaining_original_count)
+        original_remaining = remaining[original_remaining]
+        generated_remaining = remaining[remaining_original_count + generated_remaining] - original_count
+        is_unmatched[original_remaining] = False
+        is_unmatched[original_count + generated_remaining] = False
+        original_only = np.flatnonzero(is_unmatched[:original_count])
+        generated_only = np.flatnonzero(is_unmatched[original_count:])
+
+        # Positions of the original and generated row of each metric data row; -1 if there is none.
+        originals = np.concatenate([
+            original_matched, original_remaining, original_only, np.full(len(generated_only), -1)])
+        generateds = np.concatenate([
+            generated_matched, generated_remaining, np.full(len(original_only), -1), generated_only])
+        is_match_including_type = np.zeros(len(originals), dtype=bool)
+        is_match_including_type[:len(original_matched)] = True
+
+        order = np.lexsort((
+            _get_row_order(generated_type_hint_data.index, generateds),
+            _get_row_order(original_type_hint_data.index, originals),
+        ))
+        originals = originals[order]
+        generateds = generateds[order]
+        is_match_including_type = is_match_including_type[order]
+
+        metric_data = {}
+        has_original = originals != -1
+        for column in key_columns:
+            values = original_type_hint_data[column].array.take(originals, allow_fill=True)
+            values[~has_original] = generated_type_hint_data[column].array.take(generateds[~has_original])
+            metric_data[column] = values
+        original_types = original_type_hint_data[Column.VARTYPE].array.take(originals, allow_fill=True)
+        generated_types = generated_type_hint_data[Column.VARTYPE].array.take(generateds, allow_fill=True)
+        metric_data[Column.VARTYPE_ORIGINAL] = original_types
+        metric_data[Column.VARTYPE_GENERATED] = generated_types
+
+        completeness = pd.array(is_match_including_type | ~generated_types.isna(), dtype=pd.BooleanDtype())
+        correctness = pd.array(is_match_including_type, dtype=pd.BooleanDtype())
+        is_original_type_missing = ~is_match_including_type & original_types.isna()
+        completeness[is_original_type_missing] = None
+        correctness[is_original_type_missing] = None
+        metric_data[Column.COMPLETENESS] = completeness
+        metric_data[Column.CORRECTNESS] = correctness
+
+        # The values already have the types of the metric data.
+        return pd.DataFrame(metric_data, columns=list(Schema.Metrics.keys()))
+
+
+def _as_type_hint_data(type_hint_data: pd.DataFrame) -> pd.DataFrame:
+    dtypes = pd.Series(Schema.TypeHintData)
+    if list(type_hint_data.columns) == list(dtypes.index) and type_hint_data.dtypes.eq(dtypes).all():
+        return type_hint_data
+    return type_hint_data[list(dtypes.index)].astype(Schema.TypeHintData)
+
+
+def _get_keys(
+    original_type_hint_data: pd.DataFrame,
+    generated_type_hint_data: pd.DataFrame,
+    columns: list[str],
+    keys: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Gets keys of the rows of both typehint data, which are equal for rows with equal values in the given columns.
+    :param original_type_hint_data: The original typehint data.
+    :param generated_type_hint_data: The generated typehint data.
+    :param columns: The columns of the values to derive the keys from.
+    :param keys: Keys of other columns of the rows, which the keys are derived from as well.
+    :returns: The keys of the original rows followed by the generated rows, numbered from 0,
+        and whether a value of a row is missing."""
+    is_missing = np.zeros(original_type_hint_data.shape[0] + generated_type_hint_data.shape[0], dtype=bool)
+    key_count = 1 if keys is None else len(is_missing) + 1
+    combined_keys = np.zeros(len(is_missing), dtype=np.int64) if keys is None else keys.astype(np.int64)
+    for column in columns:
+        original_keys, original_uniques = _factorize(original_type_hint_data[column])
+        generated_keys, generated_uniques = _factorize(generated_type_hint_data[column])
+        # Numbers the values of the generated rows like those of the original rows, and new values after them.
+        generated_key_mapping = pd.Index(original_uniques).get_indexer(generated_uniques)
+        is_new = generated_key_mapping == -1
+        generated_key_mapping[is_new] = len(original_uniques) + np.arange(np.count_nonzero(is_new))
+        generated_keys = np.append(generated_key_mapping, -1)[generated_keys]
+        column_keys = np.concatenate([original_keys, generated_keys])
+
+        # Missing values are numbered -1, and are considered equal.
+        is_missing |= column_keys == -1
+        column_key_count = len(original_uniques) + np.count_nonzero(is_new) + 1
+        if key_count * column_key_count >= 2 ** 62:
+            # Renumbers the keys, so that the combined keys do not overflow.
+            combined_keys = pd.factorize(combined_keys)[0]
+            key_count = len(is_missing) + 1
+        combined_keys = combined_keys * column_key_count + column_keys + 1
+        key_count *= column_key_count
+    return pd.factorize(combined_keys)[0], is_missing
+
+
+def _factorize(values: pd.Series) -> tuple[np.ndarray, typing.Any]:
+    if isinstance(values.dtype, pd.StringDtype):
+        # Hashing the strings is faster than factorizing the string array, which looks for missing values first.
+        return pd.factorize(values.to_numpy())
+    return pd.factorize(values)
+
+
+def _match(keys: np.ndarray, occurrences: np.ndarray, original_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Matches the original and generated rows with equal keys and occurrences.
+    Rows whose occurrence is -1 are matched with every row that has the same key and occurrence.
+    :param keys: The keys of the original rows followed by the generated rows.
+    :param occurrences: The occurrences of the rows, which tell duplicate rows apart.
+    :param original_count: The amount of original rows.
+    :returns: The positions of the matching original and generated rows."""
+    occurrence_keys = keys.astype(np.int64) * (len(keys) + 1) + occurrences + 1
+    original_keys = occurrence_keys[:original_count]
+    generated_order = np.argsort(occurrence_keys[original_count:], kind="stable")
+    generated_keys = occurrence_keys[original_count:][generated_order]
+
+    # Each original row matches the generated rows between these positions of the ordered generated rows.
+    starts = np.searchsorted(generated_keys, original_keys, side="left")
+    counts = np.searchsorted(generated_keys, original_keys, side="right") - starts
+    matched_originals = np.repeat(np.arange(original_count), counts)
+    offsets = np.arange(len(matched_originals)) - np.repeat(np.cumsum(counts) - counts, counts)
+    matched_generateds = generated_order[np.repeat(starts, counts) + offsets]
+    return matched_originals, matched_generateds
+
+
+def _count_occurrences(keys: np.ndarray, original_count: int) -> np.ndarray:
+    """Counts the occurrences of each key, among the original and the generated rows separately.
+    :param keys: The keys of the original rows followed by the generated rows.
+    :param original_count: The amount of original rows.
+    :returns: The number of previous original or generated rows with the same key, for each row."""
+    # Sorting the generated rows after the original rows separates their occurrences.
+    order = np.lexsort((keys, np.arange(len(keys)) >= original_count))
+    sorted_keys = keys[order]
+    is_first = np.ones(len(keys), dtype=bool)
+    is_first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    is_first[original_count:original_count + 1] = True
+    positions = np.arange(len(keys))
+    occurrences = np.empty(len(keys), dtype=np.int64)
+    occurrences[order] = positions - np.maximum.accumulate(np.where(is_first, positions, 0))
+    return occurrences
+
+
+def _get_row_order(index: pd.Index, positions: np.ndarray) -> np.ndarray:
+    """Gets the order of the rows at the given positions by their index labels, where missing rows are last.
+    :param index: The index of the typehint data.
+    :param positions: The positions of the rows; -1 if there is none.
+    :returns: The order of each row."""
+    if index.is_monotonic_increasing:
+        label_order = np.arange(len(index))
+    else:
+        label_order = np.empty(len(index), dtype=np.int64)
+        label_order[index.argsort(kind="stable")] = np.arange(len(index))
+    # Position -1 takes the last order
+    return np.append(label_order, len(index))[positions]
 
 
 def get_total_completeness_and_correctness(metric_data: pd.DataFrame) -> tuple[float, float]:
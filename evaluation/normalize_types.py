@@ -1,134 +1,122 @@
+import functools
+import re
+
+_UNION_PREFIXES = ("typing.Union[", "Union[")
+_OPTIONAL_PREFIXES = ("typing.Optional[", "Optional[")
+
+_BRACKETS = re.compile(r"[\[\]]")
+_BRACKETS_AND_UNION_SEPARATORS = re.compile(r"[\[\]|]")
+_BRACKETS_AND_ARGUMENT_SEPARATORS = re.compile(r"[\[\],]")
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_type(type_hint: str) -> str:
     """Gets the type union written as a type union using only | .
     Normalizes typing.Union, typing.Optional and | unions.
     Does also normalize inner type unions, for example: list[int | str].
+    Spaces are removed, except for those separating inner types and types in unions.
+    The normalized type hints are cached, as the same type hints are usually normalized many times.
     :param type_hint: The type hint name to normalize.
     :returns: the normalized type hint name."""
-    types = _normalize_type(type_hint)
-
-    returned_type = ""
-    sorted_union_types = sorted(set(types))
-    for i, type_name in enumerate(sorted_union_types):
-        if i == 0:
-            returned_type = type_name
-        else:
-            returned_type += " | " + type_name
-    return returned_type
-
-
-def _normalize_type(type_hint: str) -> list[str]:
-    types_in_union = _normalize_union(type_hint)
-    if len(types_in_union) == 1:
-        types = _normalize_type_with_inner_types(type_hint)
-    else:
-        types = types_in_union
-    return types
-
-
-def _normalize_union(union_type_hint: str) -> list[str]:
-    returned_types = []
-    union_type_hint_without_spaces = union_type_hint.replace(" ", "")
-    types_in_union = _get_split_outside_of_brackets(union_type_hint_without_spaces, "|")
-    is_union_using_vertical_bar = len(types_in_union) > 1
-    is_union = (
-        union_type_hint_without_spaces.startswith("typing.Union[")
-        or union_type_hint_without_spaces.startswith("Union[")
-    ) and union_type_hint_without_spaces.endswith("]")
-    is_optional = (
-        union_type_hint_without_spaces.startswith("typing.Optional[")
-        or union_type_hint_without_spaces.startswith("Optional[")
-    ) and union_type_hint_without_spaces.endswith("]")
-    if not is_union_using_vertical_bar and not is_union and not is_optional:
-        return [union_type_hint]
-
-    if not is_union_using_vertical_bar:
-        union_within_left_bracket = union_type_hint_without_spaces.split("[", 1)[1]
-        content_within_brackets = union_within_left_bracket.rsplit("]", 1)[0]
-        types_in_union = _get_split_outside_of_brackets(content_within_brackets, ",")
-        if is_optional:
-            types_in_union.append("None")
-
-    for type_in_union in types_in_union:
-        if type_in_union.replace(" ", "") == union_type_hint_without_spaces:
-            raise ValueError(f"Infinite recursion detected for {union_type_hint}!")
-        returned_types += _normalize_type(type_in_union)
-    return returned_types
-
-
-def _normalize_type_with_inner_types(type_with_inner_types_hint: str) -> list[str]:
-    type_with_inner_types_hint_without_spaces = type_with_inner_types_hint.replace(
-        " ", ""
-    )
-    is_invalid_type_with_inner_types = (
-        type_with_inner_types_hint_without_spaces.startswith("typing.Union[")
-        or type_with_inner_types_hint_without_spaces.startswith("Union[")
-        or type_with_inner_types_hint_without_spaces.startswith("typing.Optional[")
-        or type_with_inner_types_hint_without_spaces.startswith("Optional[")
-    )
-    if is_invalid_type_with_inner_types:
-        raise ValueError(type_with_inner_types_hint_without_spaces)
-
-    if not _is_type_with_inner_types(type_with_inner_types_hint_without_spaces):
-        return [type_with_inner_types_hint]
-
-    split_elements = type_with_inner_types_hint_without_spaces.split("[", 1)
-    outer_type = split_elements[0]
-    inner_content = split_elements[1][:-1]
-    inner_types = _get_split_outside_of_brackets(inner_content, ",")
-    normalized_type = outer_type + "["
-    inner_content = ""
-    for i, inner_type in enumerate(inner_types):
-        normalized_inner_type = normalize_type(inner_type)
-        if i == 0:
-            inner_content = normalized_inner_type
-        else:
-            inner_content += ", " + normalized_inner_type
-    normalized_type += inner_content + "]"
-    return [normalized_type]
-
-
-def _is_type_with_inner_types(type_hint: str) -> bool:
-    bracket_depth = 0
-    opening_bracket_letter = "["
-    closing_bracket_letter = "]"
-
-    for i, char in enumerate(type_hint):
-        if char == opening_bracket_letter:
-            bracket_depth += 1
-
-        if char == closing_bracket_letter:
-            bracket_depth -= 1
-            if bracket_depth < 0:
-                raise ValueError(type_hint)
-            elif bracket_depth == 0:
-                if i == len(type_hint) - 1:
-                    return True
-                else:
-                    return False
-    return False
-
-
-def _get_split_outside_of_brackets(type_hint: str, letter_to_split: str) -> list[str]:
-    assert len(letter_to_split) == 1
-    bracket_depth = 0
-    opening_bracket_letter = "["
-    closing_bracket_letter = "]"
-
-    split_elements = []
-    current_split_element = ""
-    for char in type_hint:
-        if bracket_depth == 0 and char == letter_to_split:
-            split_elements.append(current_split_element)
-            current_split_element = ""
-        else:
-            if char == opening_bracket_letter:
-                bracket_depth += 1
-            if char == closing_bracket_letter:
-                bracket_depth -= 1
-                if bracket_depth < 0:
-                    raise ValueError(
-                        f"{type_hint} does not have correctly set brackets!"
-                    )
-            current_split_element += char
-    split_elements.append(current_split_element)
-    return split_elements
+    parser = _TypeHintParser(type_hint.replace(" ", ""))
+    return parser.normalize(0, len(parser.type_hint))
+
+
+class _TypeHintParser:
+    """Parses a type hint without spaces.
+    The brackets are matched once, so that nested types are skipped instead of being scanned again
+    when splitting a type hint into the types of a union, or into inner types."""
+
+    def __init__(self, type_hint: str):
+        """Creates an instance of _TypeHintParser.
+        :param type_hint: The type hint to parse, without spaces.
+        """
+        self.type_hint = type_hint
+
+        # The position of the closing bracket of each opening bracket that is closed.
+        self.closing_brackets: dict[int, int] = {}
+        opening_brackets: list[int] = []
+        for bracket in _BRACKETS.finditer(type_hint):
+            if bracket.group() == "[":
+                opening_brackets.append(bracket.start())
+            elif opening_brackets:
+                self.closing_brackets[opening_brackets.pop()] = bracket.start()
+            else:
+                raise ValueError(f"{type_hint} does not have correctly set brackets!")
+
+    def normalize(self, start: int, end: int) -> str:
+        """Normalizes the type hint between the given positions.
+        :param start: The position of the first character.
+        :param end: The position after the last character.
+        :returns: The normalized type hint name.
+        """
+        return " | ".join(sorted(set(self._parse_union(start, end))))
+
+    def _parse_union(self, start: int, end: int) -> list[str]:
+        types: list[str] = []
+        for type_start, type_end in self._split(start, end, _BRACKETS_AND_UNION_SEPARATORS):
+            types += self._parse_type(type_start, type_end)
+        return types
+
+    def _parse_type(self, start: int, end: int) -> list[str]:
+        type_hint = self.type_hint
+        is_optional = type_hint.startswith(_OPTIONAL_PREFIXES, start, end)
+        if is_optional or type_hint.startswith(_UNION_PREFIXES, start, end):
+            if type_hint[end - 1] != "]":
+                raise ValueError(type_hint[start:end])
+            opening_bracket = type_hint.index("[", start)
+            types: list[str] = []
+            for type_start, type_end in self._split(
+                opening_bracket + 1, end - 1, _BRACKETS_AND_ARGUMENT_SEPARATORS
+            ):
+                types += self._parse_union(type_start, type_end)
+            if is_optional:
+                types.append("None")
+            if len(types) == 1:
+                raise ValueError(type_hint[start:end])
+            return types
+
+        opening_bracket = type_hint.find("[", start, end)
+        if self.closing_brackets.get(opening_bracket) != end - 1:
+            # Not a type with inner types, for example: int
+            return [type_hint[start:end]]
+
+        inner_types = [
+            self.normalize(type_start, type_end)
+            for type_start, type_end in self._split(
+                opening_bracket + 1, end - 1, _BRACKETS_AND_ARGUMENT_SEPARATORS
+            )
+        ]
+        return [type_hint[start:opening_bracket] + "[" + ", ".join(inner_types) + "]"]
+
+    def _split(
+        self, start: int, end: int, separators: re.Pattern
+    ) -> list[tuple[int, int]]:
+        """Splits the type hint between the given positions at the separators outside of brackets.
+        :param start: The position of the first character.
+        :param end: The position after the last character.
+        :param separators: Matches brackets and the separator to split at.
+        :returns: The start and end positions of the split elements.
+        """
+        type_hint = self.type_hint
+        split_elements = []
+        element_start = start
+        found = separators.search(type_hint, start, end)
+        while found is not None:
+            position = found.start()
+            if type_hint[position] == "[":
+                closing_bracket = self.closing_brackets.get(position, end)
+                if closing_bracket >= end:
+                    # The remaining elements are within the brackets.
+                    break
+                found = separators.search(type_hint, closing_bracket + 1, end)
+            elif type_hint[position] == "]":
+                raise ValueError(
+                    f"{type_hint[start:end]} does not have correctly set brackets!"
+                )
+            else:
+                split_elements.append((element_start, position))
+                element_start = position + 1
+                found = separators.search(type_hint, element_start, end)
+        split_elements.append((element_start, end))
+        return split_elements
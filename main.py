@@ -4,8 +4,9 @@ import fetching
 import typegen
 import confgen
 import evaluation
+import benchmark
 
 if __name__ == "__main__":
     # Ordered by workflow usage
-    main = click.Group(commands=[fetching.main, typegen.main, confgen.main, evaluation.main])
+    main = click.Group(commands=[fetching.main, typegen.main, confgen.main, evaluation.main, benchmark.main])
     main()
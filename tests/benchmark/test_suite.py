@@ -0,0 +1,61 @@
+import functools
+import json
+import pathlib
+import sys
+
+from benchmark.suite import (
+    UNTRACED,
+    WORKLOADS_PATH,
+    TracerPaths,
+    count_events,
+    run_benchmarks,
+    tracer_configurations,
+    write_results,
+)
+from benchmark.workloads import WORKLOADS
+
+from tests.helpers.paths import STDLIB_PATH
+
+PATHS = TracerPaths(
+    proj_path=WORKLOADS_PATH, stdlib_path=STDLIB_PATH, venv_path=pathlib.Path(sys.prefix)
+)
+
+
+def _returns_sum(a: int, b: int) -> int:
+    c = a + b
+    return c
+
+
+def test_events_of_settrace_are_counted():
+    # call, two lines and return
+    assert count_events(functools.partial(_returns_sum, 1, 2)) == 4
+
+
+def test_each_workload_is_run_untraced_and_by_each_configuration(tmp_path):
+    configurations = {
+        name: factory
+        for name, factory in tracer_configurations().items()
+        if name in ("NoOperationTracer", "Tracer", "Tracer[sink]")
+    }
+    workloads = {"large_globals": WORKLOADS["large_globals"]}
+
+    results = run_benchmarks(workloads, configurations, PATHS, repetitions=1)
+
+    assert [result.tracer for result in results] == [UNTRACED, "NoOperationTracer", "Tracer", "Tracer[sink]"]
+    assert all(result.workload == "large_globals" for result in results)
+    assert len({result.events for result in results}) == 1
+    assert results[0].events > 0
+    assert all(result.peak_memory_bytes > 0 for result in results)
+
+    untraced, no_operation, tracer, sink = results
+    assert untraced.rows == no_operation.rows == 0
+    assert tracer.rows > 0
+    assert sink.rows == tracer.rows
+
+    output = tmp_path / "benchmark.json"
+    write_results(output, results, repetitions=1)
+    document = json.loads(output.read_text())
+
+    assert document["repetitions"] == 1
+    assert document["results"][2]["tracer"] == "Tracer"
+    assert document["results"][2]["rows"] == tracer.rows
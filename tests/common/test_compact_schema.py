@@ -0,0 +1,54 @@
+import pandas as pd
+
+from common import CompactTraceDataSchema
+from common.compact_schema import STRING_COLUMNS, is_compact
+from constants import Column, Schema
+
+
+def _sample_trace_data(file_name: str, types: list[str]) -> pd.DataFrame:
+    rows = [[file_name, None, None, "function", i, 1, "var", None, type_name] for i, type_name in enumerate(types)]
+    return pd.DataFrame(rows, columns=list(Schema.TraceData.keys())).astype(Schema.TraceData)
+
+
+def test_encoded_trace_data_decodes_to_original():
+    schema = CompactTraceDataSchema()
+    expected = _sample_trace_data("a.py", ["int", "str", "int"])
+
+    actual = schema.encode(expected)
+
+    assert is_compact(actual)
+    assert expected.equals(actual.astype(Schema.TraceData))
+
+
+def test_categories_are_shared_and_grow():
+    schema = CompactTraceDataSchema()
+    first = schema.encode(_sample_trace_data("a.py", ["int", "str"]))
+    second = schema.encode(_sample_trace_data("b.py", ["bool", "int"]))
+
+    # Known values keep their codes
+    assert first[Column.VARTYPE].cat.categories.tolist() == ["int", "str"]
+    assert second[Column.VARTYPE].cat.categories.tolist() == ["int", "str", "bool"]
+    assert schema.dtypes[Column.VARTYPE] == second[Column.VARTYPE].dtype
+
+
+def test_concatenated_trace_data_remains_compact():
+    schema = CompactTraceDataSchema()
+    first = _sample_trace_data("a.py", ["int", "str"])
+    second = _sample_trace_data("b.py", ["bool"])
+
+    actual = schema.concat([schema.encode(first), second])
+
+    expected = pd.concat([first, second], ignore_index=True)
+    assert all(isinstance(actual[column].dtype, pd.CategoricalDtype) for column in STRING_COLUMNS)
+    assert expected.equals(actual.astype(Schema.TraceData))
+
+
+def test_compact_trace_data_is_smaller():
+    trace_data = pd.concat(
+        [_sample_trace_data(f"module_{i % 10}.py", ["int", "str"] * 50) for i in range(100)],
+        ignore_index=True,
+    )
+
+    compact = CompactTraceDataSchema().encode(trace_data)
+
+    assert compact.memory_usage(deep=True).sum() * 5 < trace_data.memory_usage(deep=True).sum()
@@ -1,4 +1,5 @@
 import fractions
+import gc
 import importlib
 import os
 import sys
@@ -11,7 +12,7 @@ from common.resolver import Resolver
 
 
 @pytest.fixture
-def resolver():
+def resolver(isolated_modules):
     proj_path = pathlib.Path.cwd()
     stdlib_path = pathlib.Path(pathlib.__file__).parent
     venv_path = pathlib.Path(os.environ["VIRTUAL_ENV"])
@@ -69,3 +70,95 @@ class Outer:
 def test_proj(resolver: Resolver, ty: type, module: str, name: str):
     assert resolver.get_module_and_name(ty) == (module, name)
     assert resolver.type_lookup(module, name).__name__ == ty.__name__
+
+
+def test_module_and_name_are_cached(resolver: Resolver):
+    assert resolver.get_module_and_name(UserClass) == ("tests.common.test_resolver", "UserClass")
+    before = resolver.cache_info()
+
+    assert resolver.get_module_and_name(UserClass) == ("tests.common.test_resolver", "UserClass")
+    after = resolver.cache_info()
+
+    assert after.hits == before.hits + 1
+    assert after.misses == before.misses
+
+
+def test_cache_does_not_keep_types_alive(resolver: Resolver):
+    dynamic = type("Dynamic", (UserClass,), {})
+    assert resolver.get_module_and_name(dynamic) == ("tests.common.test_resolver", "Dynamic")
+    size = resolver.cache_info().currsize
+
+    del dynamic
+    gc.collect()
+
+    assert resolver.cache_info().currsize == size - 1
+
+
+def test_modules_are_imported_once(resolver: Resolver, monkeypatch):
+    import common.resolver
+
+    imported: list[str] = list()
+    attempt_module_lookup = common.resolver._attempt_module_lookup
+
+    def counting_module_lookup(module_name, root, lookup_path):
+        imported.append(module_name)
+        return attempt_module_lookup(module_name, root, lookup_path)
+
+    monkeypatch.setattr(common.resolver, "_attempt_module_lookup", counting_module_lookup)
+
+    assert resolver.type_lookup("tests.common.test_resolver", "UserClass").__name__ == "UserClass"
+    assert resolver.type_lookup("tests.common.test_resolver", "Outer.Inner").__name__ == "Inner"
+
+    assert imported == ["tests.common.test_resolver"]
+
+
+def test_lookup_keeps_imported_modules(resolver: Resolver):
+    fractions_module = sys.modules["fractions"]
+
+    assert resolver.type_lookup("fractions", "Fraction").__name__ == "Fraction"
+
+    assert sys.modules["fractions"] is fractions_module
+
+
+def _write_project_module(proj_path: pathlib.Path, base: str) -> None:
+    (proj_path / "shapes.py").write_text(
+        f"class Shape:\n    ...\n\nclass Polygon({base}):\n    ...\n\nclass Square(Polygon):\n    ...\n"
+    )
+
+
+def _project_resolver(proj_path: pathlib.Path, mro_cache_path: pathlib.Path) -> Resolver:
+    return Resolver(
+        proj_path=proj_path,
+        stdlib_path=pathlib.Path(pathlib.__file__).parent,
+        venv_path=pathlib.Path(os.environ["VIRTUAL_ENV"]),
+        mro_cache_path=mro_cache_path,
+    )
+
+
+def test_mro_cache_is_persisted(tmp_path: pathlib.Path, monkeypatch, isolated_modules):
+    import common.resolver
+
+    proj_path = tmp_path / "proj"
+    proj_path.mkdir()
+    mro_cache_path = tmp_path / "mro_cache.json"
+    _write_project_module(proj_path, base="Shape")
+
+    resolver = _project_resolver(proj_path, mro_cache_path)
+    expected = [("shapes", "Square"), ("shapes", "Polygon"), ("shapes", "Shape"), (None, "object")]
+    assert resolver.mro_lookup("shapes", "Square") == expected
+    resolver.save_mro_cache()
+
+    def failing_module_lookup(module_name, root, lookup_path):
+        raise AssertionError(f"{module_name} should not be imported")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(common.resolver, "_attempt_module_lookup", failing_module_lookup)
+        assert _project_resolver(proj_path, mro_cache_path).mro_lookup("shapes", "Square") == expected
+
+    # Persisted MROs of changed source files are resolved again
+    _write_project_module(proj_path, base="object")
+    assert _project_resolver(proj_path, mro_cache_path).mro_lookup("shapes", "Square") == [
+        ("shapes", "Square"),
+        ("shapes", "Polygon"),
+        (None, "object"),
+    ]
@@ -0,0 +1,111 @@
+import pathlib
+
+import pandas as pd
+
+from common import TraceDataCategory
+from common.trace_data_file import TraceDataWriter, read_file_names, read_trace_data, write_trace_data
+from constants import Column, Schema
+
+
+def _sample_trace_data(file_names: list[str]) -> pd.DataFrame:
+    rows = [
+        [file_name, None, None, f"function_{i}", i, category, f"var_{i}", None, "int"]
+        for i, (file_name, category) in enumerate(
+            (file_name, category)
+            for file_name in file_names
+            for category in (TraceDataCategory.LOCAL_VARIABLE, TraceDataCategory.CALLABLE_RETURN)
+        )
+    ]
+    return pd.DataFrame(rows, columns=list(Schema.TraceData.keys())).astype(Schema.TraceData)
+
+
+def test_trace_data_survives_round_trip(tmp_path: pathlib.Path):
+    expected = _sample_trace_data(["a.py", "b.py"])
+
+    path = tmp_path / "sample.pytype"
+    write_trace_data(path, expected)
+    actual = read_trace_data(path)
+
+    assert expected.equals(actual)
+
+
+def test_chunks_are_concatenated(tmp_path: pathlib.Path):
+    first = _sample_trace_data(["a.py"])
+    second = _sample_trace_data(["b.py"])
+
+    path = tmp_path / "sample.pytype"
+    writer = TraceDataWriter(path)
+    writer.write(first)
+    writer.write(second)
+    writer.close()
+
+    expected = pd.concat([first, second], ignore_index=True)
+    actual = read_trace_data(path)
+
+    assert expected.equals(actual)
+
+
+def test_rows_are_filtered_by_file_name_and_category(tmp_path: pathlib.Path):
+    trace_data = _sample_trace_data(["a.py", "b.py", "c.py"])
+
+    path = tmp_path / "sample.pytype"
+    write_trace_data(path, trace_data)
+    actual = read_trace_data(
+        path, file_names=["b.py"], categories=[TraceDataCategory.CALLABLE_RETURN]
+    )
+
+    assert actual.shape[0] == 1
+    assert actual[Column.FILENAME].tolist() == ["b.py"]
+    assert actual[Column.CATEGORY].tolist() == [TraceDataCategory.CALLABLE_RETURN]
+    assert (actual.dtypes == pd.Series(Schema.TraceData)).all()
+
+
+def test_pickled_trace_data_can_be_read(tmp_path: pathlib.Path):
+    expected = _sample_trace_data(["a.py", "b.py"])
+
+    path = tmp_path / "sample.pytype"
+    expected.to_pickle(path)
+
+    assert expected.equals(read_trace_data(path))
+    assert read_trace_data(path, file_names=["a.py"]).shape[0] == 2
+
+
+def test_files_are_smaller_than_pickles(tmp_path: pathlib.Path):
+    trace_data = _sample_trace_data([f"module_{i}.py" for i in range(500)])
+
+    columnar_path = tmp_path / "sample.pytype"
+    write_trace_data(columnar_path, trace_data)
+
+    pickle_path = tmp_path / "sample.pickle"
+    trace_data.to_pickle(pickle_path)
+
+    assert columnar_path.stat().st_size < pickle_path.stat().st_size
+
+
+def test_trace_data_can_be_read_compact(tmp_path: pathlib.Path):
+    expected = _sample_trace_data(["a.py", "b.py", "c.py"])
+
+    path = tmp_path / "sample.pytype"
+    write_trace_data(path, expected)
+
+    actual = read_trace_data(path, compact=True)
+    assert isinstance(actual[Column.FILENAME].dtype, pd.CategoricalDtype)
+    assert expected.equals(actual.astype(Schema.TraceData))
+
+    filtered = read_trace_data(path, file_names=["b.py"], compact=True)
+    assert filtered[Column.FILENAME].tolist() == ["b.py", "b.py"]
+    assert isinstance(filtered[Column.FILENAME].dtype, pd.CategoricalDtype)
+
+
+def test_file_names_are_read_in_order_of_occurrence(tmp_path: pathlib.Path):
+    path = tmp_path / "sample.pytype"
+    writer = TraceDataWriter(path)
+    writer.write(_sample_trace_data(["b.py", "a.py"]))
+    writer.write(_sample_trace_data(["c.py", "b.py"]))
+    writer.close()
+
+    pickled_path = tmp_path / "pickled.pytype"
+    read_trace_data(path).to_pickle(pickled_path)
+
+    assert read_file_names(path) == ["b.py", "a.py", "c.py"]
+    assert read_file_names(pickled_path) == ["b.py", "a.py", "c.py"]
@@ -1,4 +1,6 @@
 import os
+import sys
+
 import pandas as pd
 import pytest
 
@@ -13,4 +15,12 @@ if os.getenv("_PYTEST_RAISE", "0") != "0":
 
 
 pd.set_option("display.max_rows", None)
-pd.set_option("display.max_columns", None)
\ No newline at end of file
+pd.set_option("display.max_columns", None)
+
+@pytest.fixture
+def isolated_modules():
+    """Restore `sys.modules` after the test, so that modules the test (re-)imports do not leak into later tests"""
+    modules = sys.modules.copy()
+    yield
+    sys.modules.clear()
+    sys.modules.update(modules)
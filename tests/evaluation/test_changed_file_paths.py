@@ -0,0 +1,44 @@
+import pathlib
+import typing
+
+import constants
+from evaluation import _get_changed_file_paths
+
+
+def _write_projects(tmp_path: pathlib.Path, changed: set[int], amount: int) -> tuple[pathlib.Path, pathlib.Path]:
+    original, traced = tmp_path / "original", tmp_path / "traced"
+    original.mkdir()
+    traced.mkdir()
+    for i in range(amount):
+        (original / f"{i}.py").write_text("x = 1\n")
+        (traced / f"{i}.py").write_text("x: int = 1\n" if i in changed else "x = 1\n")
+    return original, traced
+
+
+def test_changed_files_are_yielded_in_order(tmp_path: pathlib.Path):
+    changed = {1, 4, 5, 9}
+    original, traced = _write_projects(tmp_path, changed, amount=10)
+
+    actual = list(_get_changed_file_paths(original, traced, (f"{i}.py" for i in range(10)), jobs=3))
+
+    assert actual == [(original / f"{i}.py", traced / f"{i}.py") for i in sorted(changed)]
+
+
+def test_relative_paths_are_not_drained_up_front(tmp_path: pathlib.Path):
+    amount, jobs = 50, 2
+    original, traced = _write_projects(tmp_path, set(range(amount)), amount)
+
+    consumed = 0
+
+    def relative_paths() -> typing.Iterator[str]:
+        nonlocal consumed
+        for i in range(amount):
+            consumed += 1
+            yield f"{i}.py"
+
+    changed_file_paths = _get_changed_file_paths(original, traced, relative_paths(), jobs=jobs)
+    assert next(changed_file_paths) == (original / "0.py", traced / "0.py")
+    assert consumed == jobs * constants.PENDING_COMPARISONS_PER_JOB
+
+    assert len(list(changed_file_paths)) == amount - 1
+    assert consumed == amount
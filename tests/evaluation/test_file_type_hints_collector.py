@@ -148,6 +148,44 @@ def test_file_type_hints_collector_returns_correct_data_for_complex_type_hints()
         assert actual_typehint == expected_typehint
 
 
+def test_file_type_hints_collector_returns_same_data_when_parsing_in_parallel():
+    test_object = FileTypeHintsCollector()
+    test_object.collect_data_from_folder(sample_folder_path, sample_folder_path, True)
+    expected_typehint_data = test_object.typehint_data
+
+    test_object = FileTypeHintsCollector(jobs=2)
+    test_object.collect_data_from_folder(sample_folder_path, sample_folder_path, True)
+    actual_typehint_data = test_object.typehint_data
+
+    assert expected_typehint_data.equals(actual_typehint_data)
+
+
+def test_file_type_hints_collector_parses_files_with_same_content_once(tmp_path, monkeypatch):
+    original_path = tmp_path / "original"
+    traced_path = tmp_path / "traced"
+    for folder_path in [original_path, traced_path]:
+        folder_path.mkdir()
+        (folder_path / "file_with_type_hints.py").write_text(
+            (sample_folder_path / "file_with_type_hints.py").read_text()
+        )
+
+    test_object = FileTypeHintsCollector()
+    test_object.collect_data_from_folder(original_path, original_path)
+    original_typehint_data = test_object.typehint_data
+
+    def fail(*_):
+        raise AssertionError("File with already parsed content has been parsed again")
+
+    monkeypatch.setattr(
+        "evaluation.file_type_hints_collector._collect_rows", fail
+    )
+    test_object.collect_data_from_folder(traced_path, traced_path)
+    traced_typehint_data = test_object.typehint_data
+
+    assert original_typehint_data.shape[0] > 0
+    assert original_typehint_data.equals(traced_typehint_data)
+
+
 def _test_with(
     expected_data_filenames: list[str],
     test_object: FileTypeHintsCollector,
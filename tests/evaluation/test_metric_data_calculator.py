@@ -193,3 +193,27 @@ def test_metric_calculator_returns_correct_completeness_and_correctness():
 
     assert abs(total_completeness - expected_completeness) < 1e-8
     assert abs(total_correctness - expected_correctness) < 1e-8
+
+
+def test_metric_calculator_matches_duplicate_rows_by_occurrence():
+    row = ["filename", "ClassName", "function_name", 0, TraceDataCategory.CALLABLE_PARAMETER, "parameter"]
+    sample_original_data = pd.DataFrame(
+        [row + [int.__name__], row + [int.__name__]], columns=Schema.TypeHintData.keys()
+    )
+    sample_generated_data = pd.DataFrame(
+        [row + [str.__name__], row + [int.__name__]], columns=Schema.TypeHintData.keys()
+    )
+    expected_data = pd.DataFrame(
+        [
+            row + [int.__name__, int.__name__, True, True],
+            row + [int.__name__, str.__name__, True, False],
+        ],
+        columns=Schema.Metrics.keys(),
+    ).astype(Schema.Metrics)
+
+    test_object = MetricDataCalculator()
+    actual_data = test_object.get_metric_data(sample_original_data, sample_generated_data)
+
+    print(actual_data)
+
+    assert expected_data.equals(actual_data)
@@ -1,3 +1,5 @@
+import pytest
+
 from evaluation.normalize_types import normalize_type
 
 
@@ -20,3 +22,23 @@ def test_union_normalized_returns_correct_values():
         print("Actual: " + actual)
         print("Expected: " + expected)
         assert actual == expected
+
+
+def test_type_with_inner_types_normalized_returns_correct_values():
+    values_to_test = [
+        ["list[ int ]", "list[int]"],
+        ["dict[str,int|None]", "dict[str, None | int]"],
+        ["tuple[int, ...]", "tuple[int, ...]"],
+        ["list[int] | list[int]", "list[int]"],
+    ]
+
+    for input, expected in values_to_test:
+        assert normalize_type(input) == expected
+
+
+def test_invalid_type_hints_raise_error():
+    values_to_test = ["list[int]]", "Union[int]", "Optional[int]x", "Union[int][str]"]
+
+    for input in values_to_test:
+        with pytest.raises(ValueError):
+            normalize_type(input)
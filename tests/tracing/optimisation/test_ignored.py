@@ -6,7 +6,7 @@ import pandas as pd
 from common import TraceDataCategory
 
 from tracing.tracer import Tracer
-from constants import Schema
+from constants import Column, Schema
 
 # NOTE: Ignored has been made defunct;
 # NOTE: the tracer will ignore the pathlib calls by itself
@@ -122,3 +122,28 @@ def test_pathlib_calls_are_not_traced():
     logging.debug(f"expected: \n{expected}")
     logging.debug(f"actual: \n{df}")
     logging.debug(f"diff: \n{expected.compare(df)}")
+
+
+def negate(v):
+    return -v
+
+
+def call_back_from_standard_library():
+    import heapq
+
+    smallest = heapq.nsmallest(2, [3, 1, 2], key=negate)
+    return smallest
+
+
+def test_callbacks_from_standard_library_are_traced():
+    tracer = Tracer(proj_path, stdlib_path, venv_path)
+
+    tracer.start_trace()
+    call_back_from_standard_library()
+    tracer.stop_trace()
+
+    df = tracer.trace_data
+    print(df)
+
+    assert "negate" in df[Column.FUNCNAME].values
+    assert not df[Column.FILENAME].str.contains("heapq").any()
@@ -2,10 +2,10 @@ import logging
 import os
 import pathlib
 
-
 import pandas as pd
-from common import TraceDataCategory
+from common import TraceDataCategory, read_trace_data
 
+from tracing.sink import TraceDataFileSink
 from tracing.tracer import Tracer
 from constants import Schema
 
@@ -31,6 +31,16 @@ def skippable_looping_with_skipped_variable():
     return r
 
 
+def looping_with_changing_types():
+    s = 0
+    for x in range(20):
+        a = x if x < 3 else str(x)
+        c = x if x < 3 else bytes(x)
+        b = x if x < 6 else float(x)
+        s += len(str(a)) + int(b)
+    return s
+
+
 proj_path = pathlib.Path.cwd()
 stdlib_path = pathlib.Path(pathlib.__file__).parent
 venv_path = pathlib.Path(os.environ["VIRTUAL_ENV"])
@@ -197,3 +207,27 @@ def test_variable_is_not_traced():
     logging.debug(f"expected: \n{expected}")
     logging.debug(f"actual: \n{df}")
     assert expected.equals(df)
+
+
+
+def test_type_changes_are_noticed_while_chunks_are_flushed(tmp_path: pathlib.Path):
+    in_memory = Tracer(proj_path, stdlib_path, venv_path, apply_opts=True)
+    in_memory.start_trace()
+    looping_with_changing_types()
+    in_memory.stop_trace()
+
+    # Flushing empties the buffer; the two rows stored in the iteration at which types change
+    # would otherwise lead to the same amount of rows in it as at the start of that iteration
+    sink = TraceDataFileSink(tmp_path / "looping.pytype")
+    streaming = Tracer(
+        proj_path, stdlib_path, venv_path, apply_opts=True, sink=sink, chunk_size=3
+    )
+    streaming.start_trace()
+    looping_with_changing_types()
+    streaming.stop_trace()
+    sink.close()
+
+    expected = in_memory.trace_data.reset_index(drop=True)
+    actual = read_trace_data(sink.path)
+
+    assert expected.equals(actual)
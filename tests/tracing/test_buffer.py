@@ -0,0 +1,97 @@
+import pathlib
+
+import pandas as pd
+
+from constants import Column, Schema
+from tracing.batch import TraceBatch
+from tracing.buffer import TraceDataBuffer
+
+
+def _sample_batch() -> TraceBatch:
+    batch = TraceBatch(
+        file_name=pathlib.Path("tests", "tracing", "test_buffer.py"),
+        class_module=None,
+        class_name=None,
+        function_name="sample",
+        line_number=3,
+    )
+    return (
+        batch.parameters({"a": (None, "int"), "b": ("pathlib", "Path")})
+        .local_variables(line_number=4, names2types={"c": (None, "str")})
+        .returns({"sample": (None, "NoneType")})
+    )
+
+
+def test_empty_buffer_adheres_to_schema():
+    buffer = TraceDataBuffer()
+
+    expected = pd.DataFrame(columns=Schema.TraceData.keys()).astype(Schema.TraceData)
+    actual = buffer.to_frame()
+
+    assert len(buffer) == 0
+    assert expected.equals(actual)
+
+
+def test_buffer_matches_batch_frame():
+    buffer = TraceDataBuffer()
+    stored = buffer.extend(_sample_batch().to_rows())
+
+    expected = _sample_batch().to_frame()
+    actual = buffer.to_frame()
+
+    assert stored == len(buffer) == 4
+    assert expected.equals(actual)
+
+
+def test_duplicates_are_rejected():
+    buffer = TraceDataBuffer()
+    buffer.extend(_sample_batch().to_rows())
+    stored = buffer.extend(_sample_batch().to_rows())
+
+    expected = _sample_batch().to_frame()
+    actual = buffer.to_frame()
+
+    assert stored == 0
+    assert len(buffer) == 4
+    assert expected.equals(actual)
+
+
+def test_rows_of_the_last_chunk_are_rejected():
+    buffer = TraceDataBuffer()
+    buffer.extend(_sample_batch().to_rows())
+    buffer.take()
+
+    assert buffer.extend(_sample_batch().to_rows()) == 0
+    assert len(buffer) == 0
+
+    # Only the rows of the last chunk are remembered, so rows of older chunks are stored again
+    buffer.take()
+    stored = buffer.extend(_sample_batch().to_rows())
+
+    assert stored == len(buffer) == 4
+    assert _sample_batch().to_frame().equals(buffer.to_frame())
+
+
+def test_taken_chunks_only_hold_their_own_strings():
+    buffer = TraceDataBuffer()
+    buffer.extend(_sample_batch().to_rows())
+    buffer.take()
+
+    row = next(iter(_sample_batch().to_rows()))
+    buffer.append(row[:-1] + ("float",))
+
+    assert "Path" not in buffer._strings
+    assert "float" in buffer._strings
+    assert buffer.take()[Column.VARTYPE].tolist() == ["float"]
+
+
+def test_rows_accepted_does_not_decrease_when_taking():
+    buffer = TraceDataBuffer()
+    buffer.extend(_sample_batch().to_rows())
+    buffer.take()
+
+    assert len(buffer) == 0
+    assert buffer.rows_accepted == 4
+
+    buffer.extend(_sample_batch().to_rows())
+    assert buffer.rows_accepted == 4
@@ -0,0 +1,100 @@
+import os
+import pathlib
+
+from constants import Column
+from tracing.tracer import Tracer
+
+
+class Outer:
+    class Inner:
+        def method(self):
+            return 1
+
+    @staticmethod
+    def static(a):
+        return a
+
+    @classmethod
+    def clazz(cls, a):
+        return a
+
+
+def module_level_function():
+    return Outer.static(Outer.Inner()).method() + Outer.clazz(2) + Outer.Inner().method()
+
+
+proj_path = pathlib.Path.cwd()
+stdlib_path = pathlib.Path(pathlib.__file__).parent
+venv_path = pathlib.Path(os.environ["VIRTUAL_ENV"])
+
+
+def test_functions_are_associated_with_their_classes():
+    tracer = Tracer(proj_path, stdlib_path, venv_path)
+
+    with tracer.active_trace():
+        module_level_function()
+
+    df = tracer.trace_data
+    print(df)
+
+    functions = df[df[Column.FUNCNAME] == module_level_function.__name__]
+    assert functions[Column.CLASS].isna().all()
+
+    classes = df.groupby(Column.FUNCNAME)[Column.CLASS].unique()
+    assert list(classes["static"]) == ["Outer"]
+    assert list(classes["clazz"]) == ["Outer"]
+    assert list(classes["method"]) == ["Outer.Inner"]
+
+
+def attached(self):
+    return 2
+
+
+def test_classes_are_found_after_changing_after_indexing():
+    global Outer
+    tracer = Tracer(proj_path, stdlib_path, venv_path)
+    original = Outer
+
+    class Rebound:
+        def method(self):
+            return 3
+
+    try:
+        with tracer.active_trace():
+            module_level_function()
+
+            # Neither changes the amount of globals of this module
+            Outer.attached = attached
+            Outer().attached()
+            Outer = Rebound
+            Outer().method()
+    finally:
+        Outer = original
+        del original.attached
+
+    df = tracer.trace_data
+    print(df)
+
+    classes = df.groupby(Column.FUNCNAME)[Column.CLASS].unique()
+    assert list(classes["attached"]) == ["Outer"]
+    assert set(classes["method"]) == {"Outer.Inner", "test_classes_are_found_after_changing_after_indexing.<locals>.Rebound"}
+
+
+def test_functions_without_class_are_searched_for_once(monkeypatch):
+    import tracing.tracer
+
+    searched: list[str] = list()
+    search_class_in_namespace = tracing.tracer._search_class_in_namespace
+
+    def counting_search(namespace, code):
+        searched.append(code.co_name)
+        return search_class_in_namespace(namespace, code)
+
+    monkeypatch.setattr(tracing.tracer, "_search_class_in_namespace", counting_search)
+
+    tracer = Tracer(proj_path, stdlib_path, venv_path)
+    with tracer.active_trace():
+        for _ in range(3):
+            module_level_function()
+
+    assert searched.count(module_level_function.__name__) == 1
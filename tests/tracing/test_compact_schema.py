@@ -0,0 +1,43 @@
+import os
+import pathlib
+
+from common import CompactTraceDataSchema
+from common.compact_schema import is_compact
+from constants import Schema
+from tracing.tracer import Tracer
+
+
+def looping(n):
+    total = 0
+    for i in range(n):
+        value = i if i % 2 else str(i)
+        total += len(str(value))
+    return total
+
+
+def formatting(n):
+    text = f"{n:>4}"
+    return text.strip()
+
+
+proj_path = pathlib.Path.cwd()
+stdlib_path = pathlib.Path(pathlib.__file__).parent
+venv_path = pathlib.Path(os.environ["VIRTUAL_ENV"])
+
+
+def _trace(tracer: Tracer) -> None:
+    for workload in (looping, formatting):
+        tracer.start_trace()
+        workload(10)
+        tracer.stop_trace()
+
+
+def test_compact_trace_data_matches_trace_data():
+    expected = Tracer(proj_path, stdlib_path, venv_path)
+    _trace(expected)
+
+    actual = Tracer(proj_path, stdlib_path, venv_path, compact_schema=CompactTraceDataSchema())
+    _trace(actual)
+
+    assert is_compact(actual.trace_data)
+    assert expected.trace_data.equals(actual.trace_data.astype(Schema.TraceData))
@@ -0,0 +1,175 @@
+import heapq
+import os
+import pathlib
+import sys
+
+import pandas as pd
+import pytest
+
+from constants import Column
+from tracing.tracer import Tracer
+from tracing.monitoring import MonitoringTracer
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 12), reason="sys.monitoring requires Python 3.12"
+)
+
+
+class Counter:
+    def __init__(self, start):
+        self.count = start
+
+    def increment(self, by):
+        self.count = self.count + by
+        return self.count
+
+
+def negate(v):
+    return -v
+
+
+def countdown(n):
+    while n > 0:
+        yield n
+        n -= 1
+
+
+def raises(v):
+    value = str(v)
+    raise ValueError(value)
+
+
+def workload():
+    counter = Counter(0)
+    for i in range(20):
+        total = counter.increment(i)
+
+    smallest = heapq.nsmallest(2, [3, 1, 2], key=negate)
+    counted = list(countdown(3))
+
+    try:
+        raises(1)
+    except ValueError as e:
+        error = e
+
+    return total
+
+
+proj_path = pathlib.Path.cwd()
+stdlib_path = pathlib.Path(pathlib.__file__).parent
+venv_path = pathlib.Path(os.environ["VIRTUAL_ENV"])
+
+
+@pytest.mark.parametrize("apply_opts", [False, True])
+def test_matches_settrace_backend(apply_opts: bool):
+    settrace_tracer = Tracer(proj_path, stdlib_path, venv_path, apply_opts=apply_opts)
+    settrace_tracer.start_trace()
+    workload()
+    settrace_tracer.stop_trace()
+
+    monitoring_tracer = MonitoringTracer(proj_path, stdlib_path, venv_path, apply_opts=apply_opts)
+    monitoring_tracer.start_trace()
+    workload()
+    monitoring_tracer.stop_trace()
+
+    expected = settrace_tracer.trace_data
+    actual = monitoring_tracer.trace_data
+    print(actual)
+
+    assert not actual.empty
+    assert expected.equals(actual)
+
+
+def test_foreign_code_and_tracer_are_not_traced():
+    tracer = MonitoringTracer(proj_path, stdlib_path, venv_path)
+    tracer.start_trace()
+    workload()
+    tracer.stop_trace()
+
+    actual = tracer.trace_data
+
+    assert "negate" in actual[Column.FUNCNAME].values
+    assert not actual[Column.FILENAME].str.contains("heapq").any()
+    assert not actual[Column.CLASS].isin([MonitoringTracer.__name__]).any()
+
+
+def test_tracer_can_be_reused():
+    tracer = MonitoringTracer(proj_path, stdlib_path, venv_path, apply_opts=True)
+
+    tracer.start_trace()
+    workload()
+    tracer.stop_trace()
+    first = tracer.trace_data.copy()
+
+    tracer.start_trace()
+    workload()
+    tracer.stop_trace()
+    second = tracer.trace_data
+
+    assert first.equals(second)
+    for tool_id in MonitoringTracer.TOOL_IDS:
+        assert sys.monitoring.get_tool(tool_id) is None
+
+
+def _settrace_trace_data() -> pd.DataFrame:
+    tracer = Tracer(proj_path, stdlib_path, venv_path)
+    tracer.start_trace()
+    workload()
+    tracer.stop_trace()
+    return tracer.trace_data
+
+
+@pytest.mark.parametrize("held", [(3,), (3, 4)])
+def test_falls_back_once_tool_ids_are_in_use(held: tuple[int, ...]):
+    for tool_id in held:
+        sys.monitoring.use_tool_id(tool_id, "other")
+
+    try:
+        tracer = MonitoringTracer(proj_path, stdlib_path, venv_path)
+        tracer.start_trace()
+        tool_id = tracer.tool_id
+        workload()
+        tracer.stop_trace()
+    finally:
+        for tool_id_held in held:
+            sys.monitoring.free_tool_id(tool_id_held)
+
+    if held == (3,):
+        assert tool_id == 4
+    else:
+        assert tool_id is None
+    assert _settrace_trace_data().equals(tracer.trace_data)
+
+
+def loop(n):
+    total = 0
+    for i in range(n):
+        total = total + i
+    return total
+
+
+def test_lines_disabled_by_other_tools_stay_disabled():
+    other = 5
+    lines: list[int] = list()
+
+    def on_line(code, line_number):
+        lines.append(line_number)
+        return sys.monitoring.DISABLE
+
+    sys.monitoring.use_tool_id(other, "other")
+    sys.monitoring.register_callback(other, sys.monitoring.events.LINE, on_line)
+    sys.monitoring.set_local_events(other, loop.__code__, sys.monitoring.events.LINE)
+
+    try:
+        tracer = MonitoringTracer(proj_path, stdlib_path, venv_path, apply_opts=True)
+        tracer.start_trace()
+        loop(100)
+        tracer.stop_trace()
+
+        disabled = len(lines)
+        loop(100)
+        assert len(lines) == disabled
+    finally:
+        sys.monitoring.set_local_events(other, loop.__code__, sys.monitoring.events.NO_EVENTS)
+        sys.monitoring.register_callback(other, sys.monitoring.events.LINE, None)
+        sys.monitoring.free_tool_id(other)
@@ -0,0 +1,79 @@
+import os
+import pathlib
+
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from common import read_trace_data
+from tracing.sink import TraceDataFileSink
+from tracing.tracer import Tracer
+
+
+def looping(n):
+    total = 0
+    for i in range(n):
+        value = i if i % 2 else str(i)
+        total += len(str(value))
+    return total
+
+
+proj_path = pathlib.Path.cwd()
+stdlib_path = pathlib.Path(pathlib.__file__).parent
+venv_path = pathlib.Path(os.environ["VIRTUAL_ENV"])
+
+
+class RecordingFileSink(TraceDataFileSink):
+    def __init__(self, path: pathlib.Path):
+        super().__init__(path)
+        self.chunks: list[pd.DataFrame] = list()
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        super().write(chunk)
+        self.chunks.append(chunk)
+
+
+def test_chunks_are_flushed_while_tracing(tmp_path: pathlib.Path):
+    in_memory = Tracer(proj_path, stdlib_path, venv_path)
+    in_memory.start_trace()
+    looping(10)
+    in_memory.stop_trace()
+
+    sink = RecordingFileSink(tmp_path / "looping.pytype")
+    streaming = Tracer(proj_path, stdlib_path, venv_path, sink=sink, chunk_size=2)
+    streaming.start_trace()
+    looping(10)
+    streaming.stop_trace()
+    sink.close()
+
+    expected = in_memory.trace_data
+    actual = read_trace_data(sink.path)
+
+    # Chunks are only deduplicated against the previous one, the remaining duplicates are dropped on read
+    written = pd.concat(sink.chunks, ignore_index=True)
+
+    assert streaming.trace_data.empty
+    assert sink.rows_written == len(written) >= len(expected)
+    assert expected.reset_index(drop=True).equals(actual)
+    assert sink.digest == int(hash_pandas_object(written).sum()) % 2**64
+
+
+def test_rows_are_not_written_again_by_later_traces(tmp_path: pathlib.Path):
+    sink = TraceDataFileSink(tmp_path / "looping.pytype")
+    tracer = Tracer(proj_path, stdlib_path, venv_path, sink=sink, chunk_size=2)
+
+    for _ in range(2):
+        tracer.start_trace()
+        looping(10)
+        tracer.stop_trace()
+    sink.close()
+
+    actual = read_trace_data(sink.path)
+    assert not actual.duplicated().any()
+
+
+def test_empty_sink_is_readable(tmp_path: pathlib.Path):
+    sink = TraceDataFileSink(tmp_path / "empty.pytype")
+    sink.close()
+
+    actual = read_trace_data(sink.path)
+    assert actual.empty
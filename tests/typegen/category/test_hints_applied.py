@@ -5,6 +5,8 @@ import libcst.metadata as metadata
 
 import pandas as pd
 
+from constants import Column
+
 from typegen.strategy import hinter
 from typegen.strategy import remover
 from typegen.strategy import inline
@@ -74,3 +76,40 @@ def test_category_hinting(
         raise Exception(
             f"Reinserted AST failed to pass checks! - Config: {provider.__qualname__}, {chckr.__class__.__name__}, {rmvr.__class__.__name__}"
         ) from e
+
+
+@pytest.mark.parametrize(
+    argnames=["chckr", "rmvr"],
+    argvalues=[
+        (checker.ParameterHintChecker(), remover.ParameterHintRemover()),
+        (checker.ReturnHintChecker(), remover.ReturnHintRemover()),
+        (checker.AssignHintChecker(), remover.AssignHintRemover()),
+    ],
+)
+def test_pytypes_hinter_reinserts_hints(
+    typed: cst.Module,
+    traced: pd.DataFrame,
+    chckr: cst.CSTVisitor,
+    rmvr: cst.CSTTransformer,
+):
+    removed = metadata.MetadataWrapper(typed).visit(rmvr)
+
+    context = codemod.CodemodContext(filename="x.py", full_module_name="x", full_package_name="x")
+    reinserted = metadata.MetadataWrapper(removed).visit(
+        hinter.PyTypesTypeHintApplier(context=context, traced=traced)
+    )
+
+    metadata.MetadataWrapper(reinserted).visit(chckr)
+
+
+def test_pytypes_hinter_rejects_multiple_hints(typed: cst.Module, traced: pd.DataFrame):
+    duplicated = traced[traced[Column.VARNAME] == "method"].assign(**{Column.VARTYPE: "str"})
+    traced = pd.concat([traced, duplicated], ignore_index=True)
+
+    removed = metadata.MetadataWrapper(typed).visit(remover.ReturnHintRemover())
+
+    context = codemod.CodemodContext(filename="x.py", full_module_name="x", full_package_name="x")
+    with pytest.raises(ValueError, match="more than one type hint for method"):
+        metadata.MetadataWrapper(removed).visit(
+            hinter.PyTypesTypeHintApplier(context=context, traced=traced)
+        )
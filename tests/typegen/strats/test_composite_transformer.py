@@ -0,0 +1,79 @@
+import pathlib
+
+import libcst as cst
+import libcst.codemod as codemod
+
+from tracing.batch import TraceBatch
+from typegen.strategy.composite import CompositeTransformer
+from typegen.strategy.hinter import PyTypesTypeHintApplier
+from typegen.strategy.remover import HintRemover
+
+
+class RecordingTransformer(cst.CSTTransformer):
+    def __init__(self, skipped: type[cst.CSTNode]) -> None:
+        super().__init__()
+        self.skipped = skipped
+        self.visited: list[str] = list()
+        self.left: list[str] = list()
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        self.visited.append(type(node).__name__)
+        return not isinstance(node, self.skipped)
+
+    def on_leave(self, original_node, updated_node):
+        self.left.append(type(original_node).__name__)
+        return updated_node
+
+
+def test_composite_transformer_hints_by_lines_of_original_code():
+    code = """def f(a: str, b: int = 0):
+    c: int
+    d: bool = True
+    e = (
+        d
+    )
+    return e
+"""
+
+    expected_code = """def f(a: int, b: int = 0) -> bool:
+    d: bool = True
+    e: bool = (
+        d
+    )
+    return e
+"""
+
+    traced = (
+        TraceBatch(
+            file_name=pathlib.Path("x.py"),
+            class_module=None,
+            class_name=None,
+            function_name="f",
+            line_number=1,
+        )
+        .parameters(names2types={"a": (None, "int"), "b": (None, "int")})
+        .local_variables(line_number=3, names2types={"d": (None, "bool")})
+        .local_variables(line_number=4, names2types={"e": (None, "bool")})
+        .returns(names2types={"f": (None, "bool")})
+        .to_frame()
+    )
+
+    context = codemod.CodemodContext(filename="x.py", full_module_name="x", full_package_name="x")
+    transformer = CompositeTransformer(
+        (HintRemover(), PyTypesTypeHintApplier(context=context, traced=traced))
+    )
+    hinted = cst.MetadataWrapper(cst.parse_module(code)).visit(transformer)
+
+    assert expected_code == hinted.code
+
+
+def test_composite_transformer_skips_subtrees_per_transformer():
+    skipping = RecordingTransformer(skipped=cst.FunctionDef)
+    descending = RecordingTransformer(skipped=cst.Name)
+    module = cst.parse_module("def f(): pass\n")
+    module.visit(CompositeTransformer((skipping, descending)))
+
+    assert skipping.visited == ["Module", "FunctionDef"]
+    assert skipping.left == ["FunctionDef", "Module"]
+    assert "Pass" in descending.visited
+    assert descending.left[-2:] == ["FunctionDef", "Module"]
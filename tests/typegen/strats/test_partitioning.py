@@ -0,0 +1,64 @@
+import pathlib
+import typing
+
+import libcst as cst
+import libcst.codemod as codemod
+import pandas as pd
+
+from constants import Column
+from tracing.batch import TraceBatch
+from typegen.strategy import AnnotationGeneratorStrategy, AnnotationGenStratApplier
+from typegen.strategy.hinter import AnnotationProvider
+
+
+class RecordingProvider(AnnotationProvider):
+    received: list[pd.DataFrame] = list()
+
+    def __init__(self, context: codemod.CodemodContext, traced: pd.DataFrame) -> None:
+        super().__init__(context=context, traced=traced)
+        RecordingProvider.received.append(traced)
+
+
+class ProviderOnlyGenerator(AnnotationGeneratorStrategy):
+    ident = "provider-only"
+
+    def transformers(self) -> typing.Iterator[cst.CSTTransformer]:
+        yield self.provider(context=self.context, traced=self.traced)
+
+
+def _trace_data(file_names: list[str]) -> pd.DataFrame:
+    return pd.concat(
+        [
+            TraceBatch(
+                file_name=pathlib.Path(file_name),
+                class_module=None,
+                class_name=None,
+                function_name="f",
+                line_number=1,
+            )
+            .returns(names2types={"f": (None, "int")})
+            .to_frame()
+            for file_name in file_names
+        ],
+        ignore_index=True,
+    )
+
+
+def test_providers_receive_the_trace_data_of_their_file():
+    traced = _trace_data(["a.py", "b.py", "a.py", "c.py"])
+    applier = AnnotationGenStratApplier(
+        context=codemod.CodemodContext(),
+        generator_strategy=ProviderOnlyGenerator,
+        annotation_provider=RecordingProvider,
+        traced=traced,
+    )
+
+    RecordingProvider.received.clear()
+    for file_name in ("a.py", "c.py", "missing.py"):
+        applier.context = codemod.CodemodContext(filename=file_name)
+        applier.transform_module(cst.parse_module("def f(): return 1\n"))
+
+    assert len(RecordingProvider.received) == 3
+    for file_name, received in zip(("a.py", "c.py", "missing.py"), RecordingProvider.received):
+        expected = traced[traced[Column.FILENAME] == file_name]
+        assert expected.equals(received)
@@ -0,0 +1,214 @@
+import libcst as cst
+from typegen.strategy.stub import CSTStubTransformer
+
+
+def test_cst_stub_transformer_keeps_signatures_annotations_and_attributes():
+    code = """from __future__ import annotations
+from typing import TYPE_CHECKING, List
+if TYPE_CHECKING:
+    from pathlib import Path
+
+limit: int = 5
+name = "value"
+unknown = compute()
+
+
+def f(a: int, b: str = "x", *args: int, c: Path = None, **kwargs) -> List[int]:
+    \"\"\"Docstring\"\"\"
+    return [a]
+
+
+def g(s, /, t):
+    print(s, t)
+
+
+class A(Base, metaclass=Meta):
+    counter: int = 0
+
+    def __init__(self, a: int) -> None:
+        self.a: int = a
+        self.flag = True
+        self.other = a
+
+    @property
+    def p(self) -> str:
+        self.cached: str = ""
+        return self.cached
+
+    class Inner:
+        pass
+
+
+def abstract():
+    raise NotImplementedError
+"""
+
+    expected_code = """from typing import List
+from pathlib import Path
+from _typeshed import Incomplete
+
+limit: int
+name: str
+unknown: Incomplete
+
+def f(a: int, b: str = ..., *args: int, c: Path = ..., **kwargs) -> List[int]: ...
+def g(s, /, t) -> None: ...
+
+class A(Base, metaclass=Meta):
+    counter: int
+    a: int
+    flag: bool
+    other: Incomplete
+    def __init__(self, a: int) -> None: ...
+    cached: str
+    @property
+    def p(self) -> str: ...
+    class Inner: ...
+
+def abstract(): ...
+"""
+
+    ast = cst.parse_module(source=code)
+    stub = ast.visit(CSTStubTransformer())
+
+    assert expected_code == stub.code
+
+
+def test_cst_stub_transformer_declares_variables_once():
+    code = """a: float; b: int; (a, b) = 1.0, 2
+f: int; f = y = 10
+y: str
+"""
+
+    expected_code = """a: float
+b: int
+f: int
+y: int
+"""
+
+    ast = cst.parse_module(source=code)
+    stub = ast.visit(CSTStubTransformer())
+
+    assert expected_code == stub.code
+
+
+def test_cst_stub_transformer_lifts_declarations_out_of_blocks():
+    code = """try:
+    import json
+except ImportError:
+    import pickle as json
+    fallback = True
+else:
+    fast = 1
+finally:
+    done = True
+
+try:
+    grouped = 1
+except* ValueError:
+    fallback = False
+
+with suppress(Exception): loaded = "x"
+
+for i in range(3):
+    looped = 1
+else:
+    after = 2
+
+while False:
+    spun = 1.0
+else:
+    stopped = None
+
+if sys.platform == "win32":
+    with suppress(Exception):
+        separator = "\\\\"
+
+
+class A:
+    for _ in range(3):
+        counter: int = 0
+"""
+
+    expected_code = """import json
+import pickle as json
+from _typeshed import Incomplete
+
+fallback: bool
+fast: int
+done: bool
+grouped: int
+loaded: str
+looped: int
+after: int
+spun: float
+stopped: Incomplete
+
+if sys.platform == "win32":
+    separator: str
+
+class A:
+    counter: int
+"""
+
+    ast = cst.parse_module(source=code)
+    stub = ast.visit(CSTStubTransformer())
+
+    assert expected_code == stub.code
+
+
+def test_cst_stub_transformer_keeps_type_aliases_and_type_variables():
+    code = """import typing
+from typing import NewType, Optional, TypeVar
+
+T = typing.TypeVar("T")
+P = typing.ParamSpec("P")
+UserId = NewType("UserId", int)
+Alias = Optional[int]
+Pair = tuple[T, T]
+Number = int | float | None
+Path = pathlib.Path
+Point = typing.NamedTuple("Point", [("x", int), ("y", int)])
+Movie = typing.TypedDict("Movie", {"title": str})
+nothing = None
+computed = compute()
+
+
+def f(a: Alias, b: T) -> Pair:
+    return b, b
+
+
+class A(typing.Generic[T]):
+    Key = str
+
+    def g(self, key: Key) -> T:
+        ...
+"""
+
+    expected_code = """import typing
+from typing import NewType, Optional, TypeVar
+from _typeshed import Incomplete
+
+T = typing.TypeVar("T")
+P = typing.ParamSpec("P")
+UserId = NewType("UserId", int)
+Alias = Optional[int]
+Pair = tuple[T, T]
+Number = int | float | None
+Path = pathlib.Path
+Point = typing.NamedTuple("Point", [("x", int), ("y", int)])
+Movie = typing.TypedDict("Movie", {"title": str})
+nothing: Incomplete
+computed: Incomplete
+
+def f(a: Alias, b: T) -> Pair: ...
+
+class A(typing.Generic[T]):
+    Key = str
+    def g(self, key: Key) -> T: ...
+"""
+
+    ast = cst.parse_module(source=code)
+    stub = ast.visit(CSTStubTransformer())
+
+    assert expected_code == stub.code
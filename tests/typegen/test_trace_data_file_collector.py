@@ -1,7 +1,14 @@
 import pathlib
 import pandas as pd
+import pytest
+
+from common import CompactTraceDataSchema
+from common.compact_schema import is_compact
+from common.trace_data_file import write_trace_data
+import constants
 from constants import Column, Schema
-from typegen import TraceDataFileCollector
+from typegen import TraceDataFileCollector, trace_data_file_collector
+from typegen.trace_data_index import TraceDataIndex
 
 cwd = pathlib.Path.cwd() / "tests" / "resource" / "external" / "PyTypes_BinaryFiles" / "sample_trace_data_files"
 
@@ -34,3 +41,119 @@ def test_if_test_object_collects_generated_trace_data_in_folder_it_returns_corre
 
     assert actual_trace_data.shape[0] == 14
     assert expected_trace_data.equals(actual_trace_data)
+
+
+def _write_sample_trace_data_files(folder: pathlib.Path, amount: int) -> None:
+    for i in range(amount):
+        trace_data = pd.DataFrame(
+            [[f"file_{i}.py", None, None, "function", i, 1, "var", None, "int"]],
+            columns=list(Schema.TraceData.keys()),
+        ).astype(Schema.TraceData)
+        subfolder = folder / f"sub_{i % 3}"
+        subfolder.mkdir(exist_ok=True)
+        write_trace_data(subfolder / f"trace_{i}.pytype", trace_data)
+
+    # Invalid files are skipped
+    (folder / "sub_0" / "broken.pytype").write_text("not trace data")
+
+
+@pytest.mark.parametrize(
+    ["jobs", "use_processes"],
+    [(2, False), (4, False), (2, True)],
+)
+def test_concurrent_collection_matches_sequential_collection(
+    tmp_path: pathlib.Path, jobs: int, use_processes: bool
+):
+    _write_sample_trace_data_files(tmp_path, 50)
+
+    sequential = TraceDataFileCollector()
+    sequential.collect_data(tmp_path, True)
+
+    concurrent = TraceDataFileCollector(jobs=jobs, use_processes=use_processes)
+    concurrent.collect_data(tmp_path, True)
+
+    assert sequential.trace_data.shape[0] == 50
+    assert sequential.trace_data.equals(concurrent.trace_data)
+
+
+def _collect(folder: pathlib.Path, **kwargs) -> pd.DataFrame:
+    collector = TraceDataFileCollector(**kwargs)
+    collector.collect_data(folder, True)
+    return collector.trace_data
+
+
+def test_incremental_collection_only_reads_changed_files(tmp_path: pathlib.Path, monkeypatch):
+    _write_sample_trace_data_files(tmp_path, 20)
+
+    read_files: list[pathlib.Path] = list()
+    original_read = trace_data_file_collector.read_trace_data
+
+    def counting_read(file_path, *args, **kwargs):
+        read_files.append(file_path)
+        return original_read(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(trace_data_file_collector, "read_trace_data", counting_read)
+
+    # First collection reads every file, including the broken one
+    first = _collect(tmp_path, incremental=True)
+    assert len(read_files) == 21
+    assert first.equals(_collect(tmp_path))
+
+    # Nothing has changed
+    read_files.clear()
+    second = _collect(tmp_path, incremental=True)
+    assert len(read_files) == 0
+    assert second.equals(first)
+
+    # Change one file, remove another and add a new one
+    changed = tmp_path / "sub_1" / "trace_1.pytype"
+    write_trace_data(changed, pd.concat([original_read(changed)] * 2, ignore_index=True))
+    (tmp_path / "sub_2" / "trace_2.pytype").unlink()
+    write_trace_data(tmp_path / "sub_0" / "trace_new.pytype", original_read(changed))
+
+    read_files.clear()
+    third = _collect(tmp_path, incremental=True)
+    assert sorted(read_files) == sorted([changed, tmp_path / "sub_0" / "trace_new.pytype"])
+    assert third.equals(_collect(tmp_path))
+    assert third.shape[0] == 20 - 1 + 1 + 2
+
+
+@pytest.mark.parametrize("corrupt", [False, True])
+def test_incremental_collection_reads_files_again_once_store_is_lost(tmp_path: pathlib.Path, corrupt: bool):
+    _write_sample_trace_data_files(tmp_path, 10)
+
+    first = _collect(tmp_path, incremental=True)
+    assert first.shape[0] == 10
+
+    store_path = tmp_path / constants.TRACE_DATA_INDEX_FOLDER_NAME / TraceDataIndex.STORE_FILE_NAME
+    if corrupt:
+        store_path.write_text("not a store")
+    else:
+        store_path.unlink()
+
+    for _ in range(2):
+        assert first.equals(_collect(tmp_path, incremental=True))
+
+
+def test_incremental_collection_filters(tmp_path: pathlib.Path):
+    _write_sample_trace_data_files(tmp_path, 10)
+
+    for _ in range(2):
+        actual = _collect(tmp_path, incremental=True, file_names=["file_3.py", "file_4.py"])
+        expected = _collect(tmp_path, file_names=["file_3.py", "file_4.py"])
+
+        assert actual.shape[0] == 2
+        assert expected.equals(actual)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_compact_collection_matches_collection(tmp_path: pathlib.Path, incremental: bool):
+    _write_sample_trace_data_files(tmp_path, 20)
+
+    expected = _collect(tmp_path)
+    actual = _collect(
+        tmp_path, jobs=2, incremental=incremental, compact_schema=CompactTraceDataSchema()
+    )
+
+    assert is_compact(actual)
+    assert expected.equals(actual.astype(Schema.TraceData))
@@ -0,0 +1,36 @@
+import pathlib
+import pickle
+
+import pandas as pd
+
+from constants import Column, Schema
+from typegen.trace_data_partition_file import TraceDataPartitionFile
+
+
+def _sample_trace_data() -> pd.DataFrame:
+    rows = [
+        [f"file_{i % 7}.py", None, None, f"function_{i}", i, 1, f"var_{i}", None, "int"]
+        for i in range(100)
+    ]
+    return pd.DataFrame(rows, columns=list(Schema.TraceData.keys())).astype(Schema.TraceData)
+
+
+def test_partitions_hold_the_rows_of_their_file(tmp_path: pathlib.Path):
+    trace_data = _sample_trace_data()
+    partitions = TraceDataPartitionFile.write(tmp_path / "partitions.pytype", trace_data)
+
+    for file_name in trace_data[Column.FILENAME].unique():
+        expected = trace_data[trace_data[Column.FILENAME] == file_name].reset_index(drop=True)
+        assert expected.equals(partitions.partition(file_name))
+
+    assert partitions.partition("missing.py").empty
+
+
+def test_partitions_are_cheap_to_pickle(tmp_path: pathlib.Path):
+    trace_data = _sample_trace_data()
+    partitions = TraceDataPartitionFile.write(tmp_path / "partitions.pytype", trace_data)
+
+    unpickled = pickle.loads(pickle.dumps(partitions))
+
+    assert len(pickle.dumps(partitions)) * 10 < len(pickle.dumps(trace_data))
+    assert unpickled.partition("file_3.py").equals(partitions.partition("file_3.py"))
@@ -0,0 +1,87 @@
+import pandas as pd
+
+from common import CompactTraceDataSchema
+from common.compact_schema import is_compact
+
+from typegen.unification.drop_dupes import DropDuplicatesFilter
+from typegen.unification.drop_min_threshold import MinThresholdFilter
+from typegen.unification.drop_vars import DropVariablesOfMultipleTypesFilter
+from typegen.unification.filter_base import TraceDataFilter, TraceDataFilterList
+from typegen.unification.grouped_trace_data import (
+    UNIFICATION_COLUMNS,
+    VARIABLE_COLUMNS,
+    GroupedTraceData,
+)
+from typegen.unification.keep_only_first import KeepOnlyFirstFilter
+from typegen.unification.union import UnionFilter
+
+from .data import sample_trace_data
+
+from constants import Column, Schema
+
+
+def test_group_ids_are_numbered_in_order_of_first_occurrence(sample_trace_data):
+    grouped = GroupedTraceData(sample_trace_data)
+
+    expected = (
+        sample_trace_data.groupby(list(UNIFICATION_COLUMNS), dropna=False, sort=False)
+        .ngroup()
+        .to_numpy()
+    )
+    assert (grouped.group_ids(UNIFICATION_COLUMNS) == expected).all()
+
+
+def test_group_ids_are_kept_while_rows_are_dropped(sample_trace_data):
+    grouped = GroupedTraceData(sample_trace_data)
+    group_ids = grouped.group_ids(VARIABLE_COLUMNS)
+
+    grouped.take(group_ids % 2 == 1)
+    remaining = grouped.to_frame()
+
+    expected = remaining.groupby(list(VARIABLE_COLUMNS), dropna=False, sort=False).ngroup().to_numpy()
+    assert (grouped.group_ids(VARIABLE_COLUMNS) == expected).all()
+
+
+def test_assigning_a_column_discards_its_groups(sample_trace_data):
+    grouped = GroupedTraceData(sample_trace_data)
+    before = grouped.group_ids({Column.VARNAME, Column.VARTYPE})
+
+    grouped.assign(Column.VARTYPE, ["int"] * len(grouped))
+
+    after = grouped.group_ids({Column.VARNAME, Column.VARTYPE})
+    assert after.max() < before.max()
+    assert grouped.to_frame().dtypes.equals(pd.Series(Schema.TraceData))
+
+
+def test_filter_list_matches_applying_filters_in_sequence(sample_trace_data):
+    filters = [
+        TraceDataFilter(DropDuplicatesFilter.ident),  # type: ignore
+        TraceDataFilter(MinThresholdFilter.ident, min_threshold=0.3),  # type: ignore
+        TraceDataFilter(KeepOnlyFirstFilter.ident),  # type: ignore
+        TraceDataFilter(DropVariablesOfMultipleTypesFilter.ident),  # type: ignore
+        TraceDataFilter(UnionFilter.ident),  # type: ignore
+    ]
+
+    expected = sample_trace_data.copy()
+    for trace_data_filter in filters:
+        expected = trace_data_filter.apply(expected)
+
+    filter_list = TraceDataFilter(ident=TraceDataFilterList.ident, filters=filters)  # type: ignore
+    actual = filter_list.apply(sample_trace_data)
+
+    assert expected.reset_index(drop=True).equals(actual)
+
+
+def test_filter_list_keeps_compact_trace_data_compact(sample_trace_data):
+    filters = [
+        TraceDataFilter(DropDuplicatesFilter.ident),  # type: ignore
+        TraceDataFilter(DropVariablesOfMultipleTypesFilter.ident),  # type: ignore
+        TraceDataFilter(UnionFilter.ident),  # type: ignore
+    ]
+    filter_list = TraceDataFilter(ident=TraceDataFilterList.ident, filters=filters)  # type: ignore
+
+    expected = filter_list.apply(sample_trace_data)
+    actual = filter_list.apply(CompactTraceDataSchema().encode(sample_trace_data))
+
+    assert is_compact(actual)
+    assert expected.equals(actual.astype(Schema.TraceData))
@@ -3,6 +3,7 @@ import pathlib
 import logging
 
 import pandas as pd
+import pytest
 from common import TraceDataCategory
 
 from typegen.unification.filter_base import TraceDataFilter
@@ -20,6 +21,9 @@ import pathlib
 
 stdlib_path = pathlib.Path(pathlib.__file__).parent
 
+# The filter imports the modules of the types it unifies
+pytestmark = pytest.mark.usefixtures("isolated_modules")
+
 strict_rstf = TraceDataFilter(  # type: ignore
     ident=UnifySubTypesFilter.ident,
     proj_path=proj_path,
@@ -303,3 +307,26 @@ def test_no_subtype_pandas_builtin():
     # logging.debug(f"\ndiff: \n{trace_data.compare(relaxed_actual)}")
 
     # assert_frame_equal(trace_data, relaxed_actual)
+
+
+def test_recurring_types_are_resolved_once(sample_trace_data, monkeypatch):
+    from common.resolver import Resolver
+
+    lookups: list[tuple[str | None, str]] = list()
+    type_lookup = Resolver.type_lookup
+
+    def counting_type_lookup(self, module_name, type_name):
+        lookups.append((module_name, type_name))
+        return type_lookup(self, module_name, type_name)
+
+    monkeypatch.setattr(Resolver, "type_lookup", counting_type_lookup)
+
+    # Repeat the variables in further functions, so that their types recur across groups
+    repeated = pd.concat(
+        [sample_trace_data.assign(**{Column.FUNCNAME: f"function{i}"}) for i in range(10)],
+        ignore_index=True,
+    ).astype(Schema.TraceData)
+    relaxed_rstf.apply(repeated)
+
+    distinct_types = sample_trace_data[[Column.VARTYPE_MODULE, Column.VARTYPE]].drop_duplicates()
+    assert len(lookups) == len(distinct_types)
@@ -174,3 +174,37 @@ def test_all_builtins_get_empty_strings():
     # actual_trace_data = unionf.apply(trace_data)
 
     # assert expected_trace_data.equals(actual_trace_data)
+
+
+def test_interleaved_groups_are_unified_in_order_of_first_occurrence():
+    traced = pd.DataFrame(
+        [
+            ["a.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "x", None, "int"],
+            ["a.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "y", None, "str"],
+            ["b.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "x", None, "bool"],
+            ["a.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "x", "pathlib", "Path"],
+        ],
+        columns=list(Schema.TraceData.keys()),
+    ).astype(Schema.TraceData)
+
+    expected_trace_data = pd.DataFrame(
+        [
+            ["a.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "x", ",,pathlib", "int | bool | Path"],
+            ["b.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "x", ",,pathlib", "int | bool | Path"],
+            ["a.py", None, None, "f", 1, TraceDataCategory.LOCAL_VARIABLE, "y", None, "str"],
+        ],
+        columns=list(Schema.TraceData.keys()),
+    ).astype(Schema.TraceData)
+
+    actual_trace_data = unionf.apply(traced)
+
+    assert expected_trace_data.equals(actual_trace_data)
+
+
+def test_empty_trace_data_stays_empty():
+    traced = pd.DataFrame(columns=Schema.TraceData.keys()).astype(Schema.TraceData)
+
+    actual_trace_data = unionf.apply(traced)
+
+    assert actual_trace_data.empty
+    assert (actual_trace_data.dtypes == traced.dtypes).all()
@@ -1,8 +1,10 @@
 from .tracer import Tracer
+from .monitoring import MonitoringTracer
 
 from .decorators import trace
 
 __all__ = [
     Tracer.__name__,
+    MonitoringTracer.__name__,
     trace.__name__,
 ]
@@ -3,12 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 import pathlib
 import operator
+import typing
 
 from common import TraceDataCategory
 
 import pandas as pd
 
 from constants import Column, Schema
+from tracing.buffer import TraceRow
 
 
 @dataclass
@@ -263,6 +265,28 @@ class TraceBatch:
 
         return pd.concat(updates, ignore_index=True).astype(Schema.TraceData)
 
+    def to_rows(self) -> typing.Iterator[TraceRow]:
+        """
+        Consume this batch of updates row by row, without constructing a DataFrame.
+
+        :params self: Nothing else :)
+        :returns: An iterator over the rows of the entire batch, ordered like the columns of `Schema.TraceData`
+        """
+        for update in self._updates:
+            file_name = str(update.file_name)
+            for varname, (vartype_module, vartype) in update.names2types.items():
+                yield (
+                    file_name,
+                    update.class_module,
+                    update.class_name,
+                    update.function_name,
+                    update.line_number,
+                    update.category,
+                    varname,
+                    vartype_module,
+                    vartype,
+                )
+
     def _build_update(
         self,
         names2types: dict[str, tuple[str | None, str]],
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import array
+import typing
+
+import numpy as np
+import pandas as pd
+
+from constants import Column, Schema
+
+
+TraceRow = tuple[
+    str, str | None, str | None, str | None, int, int, str, str | None, str
+]
+"""A singular row of trace data, ordered like the columns of `Schema.TraceData`"""
+
+
+class TraceDataBuffer:
+    """
+    Append-only, columnar storage for trace data that is accumulated during tracing.
+
+    Every column is stored as an `array.array` of integers. The string columns hold codes
+    into a table of interned strings, where -1 marks a missing value.
+    A DataFrame adhering to `Schema.TraceData` is only materialised on request,
+    which keeps appending rows at amortised constant cost.
+
+    Rows that have already been stored are rejected, so that memory is bounded by the amount of
+    distinct observations instead of the amount of executed lines.
+    Once the rows are handed on in chunks, see `take`, duplicates are only rejected among the rows of
+    the current and the previous chunk, which bounds the memory of long traces by the size of two chunks.
+    Readers of chunked trace data deduplicate it again, see `read_trace_data`.
+    """
+
+    _MISSING = -1
+
+    _STRING_COLUMNS = tuple(
+        column
+        for column, dtype in Schema.TraceData.items()
+        if isinstance(dtype, pd.StringDtype)
+    )
+
+    # Whether each column of `Schema.TraceData`, in order, is one of `_STRING_COLUMNS`
+    _IS_STRING_COLUMN = tuple(
+        isinstance(dtype, pd.StringDtype) for dtype in Schema.TraceData.values()
+    )
+
+    def __init__(self) -> None:
+        # Table of the strings of the stored rows, which the string columns hold the codes of
+        self._strings: list[str] = list()
+        self._codes: dict[str, int] = dict()
+
+        self._columns: dict[str, array.array] = {
+            column: array.array("Q" if column == Column.LINENO else "q")
+            for column in Schema.TraceData.keys()
+        }
+
+        # Rows that have been stored since the last chunk was taken, and those of the last chunk,
+        # used to reject duplicates
+        self._seen: set[TraceRow] = set()
+        self._seen_in_last_chunk: set[TraceRow] = set()
+
+        self._rows_accepted = 0
+
+    def __len__(self) -> int:
+        return len(self._columns[Column.LINENO])
+
+    @property
+    def rows_accepted(self) -> int:
+        """
+        The amount of rows that have been stored since the buffer was created.
+        Unlike `len`, the amount does not decrease when rows are taken, and hence tells whether new rows have been stored
+        """
+        return self._rows_accepted
+
+    def append(self, row: TraceRow) -> bool:
+        """
+        Store a row at the end of the buffer, unless it has been stored before.
+
+        :param row: The row to store, ordered like the columns of `Schema.TraceData`
+        :returns: True if the row was stored, False if it is a duplicate
+        """
+        if row in self._seen or row in self._seen_in_last_chunk:
+            return False
+
+        self._seen.add(row)
+        self._rows_accepted += 1
+        for storage, is_string, value in zip(
+            self._columns.values(), TraceDataBuffer._IS_STRING_COLUMN, row
+        ):
+            storage.append(
+                self._intern(typing.cast(str | None, value))
+                if is_string
+                else int(typing.cast(int, value))
+            )
+        return True
+
+    def extend(self, rows: typing.Iterable[TraceRow]) -> int:
+        """
+        Store the given rows at the end of the buffer, preserving their order
+        and skipping those that have been stored before.
+
+        :param rows: The rows to store, ordered like the columns of `Schema.TraceData`
+        :returns: The amount of rows that were stored
+        """
+        return sum(self.append(row) for row in rows)
+
+    def clear(self) -> None:
+        """Remove all rows and interned strings from the buffer"""
+        self._seen_in_last_chunk.clear()
+        self._take_rows()
+
+    def take(self) -> pd.DataFrame:
+        """
+        Materialise the buffer's contents as a chunk, and remove the stored rows and interned strings.
+        Unlike `clear`, rows of the taken chunk are still rejected when stored again, until the next chunk is taken.
+
+        :returns: A DataFrame adhering to `Schema.TraceData`, with one row per stored row, in insertion order
+        """
+        frame = self.to_frame()
+        self._seen_in_last_chunk = self._seen
+        self._seen = set()
+        self._take_rows()
+        return frame
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Materialise the buffer's contents.
+
+        :returns: A DataFrame adhering to `Schema.TraceData`, with one row per stored row, in insertion order
+        """
+        categories = pd.Index(self._strings, dtype=object)
+
+        data: dict[str, typing.Any] = dict()
+        for column, storage in self._columns.items():
+            values = np.array(storage, dtype=np.uint64 if column == Column.LINENO else np.int64)
+            if column in TraceDataBuffer._STRING_COLUMNS:
+                data[column] = pd.Categorical.from_codes(values, categories=categories)
+            else:
+                data[column] = values
+
+        return pd.DataFrame(data, columns=list(Schema.TraceData.keys())).astype(Schema.TraceData)
+
+    def _take_rows(self) -> None:
+        self._strings.clear()
+        self._codes.clear()
+        self._seen.clear()
+        for storage in self._columns.values():
+            del storage[:]
+
+    def _intern(self, value: str | None) -> int:
+        if value is None:
+            return TraceDataBuffer._MISSING
+
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
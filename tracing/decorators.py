@@ -5,6 +5,7 @@ import pathlib
 import inspect
 import traceback
 from typing import Any, Callable, Protocol, TypeVar
+import tempfile
 import timeit
 
 import pandas as pd
@@ -13,7 +14,10 @@ import numpy as np
 
 import constants
 from common import ptconfig
-from tracing.tracer import NoOperationTracer, Tracer, TracerBase
+from common.trace_data_file import read_trace_data, write_trace_data
+from tracing.monitoring import DefaultTracer
+from tracing.sink import TraceDataFileSink
+from tracing.tracer import NoOperationTracer, TracerBase
 
 RetType = TypeVar("RetType")
 
@@ -35,26 +39,40 @@ def _trace_callable(tracer: TracerBase, call: Callable[[], RetType]) -> str | No
         return traceback.format_exc()
 
 
+def _trace_output_path(
+    config: ptconfig.TomlCfg, subst: _TemplateSubstitutes, digest: int
+) -> pathlib.Path:
+    # Append hash to avoid overwriting other trace data files
+    trace_subst = config.pytypes.output_template.format_map(
+        {
+            "project": subst.project,
+            "test_case": subst.test_case,
+            "func_name": f"{subst.func_name}-{digest}",
+        }
+    )
+    return config.pytypes.proj_path / trace_subst
+
+
 def _execute_tracing(
     c: Callable[..., RetType],
     config: ptconfig.TomlCfg,
     subst: _TemplateSubstitutes,
     *args,
     **kwargs,
-) -> tuple[pd.DataFrame, np.ndarray | None]:
+) -> tuple[pathlib.Path, np.ndarray | None]:
     if config.pytypes.benchmark_performance:
         no_operation_tracer = NoOperationTracer(
             proj_path=config.pytypes.proj_path,
             stdlib_path=config.pytypes.stdlib_path,
             venv_path=config.pytypes.venv_path,
         )
-        standard_tracer = Tracer(
+        standard_tracer = DefaultTracer(
             proj_path=config.pytypes.proj_path,
             stdlib_path=config.pytypes.stdlib_path,
             venv_path=config.pytypes.venv_path,
             apply_opts=False,
         )
-        optimized_tracer = Tracer(
+        optimized_tracer = DefaultTracer(
             proj_path=config.pytypes.proj_path,
             stdlib_path=config.pytypes.stdlib_path,
             venv_path=config.pytypes.venv_path,
@@ -82,22 +100,45 @@ def _execute_tracing(
 
         traced = tracers[-1].trace_data
 
+        trace_output_path = _trace_output_path(
+            config, subst, int(hash_pandas_object(traced).sum())
+        )
+        trace_output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_trace_data(trace_output_path, traced)
+
         # Unable to catch error in benchmarking mode due to timeit usage
         err = None
 
     else:
         benchmarks = None
 
-        tracer = Tracer(
-            proj_path=config.pytypes.proj_path,
-            stdlib_path=config.pytypes.stdlib_path,
-            venv_path=config.pytypes.venv_path,
-            apply_opts=False,
+        # The name of the trace data file depends on its contents, which are only known after tracing,
+        # so stream to a temporary file next to it
+        output_directory = _trace_output_path(config, subst, 0).parent
+        output_directory.mkdir(parents=True, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(
+            suffix=".partial", prefix=f"{subst.func_name}-", dir=output_directory
         )
+        os.close(fd)
+
+        sink = TraceDataFileSink(pathlib.Path(partial_path))
+        try:
+            tracer = DefaultTracer(
+                proj_path=config.pytypes.proj_path,
+                stdlib_path=config.pytypes.stdlib_path,
+                venv_path=config.pytypes.venv_path,
+                apply_opts=False,
+                sink=sink,
+            )
+            err = _trace_callable(tracer, lambda: c(*args, **kwargs))
+        except BaseException:
+            sink.close()
+            sink.path.unlink(missing_ok=True)
+            raise
+        sink.close()
 
-        err = _trace_callable(tracer, lambda: c(*args, **kwargs))
-
-        traced = tracer.trace_data
+        trace_output_path = _trace_output_path(config, subst, sink.digest)
+        sink.path.replace(trace_output_path)
 
     if benchmarks is not None:
         # Append hash to avoid overwriting other benchmarks
@@ -112,25 +153,12 @@ def _execute_tracing(
         benchmark_output_path.parent.mkdir(parents=True, exist_ok=True)
         np.save(benchmark_output_path, benchmarks)
 
-    # Append hash to avoid overwriting other pickled DataFrames
-    trace_subst = config.pytypes.output_template.format_map(
-        {
-            "project": subst.project,
-            "test_case": subst.test_case,
-            "func_name": f"{subst.func_name}-{hash_pandas_object(traced).sum()}",
-        }
-    )
-
-    trace_output_path = config.pytypes.proj_path / trace_subst
-    trace_output_path.parent.mkdir(parents=True, exist_ok=True)
-    traced.to_pickle(str(trace_output_path))
-
     if err is not None:
         err_output_path = trace_output_path.with_suffix(".err")
         with err_output_path.open("w") as f:
             f.write(err)
 
-    return traced, benchmarks
+    return trace_output_path, benchmarks
 
 
 class _Traceable(Protocol):
@@ -141,9 +169,9 @@ class _Traceable(Protocol):
 def trace(c: Callable[..., RetType]) -> _Traceable:
     """
     Execute the tracer upon a callable marked with this decorator.
-    Serialises the accumulated trace data after the callable has finished to the location given
-    by the config file.
-    Uncaught exceptions are logged next to these pickled DataFrames.
+    Streams the accumulated trace data in chunks to the location given by the config file
+    while the callable is running, so that memory usage stays bounded for long-running callables.
+    Uncaught exceptions are logged next to these trace data files.
     Supports performance benchmarking when specified in the config file.
 
     The implementation makes sure to preserve all arguments to the decorated callable, so that features like
@@ -205,6 +233,7 @@ def dev_trace(c: Callable[..., RetType]) -> _DevTraceable:
             test_case=module_name,
             func_name=c.__name__,
         )
-        return _execute_tracing(c, cfg, subst, *args, **kwargs)
+        trace_output_path, benchmarks = _execute_tracing(c, cfg, subst, *args, **kwargs)
+        return read_trace_data(trace_output_path), benchmarks
 
     return wrapper
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import logging
+import pathlib
+import sys
+import types
+import typing
+
+import constants
+from common.compact_schema import CompactTraceDataSchema
+from tracing.sink import TraceDataSink
+from tracing.tracer import Tracer
+
+
+logger = logging.getLogger(__name__)
+
+
+if sys.version_info >= (3, 12):
+
+    class MonitoringTracer(Tracer):
+        """
+        Tracer that collects the same trace data as `Tracer`, but is driven by `sys.monitoring` (PEP 669)
+        instead of `sys.settrace`, and hence requires Python 3.12 or newer.
+
+        Code objects outside of the project are disabled on their first call, and lines that are skipped
+        by the loop optimisation are disabled until the optimisation has finished, so that neither of them
+        incur any further overhead from the interpreter.
+
+        If all of `TOOL_IDS` are in use by other tools, e.g. a debugger or coverage tool that runs alongside,
+        the trace falls back to `sys.settrace`, like `Tracer`.
+        """
+
+        # Tool ids 3 and 4 are not reserved by PEP 669 for debuggers, coverage tools, profilers or optimizers
+        TOOL_IDS = (3, 4)
+        TOOL_NAME = "pytypes"
+
+        def __init__(
+            self,
+            proj_path: pathlib.Path,
+            stdlib_path: pathlib.Path,
+            venv_path: pathlib.Path,
+            apply_opts: bool = False,
+            sink: TraceDataSink | None = None,
+            chunk_size: int = constants.TRACE_DATA_CHUNK_SIZE,
+            compact_schema: CompactTraceDataSchema | None = None,
+        ):
+            """
+            Construct instance with provided paths.
+            Additionally accepts an extra argument that indicates whether optimisations should be enabled
+
+            :param proj_path: Path to project's directory that shall be traced
+            :param stdlib_path: Path to standard library's directory of the Python binary used to run the project's tests
+            :param venv_path: Path to project's virtual environment's directory used to run the project's tests
+            :param apply_opts: When set to True, tries to optimise loop execution by turning off tracing if enough iterations have passed since any types have changed
+            :param sink: When given, trace data is handed to the sink in chunks while tracing, instead of being stored in `trace_data`
+            :param chunk_size: The amount of distinct rows that are accumulated before they are handed to the sink
+            :param compact_schema: When given, `trace_data` is stored with categorical string columns of this schema, see `CompactTraceDataSchema`
+            """
+            super().__init__(
+                proj_path, stdlib_path, venv_path, apply_opts, sink, chunk_size, compact_schema
+            )
+            self.class_names_to_drop.append(MonitoringTracer.__name__)
+
+            # The tool id held while tracing, or None if the trace falls back to `sys.settrace`
+            self.tool_id: int | None = None
+
+            # Code objects of the project for which local events have been enabled
+            self._instrumented: set[types.CodeType] = set()
+
+            # Frames whose start has been observed; events of frames that were already running
+            # when the trace started are ignored, mirroring the behaviour of `sys.settrace`
+            self._entered_frames: set[int] = set()
+
+            # Code objects with lines that have been disabled because of an active optimisation
+            self._disabled_lines: set[types.CodeType] = set()
+
+        def _install_trace(self) -> None:
+            monitoring = sys.monitoring
+            events = monitoring.events
+
+            self.tool_id = self._acquire_tool_id()
+            if self.tool_id is None:
+                logger.warning(
+                    f"Tool ids {MonitoringTracer.TOOL_IDS} of sys.monitoring are in use, falling back to sys.settrace"
+                )
+                super()._install_trace()
+                return
+
+            callbacks = {
+                events.PY_START: self._monitor_start,
+                events.PY_RESUME: self._monitor_start,
+                events.PY_THROW: self._monitor_throw,
+                events.LINE: self._monitor_line,
+                events.PY_RETURN: self._monitor_return,
+                events.PY_YIELD: self._monitor_return,
+                events.PY_UNWIND: self._monitor_unwind,
+            }
+            for event, callback in callbacks.items():
+                monitoring.register_callback(self.tool_id, event, callback)
+
+            self._entered_frames.clear()
+            self._disabled_lines.clear()
+
+            monitoring.set_events(
+                self.tool_id,
+                events.PY_START | events.PY_RESUME | events.PY_THROW | events.PY_UNWIND,
+            )
+
+        def _uninstall_trace(self) -> None:
+            if self.tool_id is None:
+                super()._uninstall_trace()
+                return
+
+            monitoring = sys.monitoring
+
+            monitoring.set_events(self.tool_id, monitoring.events.NO_EVENTS)
+            for code in self._instrumented:
+                monitoring.set_local_events(self.tool_id, code, monitoring.events.NO_EVENTS)
+            self._instrumented.clear()
+            self._entered_frames.clear()
+            self._disabled_lines.clear()
+
+            for event in (
+                monitoring.events.PY_START,
+                monitoring.events.PY_RESUME,
+                monitoring.events.PY_THROW,
+                monitoring.events.LINE,
+                monitoring.events.PY_RETURN,
+                monitoring.events.PY_YIELD,
+                monitoring.events.PY_UNWIND,
+            ):
+                monitoring.register_callback(self.tool_id, event, None)
+
+            monitoring.free_tool_id(self.tool_id)
+            self.tool_id = None
+
+        @staticmethod
+        def _acquire_tool_id() -> int | None:
+            for tool_id in MonitoringTracer.TOOL_IDS:
+                try:
+                    sys.monitoring.use_tool_id(tool_id, MonitoringTracer.TOOL_NAME)
+                except ValueError:
+                    continue
+                return tool_id
+            return None
+
+        def _monitor_start(self, code: types.CodeType, instruction_offset: int) -> typing.Any:
+            if self._relative_project_path(code.co_filename) is None:
+                return sys.monitoring.DISABLE
+
+            return self._on_frame_entered(sys._getframe(1))
+
+        def _monitor_throw(
+            self, code: types.CodeType, instruction_offset: int, exception: BaseException
+        ) -> typing.Any:
+            # PY_THROW cannot be disabled, so foreign code is skipped without doing so
+            if self._relative_project_path(code.co_filename) is None:
+                return None
+
+            return self._on_frame_entered(sys._getframe(1))
+
+        def _monitor_line(self, code: types.CodeType, line_number: int) -> typing.Any:
+            frame = sys._getframe(1)
+            if id(frame) not in self._entered_frames:
+                return None
+
+            self._on_trace_is_called(frame, "line", None)
+
+            # The line's trace data is settled by the optimisation, so stop reporting it
+            if self.apply_opts and self._is_optimising():
+                self._disabled_lines.add(code)
+                return sys.monitoring.DISABLE
+
+            self._restart_disabled_lines()
+            return None
+
+        def _monitor_return(
+            self, code: types.CodeType, instruction_offset: int, retval: typing.Any
+        ) -> typing.Any:
+            return self._on_frame_exited(sys._getframe(1), retval)
+
+        def _monitor_unwind(
+            self, code: types.CodeType, instruction_offset: int, exception: BaseException
+        ) -> typing.Any:
+            # Like `sys.settrace`, a frame that is exited by an exception returns None
+            return self._on_frame_exited(sys._getframe(1), None)
+
+        def _on_frame_entered(self, frame: types.FrameType) -> None:
+            code = frame.f_code
+            if code not in self._instrumented:
+                sys.monitoring.set_local_events(
+                    typing.cast(int, self.tool_id), code, MonitoringTracer._local_events()
+                )
+                self._instrumented.add(code)
+
+            self._entered_frames.add(id(frame))
+            self._on_trace_is_called(frame, "call", None)
+            self._restart_disabled_lines()
+
+        def _on_frame_exited(self, frame: types.FrameType, retval: typing.Any) -> None:
+            if id(frame) not in self._entered_frames:
+                return
+
+            self._entered_frames.remove(id(frame))
+            self._on_trace_is_called(frame, "return", retval)
+            self._restart_disabled_lines()
+
+        def _restart_disabled_lines(self) -> None:
+            """
+            Re-enable the lines that have been disabled while an optimisation was active, once none is anymore.
+            Only the lines of this tool are re-enabled, by removing and re-adding the line events of their code objects,
+            as `sys.monitoring.restart_events` would also re-enable the events that other tools have disabled.
+            """
+            if not self._disabled_lines or self._is_optimising():
+                return
+
+            tool_id = typing.cast(int, self.tool_id)
+            local_events = MonitoringTracer._local_events()
+            for code in self._disabled_lines:
+                sys.monitoring.set_local_events(
+                    tool_id, code, local_events & ~sys.monitoring.events.LINE
+                )
+                sys.monitoring.set_local_events(tool_id, code, local_events)
+            self._disabled_lines.clear()
+
+        @staticmethod
+        def _local_events() -> int:
+            events = sys.monitoring.events
+            return events.LINE | events.PY_RETURN | events.PY_YIELD
+
+else:
+
+    class MonitoringTracer(Tracer):
+        """
+        Stand-in for the `sys.monitoring` (PEP 669) driven tracer on interpreters older than Python 3.12,
+        which cannot be constructed.
+        """
+
+        def __init__(self, *args, **kwargs):
+            raise RuntimeError(
+                f"{MonitoringTracer.__name__} requires sys.monitoring, which is only available from Python 3.12 onwards"
+            )
+
+
+DefaultTracer: type[Tracer] = Tracer
+"""The most efficient `Tracer` implementation available on the running interpreter"""
+
+if sys.version_info >= (3, 12):
+    DefaultTracer = MonitoringTracer
@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from .enums import TriggerStatus
 from .utils import FrameWithMetadata
 
-import pandas as pd
+from tracing.buffer import TraceDataBuffer
 
 
 class Optimisation(ABC):
@@ -34,10 +34,10 @@ class Optimisation(ABC):
         pass
 
     @abstractmethod
-    def advance(self, current_frame: FrameWithMetadata, traced: pd.DataFrame) -> None:
+    def advance(self, current_frame: FrameWithMetadata, traced: TraceDataBuffer) -> None:
         """
         Modify the optimization's internal state based on given frame.
-        The traced DataFrame should be treated as read-only
+        The traced buffer should be treated as read-only
 
         :param current_frame: The current stack frame
         :param traced: The current trace data from the Tracer
@@ -1,7 +1,7 @@
 import logging
 import inspect
 
-import pandas as pd
+from tracing.buffer import TraceDataBuffer
 
 from . import Optimisation, TriggerStatus, utils
 
@@ -17,7 +17,7 @@ class Ignore(Optimisation):
         # By default, this optimisation is constantly active, as long as the current scope is active
         self._status = TriggerStatus.ONGOING
 
-    def advance(self, current_frame: utils.FrameWithMetadata, _: pd.DataFrame) -> None:
+    def advance(self, current_frame: utils.FrameWithMetadata, _: TraceDataBuffer) -> None:
         # If we reach a stack frame that is under the earliest stack frame we want to ignore
         if self.fwm._frame.f_back and self.fwm._frame.f_back == current_frame._frame:
             logging.debug(
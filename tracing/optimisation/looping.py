@@ -3,8 +3,7 @@ import logging
 from . import Optimisation, TriggerStatus, utils
 from .utils import FrameWithMetadata
 
-import pandas as pd
-from constants import Column
+from tracing.buffer import TraceDataBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +32,7 @@ class TypeStableLoop(Optimisation):
     def status(self) -> TriggerStatus:
         return self._status
 
-    def advance(self, current_frame: utils.FrameWithMetadata, traced: pd.DataFrame):
+    def advance(self, current_frame: utils.FrameWithMetadata, traced: TraceDataBuffer):
         # Early exit conditions: Encountering break or return
         if current_frame.is_break() or current_frame.is_return():
             logger.debug(
@@ -82,7 +81,7 @@ class TypeStableLoop(Optimisation):
         logger.debug(f"Total iterations is now {self._total_iterations}")
 
     def _when_inactive(
-        self, current_frame: utils.FrameWithMetadata, traced: pd.DataFrame
+        self, current_frame: utils.FrameWithMetadata, traced: TraceDataBuffer
     ) -> None:
         # In the first iteration, update line range information
         if self._total_iterations == 0:
@@ -98,11 +97,9 @@ class TypeStableLoop(Optimisation):
         # TODO: filter by file!
         else:
             if self._is_loop_head(current_frame):
-                new_loop_traced_count = (
-                    traced[Column.LINENO]
-                    .between(*self._relevant_lines, inclusive="both")  # type: ignore
-                    .shape[0]
-                )
+                # Rows handed to a sink are taken from the buffer, so its length may decrease;
+                # the buffer only rejects rows of the last chunk though, so chunks must hold more rows than a loop's body
+                new_loop_traced_count = traced.rows_accepted
                 logger.debug(f"{new_loop_traced_count=} vs {self._loop_traced_count=}")
                 if new_loop_traced_count != self._loop_traced_count:
                     # Update count since type changes
@@ -114,13 +111,13 @@ class TypeStableLoop(Optimisation):
                     self._iterations_since_type_changes += 1
 
     def _when_entry(
-        self, current_frame: utils.FrameWithMetadata, traced: pd.DataFrame
+        self, current_frame: utils.FrameWithMetadata, traced: TraceDataBuffer
     ) -> None:
         if self._is_loop_head(current_frame):
             self._iterations_since_type_changes += 1
 
     def _when_ongoing(
-        self, current_frame: utils.FrameWithMetadata, traced: pd.DataFrame
+        self, current_frame: utils.FrameWithMetadata, traced: TraceDataBuffer
     ) -> None:
         if self._is_loop_head(current_frame):
             self._iterations_since_type_changes += 1
@@ -0,0 +1,67 @@
+import abc
+import pathlib
+
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from common.trace_data_file import TraceDataWriter
+
+
+class TraceDataSink(abc.ABC):
+    """
+    Receives the trace data of a tracer in chunks while tracing is still running,
+    so that the tracer does not need to keep all of it in memory.
+    Chunks adhere to `Schema.TraceData`, and are deduplicated against the previous chunk, see `TraceDataBuffer`.
+    """
+
+    @abc.abstractmethod
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Store a chunk of trace data.
+
+        :param chunk: The chunk to store
+        """
+        pass
+
+    def close(self) -> None:
+        """Release the resources held by the sink once no more chunks will be written"""
+        pass
+
+
+class TraceDataFileSink(TraceDataSink):
+    """Stores each chunk as a row group of a trace data file, see `common.trace_data_file`"""
+
+    def __init__(self, path: pathlib.Path):
+        """
+        :param path: Path to the trace data file; it is created, or truncated if it exists
+        """
+        self.path = path
+        self.rows_written = 0
+
+        self._digest = 0
+        self._writer: TraceDataWriter | None = TraceDataWriter(path)
+
+    @property
+    def digest(self) -> int:
+        """
+        The sum of the row hashes of all written chunks,
+        equal to `hash_pandas_object(trace_data).sum()` over their concatenation
+        """
+        return self._digest
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self._writer is None:
+            raise ValueError(f"Cannot write to closed sink for {self.path}")
+        if chunk.empty:
+            return
+
+        self._writer.write(chunk)
+        self.rows_written += len(chunk)
+        self._digest = (self._digest + int(hash_pandas_object(chunk).sum())) % 2**64
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+
+        self._writer.close()
+        self._writer = None
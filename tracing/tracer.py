@@ -1,20 +1,26 @@
 from __future__ import annotations
 
 import abc
+import collections
 import contextlib
 import functools
 import logging
 import inspect
 import operator
 import sys
+import types
 
 import pandas as pd
 import typing
 import pathlib
 
+import constants
 from constants import Column, Schema
+from common.compact_schema import CompactTraceDataSchema
 from common.resolver import Resolver
 from tracing.batch import TraceBatch
+from tracing.buffer import TraceDataBuffer
+from tracing.sink import TraceDataSink
 
 from .optimisation import (
     TriggerStatus,
@@ -35,6 +41,9 @@ class TracerBase(abc.ABC):
         proj_path: pathlib.Path,
         stdlib_path: pathlib.Path,
         venv_path: pathlib.Path,
+        sink: TraceDataSink | None = None,
+        chunk_size: int = constants.TRACE_DATA_CHUNK_SIZE,
+        compact_schema: CompactTraceDataSchema | None = None,
     ):
         """
         Construct instance with provided paths.
@@ -42,10 +51,27 @@ class TracerBase(abc.ABC):
         :param proj_path: Path to project's directory that shall be traced
         :param stdlib_path: Path to standard library's directory of the Python binary used to run the project's tests
         :param venv_path: Path to project's virtual environment's directory used to run the project's tests
+        :param sink: When given, trace data is handed to the sink in chunks while tracing, instead of being stored in `trace_data`
+        :param chunk_size: The amount of distinct rows that are accumulated before they are handed to the sink
+        :param compact_schema: When given, `trace_data` is stored with categorical string columns of this schema, see `CompactTraceDataSchema`
         """
-        self.trace_data = pd.DataFrame(columns=Schema.TraceData.keys()).astype(
-            Schema.TraceData
-        )
+        self.compact_schema = compact_schema
+        if self.compact_schema is not None:
+            self.trace_data = self.compact_schema.empty()
+        else:
+            self.trace_data = pd.DataFrame(columns=Schema.TraceData.keys()).astype(
+                Schema.TraceData
+            )
+
+        # Rows accumulated by the active trace; only turned into a DataFrame in `stop_trace`,
+        # or whenever a chunk is handed to the sink
+        self._buffer = TraceDataBuffer()
+
+        self.sink = sink
+        self.chunk_size = chunk_size
+
+        # Amount of rows handed to the sink so far, used to label the rows of each chunk
+        self._sink_offset = 0
 
         self.proj_path = proj_path
         self.stdlib_path = stdlib_path
@@ -67,18 +93,22 @@ class TracerBase(abc.ABC):
             self.stop_trace.__name__,
             self.start_trace.__name__,
             self.active_trace.__name__,
+            self._uninstall_trace.__name__,
         ]
 
         self._old_trace: typing.Callable | None = None
 
+        # Map of a code object's filename to its path relative to the project's directory,
+        # or None if the file lies outside of the project
+        self._project_relative_paths: dict[str, pathlib.Path | None] = dict()
+
     def start_trace(self: "TracerBase") -> None:
-        """Starts the trace by calling `sys.settrace` and backing-up the previous one.
+        """Starts the trace by installing the tracing backend, see `_install_trace`.
         All Python code run after this will now be traced.
         
         :param self: An instance of a deriving class"""
         logger.info("Starting trace")
-        self._old_trace = sys.gettrace()
-        sys.settrace(self._on_trace_is_called)
+        self._install_trace()
         self._prev_line.clear()
 
     @contextlib.contextmanager
@@ -95,28 +125,87 @@ class TracerBase(abc.ABC):
 
     def stop_trace(self: "TracerBase"):
         """
-        Stops the trace and reinstates the previously set trace function.
-        Also deduplicates the accumulated trace data.
+        Stops the trace by uninstalling the tracing backend, see `_uninstall_trace`.
+        Also materialises and deduplicates the accumulated trace data.
 
         :param self: An instance of a deriving class
         """
         logger.info("Stopping trace")
-        sys.settrace(self._old_trace)
+        self._uninstall_trace()
+        logger.info(f"Type resolution cache: {self._resolver.cache_info()}")
+
+        # Rows that have been handed to the sink are remembered,
+        # so that they are not written again by later traces
+        if self.sink is not None:
+            self._flush_to_sink()
+            return
+
+        buffered = self._buffer.to_frame()
+        self._buffer.clear()
+
+        if not buffered.empty:
+            if self.compact_schema is not None:
+                self.trace_data = self.compact_schema.concat([self.trace_data, buffered])
+            else:
+                self.trace_data = pd.concat([self.trace_data, buffered], ignore_index=True)
 
-        # Drop all references to the tracer
         self.trace_data = self.trace_data.drop_duplicates(ignore_index=True)
+        self.trace_data = self._drop_tracer_references(self.trace_data)
+        if self.compact_schema is not None:
+            self.trace_data = self.compact_schema.encode(self.trace_data)
+        else:
+            self.trace_data = self.trace_data.astype(Schema.TraceData)
+
+    def _flush_to_sink(self) -> None:
+        """Hand the buffered rows to the sink, without those that reference the tracer itself"""
+        assert self.sink is not None
+
+        chunk = self._buffer.take()
+        chunk.index = pd.RangeIndex(self._sink_offset, self._sink_offset + len(chunk))
+        self._sink_offset += len(chunk)
+
+        chunk = self._drop_tracer_references(chunk).astype(Schema.TraceData)
+        self.sink.write(chunk)
 
+    def _drop_tracer_references(self, trace_data: pd.DataFrame) -> pd.DataFrame:
         drop_masks = [
-            self.trace_data[Column.CLASS].isin(self.class_names_to_drop),
-            self.trace_data[Column.FUNCNAME].isin(self.function_names_to_drop),
+            trace_data[Column.CLASS].isin(self.class_names_to_drop),
+            trace_data[Column.FUNCNAME].isin(self.function_names_to_drop),
         ]
-        td_drop = self.trace_data[functools.reduce(operator.and_, drop_masks)]
-        self.trace_data = self.trace_data.drop(td_drop.index)
+        td_drop = trace_data[functools.reduce(operator.and_, drop_masks)]
+        return trace_data.drop(td_drop.index)
+
+    def _relative_project_path(self, co_filename: str) -> pathlib.Path | None:
+        """Look up the path of a code object's file relative to the project's directory.
+        The verdict is computed once per filename, as it is needed on every event.
+
+        :param co_filename: The filename of a code object
+        :returns: The path relative to the project's directory, or None if the file is not part of the project
+        """
+        try:
+            return self._project_relative_paths[co_filename]
+        except KeyError:
+            file_name = pathlib.Path(co_filename)
+            if file_name.is_relative_to(self.proj_path):
+                relative: pathlib.Path | None = file_name.relative_to(self.proj_path)
+            else:
+                relative = None
 
-        self.trace_data = self.trace_data.astype(Schema.TraceData)
+            self._project_relative_paths[co_filename] = relative
+            return relative
+
+    def _install_trace(self) -> None:
+        """Register `_on_trace_is_called` with `sys.settrace`, backing-up the previous trace function.
+        Deriving classes may override this, together with `_uninstall_trace`, to use another tracing mechanism."""
+        self._old_trace = sys.gettrace()
+        sys.settrace(self._on_trace_is_called)
+
+    def _uninstall_trace(self) -> None:
+        """Reinstate the trace function that was backed-up by `_install_trace`."""
+        sys.settrace(self._old_trace)
 
     @abc.abstractmethod
-    def _on_trace_is_called(self, frame, event, arg: typing.Any) -> typing.Callable:
+    def _on_trace_is_called(self, frame, event, arg: typing.Any) -> typing.Callable | None:
         pass
 
 
@@ -125,7 +214,7 @@ class NoOperationTracer(TracerBase):
     Tracer that does nothing except be invoked whenever a tracing-related event is emitted.
     Used to provide benchmarking, i.e. to measure the overhead by the "real" Tracer
     """
-    def _on_trace_is_called(self, frame, event, arg: typing.Any) -> typing.Callable:
+    def _on_trace_is_called(self, frame, event, arg: typing.Any) -> typing.Callable | None:
         return self._on_trace_is_called
 
 
@@ -140,6 +229,9 @@ class Tracer(TracerBase):
         stdlib_path: pathlib.Path,
         venv_path: pathlib.Path,
         apply_opts: bool=False,
+        sink: TraceDataSink | None = None,
+        chunk_size: int = constants.TRACE_DATA_CHUNK_SIZE,
+        compact_schema: CompactTraceDataSchema | None = None,
     ):
         """
         Construct instance with provided paths.
@@ -149,11 +241,16 @@ class Tracer(TracerBase):
         :param stdlib_path: Path to standard library's directory of the Python binary used to run the project's tests
         :param venv_path: Path to project's virtual environment's directory used to run the project's tests
         :param apply_opts: When set to True, tries to optimise loop execution by turning off tracing if enough iterations have passed since any types have changed
+        :param sink: When given, trace data is handed to the sink in chunks while tracing, instead of being stored in `trace_data`
+        :param chunk_size: The amount of distinct rows that are accumulated before they are handed to the sink
+        :param compact_schema: When given, `trace_data` is stored with categorical string columns of this schema, see `CompactTraceDataSchema`
         """
-        super().__init__(proj_path, stdlib_path, venv_path)
+        super().__init__(proj_path, stdlib_path, venv_path, sink, chunk_size, compact_schema)
         self.class_names_to_drop.append(Tracer.__name__)
         self.apply_opts = apply_opts
 
+        self._class_index = _ClassIndex()
+
         if self.apply_opts:
             self.optimisation_stack: list[Optimisation] = list()
 
@@ -164,6 +261,9 @@ class Tracer(TracerBase):
 
         super().stop_trace()
 
+        # Do not keep the traced modules' globals alive
+        self._class_index.clear()
+
     def _update_optimisations(self, fwm: FrameWithMetadata) -> None:
         """Remove optimisations that are marked as TriggerStatus.EXITED, and insert new ones as needed."""
                 # Remove dead optimisations
@@ -191,9 +291,16 @@ class Tracer(TracerBase):
                     self.optimisation_stack.append(tsl)
                     return
 
+    def _is_optimising(self) -> bool:
+        """Return True if any optimisation currently suppresses the collection of trace data"""
+        return any(
+            opt.status() in Optimisation.OPTIMIZING_STATES
+            for opt in self.optimisation_stack
+        )
+
     def _advance_optimisations(self, fwm: FrameWithMetadata) -> None:
         for optimisation in self.optimisation_stack:
-            optimisation.advance(fwm, self.trace_data)
+            optimisation.advance(fwm, self._buffer)
 
     def _on_call(self, frame, batch: TraceBatch) -> TraceBatch:
         names2types = dict()
@@ -258,13 +365,13 @@ class Tracer(TracerBase):
 
         return batch.members(names2types)
 
-    def _on_trace_is_called(self, frame, event, arg: typing.Any) -> typing.Callable:
+    def _on_trace_is_called(self, frame, event, arg: typing.Any) -> typing.Callable | None:
         """Called during execution of a function which is traced. Collects trace data from the frame."""
-        # Ignore out of project files
-        file_name = pathlib.Path(frame.f_code.co_filename)
-
-        if not file_name.is_relative_to(self.proj_path):
-            return self._on_trace_is_called
+        # Ignore out of project files; by not returning a local trace function,
+        # no further events are emitted for this frame at all
+        file_name = self._relative_project_path(frame.f_code.co_filename)
+        if file_name is None:
+            return None
 
         if self.apply_opts:
             fwm = FrameWithMetadata(frame)
@@ -273,14 +380,11 @@ class Tracer(TracerBase):
             self._update_optimisations(fwm)
 
             # Tracing has been toggled off for this line now, simply return
-            if any(
-                opt.status() in Optimisation.OPTIMIZING_STATES
-                for opt in self.optimisation_stack
-            ):
+            if self._is_optimising():
                 return self._on_trace_is_called
 
         function_name = frame.f_code.co_name
-        enclosing_class = _get_class_in_frame(frame)
+        enclosing_class = self._class_index.class_in_frame(frame)
 
         if enclosing_class is not None:
             modname = self._resolver.get_module_and_name(enclosing_class)
@@ -290,7 +394,6 @@ class Tracer(TracerBase):
         else:
             class_module, class_name = None, None
 
-        file_name = file_name.relative_to(self.proj_path)
         line_number = frame.f_lineno
 
         frameinfo = inspect.getframeinfo(frame)
@@ -340,23 +443,18 @@ class Tracer(TracerBase):
 
         self.old_local_vars[function_name] = frame.f_locals.copy()
         self.old_global_vars[frame.f_code.co_filename] = frame.f_globals.copy()
-        if self.apply_opts:
-            self.trace_data = self.trace_data.drop_duplicates()
 
         return self._on_trace_is_called
 
     def _update_trace_data_with(self, batch_update: TraceBatch) -> None:
         """
-        Constructs a DataFrame from the provided updates, and appends
-        it to the existing trace data collection.
+        Appends the rows of the provided updates to the buffer of
+        the active trace. Rows that have already been observed are not stored again.
         """
+        self._buffer.extend(batch_update.to_rows())
 
-        batch_df = batch_update.to_frame()
-        if batch_df.empty:
-            return
-        self.trace_data = pd.concat(
-            [self.trace_data, batch_df], ignore_index=True
-        ).astype(Schema.TraceData)
+        if self.sink is not None and len(self._buffer) >= self.chunk_size:
+            self._flush_to_sink()
 
     def _get_new_defined_variables_with_types(
         self,
@@ -382,17 +480,95 @@ class Tracer(TracerBase):
         )
 
 
-def _get_class_in_frame(frame) -> type | None:
-    code = frame.f_code
-    function_name = code.co_name
-    all_possible_classes = filter(inspect.isclass, frame.f_globals.values())
-    for possible_class in all_possible_classes:
-        if hasattr(possible_class, function_name):
-            member = getattr(possible_class, function_name)
-            if not inspect.isfunction(member):
-                continue
+class _ClassIndex:
+    """
+    Lookup of the class that defines a frame's code object.
+    For every module's globals, an index of code objects to their defining classes is built lazily,
+    and rebuilt once the amount of globals in the module changes.
+    Covers methods, staticmethods and classmethods, including those of nested classes.
+
+    A class is only returned while it still defines the code object under the name it was indexed by.
+    Code objects that are not indexed, e.g. as their class has been rebound or as they have been attached to a class
+    after indexing, are searched for in the classes of the module's globals, like their methods are looked up by name.
+    Classes found this way are added to the index, as are code objects that are not defined by any class,
+    such as module-level functions, so that they are only searched for again once the index is rebuilt.
+    """
+
+    def __init__(self) -> None:
+        # Map of a module's globals' id to the globals themselves,
+        # their size at the time of indexing and the index, in which None marks code objects without a class
+        self._by_globals: dict[
+            int,
+            tuple[dict[str, typing.Any], int, dict[types.CodeType, tuple[type, str] | None]],
+        ] = dict()
 
-            if member.__code__ == code:
-                return possible_class
+    def class_in_frame(self, frame) -> type | None:
+        f_globals = frame.f_globals
+        code = frame.f_code
+        entry = self._by_globals.get(id(f_globals))
+
+        if entry is None or entry[0] is not f_globals or entry[1] != len(f_globals):
+            entry = f_globals, len(f_globals), _index_code_to_class(f_globals)
+            self._by_globals[id(f_globals)] = entry
+
+        index = entry[2]
+        if code in index:
+            indexed = index[code]
+            if indexed is None:
+                return None
+            clazz, name = indexed
+            if _code_of(vars(clazz).get(name)) is code:
+                return clazz
+
+        found = _search_class_in_namespace(f_globals, code)
+        index[code] = (found, code.co_name) if found is not None else None
+        return found
+
+    def clear(self) -> None:
+        self._by_globals.clear()
+
+
+def _code_of(member: typing.Any) -> types.CodeType | None:
+    if isinstance(member, (staticmethod, classmethod)):
+        member = member.__func__
+    return member.__code__ if inspect.isfunction(member) else None
+
+
+def _search_class_in_namespace(
+    namespace: dict[str, typing.Any], code: types.CodeType
+) -> type | None:
+    for clazz in filter(inspect.isclass, list(namespace.values())):
+        # The class that the member of the code's name is inherited from, if any
+        for base in clazz.__mro__:
+            member = vars(base).get(code.co_name)
+            if member is not None:
+                if _code_of(member) is code:
+                    return base
+                break
 
     return None
+
+
+def _index_code_to_class(
+    namespace: dict[str, typing.Any]
+) -> dict[types.CodeType, tuple[type, str] | None]:
+    index: dict[types.CodeType, tuple[type, str] | None] = dict()
+
+    # Breadth-first, so that classes from the module's namespace take precedence over nested ones
+    pending = collections.deque(filter(inspect.isclass, list(namespace.values())))
+    visited: set[int] = set()
+
+    while pending:
+        clazz = pending.popleft()
+        if id(clazz) in visited:
+            continue
+        visited.add(id(clazz))
+
+        for name, member in list(vars(clazz).items()):
+            code = _code_of(member)
+            if code is not None:
+                index.setdefault(code, (clazz, name))
+            elif inspect.isclass(member):
+                pending.append(member)
+
+    return index
@@ -1,14 +1,23 @@
 import click
 import logging
+import os
 import pathlib
 import sys
+import tempfile
 
 import libcst.codemod._cli as cli
 import libcst.codemod as codemod
+import pandas as pd
+
+from constants import (
+    CONFIG_FILE_NAME,
+    MRO_CACHE_FILE_NAME,
+    TRACE_DATA_FILE_ENDING,
+    TRACE_DATA_INDEX_FOLDER_NAME,
+    Schema,
+)
 
-from constants import CONFIG_FILE_NAME
-
-from common import ptconfig
+from common import CompactTraceDataSchema, ptconfig
 
 from .unification import TraceDataFilter
 from .unification.drop_dupes import DropDuplicatesFilter
@@ -22,12 +31,13 @@ from .unification.keep_only_first import KeepOnlyFirstFilter
 
 from .strategy import AnnotationGenStratApplier
 
-from .strategy.stub import StubFileGenerator
+from .strategy.stub import CSTStubFileGenerator, StubFileGenerator
 from .strategy.inline import BruteInlineGenerator, RetentiveInlineGenerator
 
 from .strategy.hinter import LibCSTTypeHintApplier, PyTypesTypeHintApplier
 
 from typegen.trace_data_file_collector import TraceDataFileCollector, DataFileCollector
+from typegen.trace_data_partition_file import TraceDataPartitionFile
 
 __all__ = [
     DataFileCollector.__name__,
@@ -70,6 +80,7 @@ __all__ = [
     type=click.Choice(
         [
             StubFileGenerator.ident,
+            CSTStubFileGenerator.ident,
             RetentiveInlineGenerator.ident,
             BruteInlineGenerator.ident,
         ],
@@ -77,6 +88,7 @@ __all__ = [
     ),
     callback=lambda ctx, _, val: {
         StubFileGenerator.ident: StubFileGenerator,
+        CSTStubFileGenerator.ident: CSTStubFileGenerator,
         RetentiveInlineGenerator.ident: RetentiveInlineGenerator,
         BruteInlineGenerator.ident: BruteInlineGenerator,
     }[val],
@@ -94,6 +106,22 @@ __all__ = [
         PyTypesTypeHintApplier.ident: PyTypesTypeHintApplier,
     }[val],
 )
+@click.option(
+    "-j",
+    "--jobs",
+    help="Amount of processes that generate type hints in parallel, defaults to the amount of CPUs",
+    type=click.IntRange(min=1),
+    required=False,
+    default=os.cpu_count() or 1,
+    show_default=True,
+)
+@click.option(
+    "--compact",
+    help="Hold the trace data with categorical string columns while collecting and unifying it, which uses far less memory",
+    is_flag=True,
+    required=False,
+    default=False,
+)
 @click.option(
     "-v",
     "--verbose",
@@ -136,12 +164,18 @@ def main(**params):
             stdlib_path=pytypes_cfg.pytypes.stdlib_path,
             proj_path=pytypes_cfg.pytypes.proj_path,
             venv_path=pytypes_cfg.pytypes.venv_path,
+            mro_cache_path=pathlib.Path(pytypes_cfg.pytypes.proj_path)
+            / TRACE_DATA_INDEX_FOLDER_NAME
+            / MRO_CACHE_FILE_NAME,
         )
 
         filters.append(impl)
 
     traced_df_folder = pathlib.Path(pytypes_cfg.pytypes.proj_path)
-    collector = TraceDataFileCollector()
+    collector = TraceDataFileCollector(
+        incremental=True,
+        compact_schema=CompactTraceDataSchema() if params["compact"] else None,
+    )
     collector.collect_data(traced_df_folder, include_also_files_in_subdirectories=True)
 
     td_df = collector.trace_data
@@ -152,18 +186,30 @@ def main(**params):
 
     print(f"Shape of filtered trace data: {filtered.shape}")
 
-    result = codemod.parallel_exec_transform_with_prettyprint(
-        transform=AnnotationGenStratApplier(
-            context=codemod.CodemodContext(),
-            generator_strategy=gen_strat,
-            annotation_provider=genimpl,
-            traced=td_df,
-        ),
-        files=cli.gather_files(pytypes_cfg.pytypes.proj_path),
-        jobs=1,
-        blacklist_patterns=["__init__.py"],
-        repo_root=str(pytypes_cfg.pytypes.proj_path),
-    )
+    if params["compact"]:
+        # The type hint appliers write to the trace data, which requires the regular schema
+        td_df = td_df.astype(Schema.TraceData)
+
+    with tempfile.TemporaryDirectory() as partition_folder:
+        traced: pd.DataFrame | TraceDataPartitionFile = td_df
+        if params["jobs"] > 1:
+            # Workers only read the trace data of the files they transform
+            traced = TraceDataPartitionFile.write(
+                pathlib.Path(partition_folder) / f"partitions{TRACE_DATA_FILE_ENDING}", td_df
+            )
+
+        result = codemod.parallel_exec_transform_with_prettyprint(
+            transform=AnnotationGenStratApplier(
+                context=codemod.CodemodContext(),
+                generator_strategy=gen_strat,
+                annotation_provider=genimpl,
+                traced=traced,
+            ),
+            files=cli.gather_files(pytypes_cfg.pytypes.proj_path),
+            jobs=params["jobs"],
+            blacklist_patterns=["__init__.py"],
+            repo_root=str(pytypes_cfg.pytypes.proj_path),
+        )
 
     print(
         f"Finished codemodding {result.successes + result.skips + result.failures} files!",
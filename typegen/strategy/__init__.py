@@ -1,12 +1,13 @@
 import abc
-import functools
 import typing
 
 import libcst as cst
 import libcst.codemod as codemod
+import numpy as np
 import pandas as pd
 
 from constants import Column
+from typegen.trace_data_partition_file import TraceDataPartitionFile
 
 from .hinter import AnnotationProvider
 
@@ -23,11 +24,18 @@ class AnnotationGeneratorStrategy(codemod.Codemod):
         self.provider = provider
 
     def transform_module_impl(self, tree: cst.Module) -> cst.Module:
-        return functools.reduce(
-            lambda m, t: cst.MetadataWrapper(m).visit(t),
-            self.transformers(),
-            tree,
-        )
+        # The given module has already been wrapped for this codemod, see `codemod.Codemod.transform_module`,
+        # so the first transformer reuses the wrapper, instead of copying the module and computing its metadata again
+        wrapper = self.context.wrapper
+        if wrapper is not None and wrapper.module is not tree:
+            wrapper = None
+
+        for transformer in self.transformers():
+            if wrapper is None:
+                wrapper = cst.MetadataWrapper(tree)
+            tree = wrapper.visit(transformer)
+            wrapper = None
+        return tree
 
     @property
     @abc.abstractmethod
@@ -36,6 +44,10 @@ class AnnotationGeneratorStrategy(codemod.Codemod):
 
     @abc.abstractmethod
     def transformers(self) -> typing.Iterator[cst.CSTTransformer]:
+        """
+        :returns: The transformers to apply one after another, each traversing the CST once;
+            transformers that can share a traversal are to be combined by a `CompositeTransformer`
+        """
         pass
 
 
@@ -45,26 +57,44 @@ class AnnotationGenStratApplier(codemod.Codemod):
         context: codemod.CodemodContext,
         generator_strategy: typing.Type[AnnotationGeneratorStrategy],
         annotation_provider: typing.Type[AnnotationProvider],
-        traced: pd.DataFrame,
+        traced: pd.DataFrame | TraceDataPartitionFile,
     ) -> None:
+        """
+        :param context: The codemod's context
+        :param generator_strategy: The strategy for generating type hints
+        :param annotation_provider: Interprets the trace data of each file for the strategy
+        :param traced: The trace data; partitioned in a file when the codemod is run by multiple processes,
+            which keeps it from being pickled in its entirety for every transformed file
+        """
         super().__init__(context=context)
         self.generator_kind = generator_strategy
         self.impl_kind = annotation_provider
         self.traced = traced
 
+        # The trace data is partitioned by file once, instead of being filtered for every transformed file
+        self._partition_positions: dict[str, np.ndarray] = dict()
+        if isinstance(self.traced, pd.DataFrame):
+            self._partition_positions = self.traced.groupby(Column.FILENAME, sort=False).indices
+
     def transform_module_impl(self, tree: cst.Module) -> cst.Module:
-        if self.context.filename is not None:
-            relevant = self.traced[self.traced[Column.FILENAME] == str(self.context.filename)]
+        if isinstance(self.traced, TraceDataPartitionFile):
+            assert self.context.filename is not None
+            relevant = self.traced.partition(str(self.context.filename))
+        elif self.context.filename is not None:
+            positions = self._partition_positions.get(str(self.context.filename), np.array([], dtype=int))
+            relevant = self.traced.take(positions)
         else:
             relevant = self.traced
 
-        impl = self.impl_kind(context=self.context, traced=relevant)
+        # The strategy and the providers it creates are handed the trace data of this file only
         generator = self.generator_kind(
             context=self.context,
+            provider=self.impl_kind,
             traced=relevant,
         )
 
-        return generator.transform_module(tree)
+        # The module has already been wrapped for this codemod, which the strategy shares the context of
+        return generator.transform_module_impl(tree)
 
 
 __all__ = [
@@ -0,0 +1,106 @@
+import contextlib
+import typing
+
+import libcst as cst
+from libcst._nodes.base import CSTNodeT
+
+
+STATEMENT_CONTAINERS: tuple[type[cst.CSTNode], ...] = (
+    cst.Module,
+    cst.BaseCompoundStatement,
+    cst.SimpleStatementLine,
+    cst.BaseSuite,
+    cst.Else,
+    cst.ExceptHandler,
+    cst.ExceptStarHandler,
+    cst.Finally,
+    cst.MatchCase,
+    cst.Parameters,
+)
+"""
+Nodes that may contain statements or parameters of functions.
+Transformers that only handle these need not descend into any other nodes,
+which spares a `CompositeTransformer` of such transformers from visiting most of the CST
+"""
+
+
+class CompositeTransformer(cst.CSTTransformer):
+    """
+    Applies a sequence of transformers in a single traversal of the CST,
+    instead of wrapping and traversing the CST once per transformer.
+
+    Every node is visited by each transformer in turn. When leaving a node, the node returned by a transformer
+    is handed to the next one as the updated node, while the original node remains that of the traversed CST.
+    If a transformer replaces a node by one of a different type, the following transformers handle it as such,
+    e.g. `leave_Assign` is called for an `AnnAssign` that has been replaced by an `Assign`.
+    Nodes that have been removed, or replaced by several nodes, are not handed to the following transformers.
+    Hence, transformers are only to be composed if the following ones do not depend on such nodes.
+
+    The metadata of all transformers is resolved once, on the traversed CST, i.e. the original one.
+    Positions therefore refer to the original code, which the trace data refers to as well.
+    """
+
+    def __init__(self, transformers: typing.Iterable[cst.CSTTransformer]) -> None:
+        """
+        :param transformers: The transformers to apply, in the order they would be applied in separately
+        """
+        super().__init__()
+        self.transformers = list(transformers)
+
+        # Transformers that do not visit the children of a node, mapped to that node
+        self._skipped_at: dict[int, cst.CSTNode] = dict()
+
+    @contextlib.contextmanager
+    def resolve(self, wrapper: cst.MetadataWrapper) -> typing.Iterator[None]:
+        with contextlib.ExitStack() as stack:
+            for transformer in self.transformers:
+                stack.enter_context(transformer.resolve(wrapper))
+            yield
+
+    def _visiting(self) -> typing.Iterable[cst.CSTTransformer]:
+        if not self._skipped_at:
+            return self.transformers
+        return [
+            transformer
+            for position, transformer in enumerate(self.transformers)
+            if position not in self._skipped_at
+        ]
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        for position, transformer in enumerate(self.transformers):
+            if position not in self._skipped_at and not transformer.on_visit(node):
+                self._skipped_at[position] = node
+
+        return len(self._skipped_at) < len(self.transformers)
+
+    def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+        for transformer in self._visiting():
+            transformer.on_visit_attribute(node, attribute)
+
+    def on_leave_attribute(self, original_node: cst.CSTNode, attribute: str) -> None:
+        for transformer in self._visiting():
+            transformer.on_leave_attribute(original_node, attribute)
+
+    def on_leave(
+        self, original_node: CSTNodeT, updated_node: CSTNodeT
+    ) -> CSTNodeT | cst.RemovalSentinel | cst.FlattenSentinel[CSTNodeT]:
+        node: typing.Any = updated_node
+
+        for position, transformer in enumerate(self.transformers):
+            skipped_at = self._skipped_at.get(position)
+            if skipped_at is not None:
+                if skipped_at is not original_node:
+                    continue
+                del self._skipped_at[position]
+
+            if not isinstance(node, cst.CSTNode):
+                continue
+
+            if type(node) is type(original_node):
+                node = transformer.on_leave(original_node, node)
+            else:
+                leave_func = getattr(transformer, f"leave_{type(node).__name__}", None)
+                if leave_func is not None:
+                    node = leave_func(original_node, node)
+
+        return node
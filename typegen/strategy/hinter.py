@@ -22,6 +22,8 @@ import pandas as pd
 from constants import Column
 from common.trace_data_category import TraceDataCategory
 
+from .composite import STATEMENT_CONTAINERS
+
 
 def _create_annotation(vartype: str) -> cst.Annotation:
     return cst.Annotation(annotation=cst.parse_expression(vartype))
@@ -29,11 +31,12 @@ def _create_annotation(vartype: str) -> cst.Annotation:
 
 class AnnotationProvider(codemod.ContextAwareTransformer):
     def __init__(self, context: codemod.CodemodContext, traced: pd.DataFrame) -> None:
+        """
+        :param context: The codemod's context
+        :param traced: The trace data of the transformed file, as partitioned by `AnnotationGenStratApplier`
+        """
         super().__init__(context=context)
-        if self.context.filename:
-            self.traced = traced[traced[Column.FILENAME] == self.context.filename]
-        else:
-            self.traced = traced
+        self.traced = traced
 
 
 class LibCSTTypeHintApplier(AnnotationProvider):
@@ -204,14 +207,44 @@ def _find_targets(
     return extractor.targets
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse_vartype(vartype: str) -> cst.BaseExpression:
+    return cst.parse_expression(vartype)
+
+
 def _create_annotation_from_vartype(vartype: str) -> cst.Annotation:
-    return cst.Annotation(annotation=cst.parse_expression(vartype))
+    # The same types are hinted over and over again, so each is only parsed once;
+    # every annotation holds its own copy, as nodes may not occur in a CST more than once
+    return cst.Annotation(annotation=_parse_vartype(vartype).deep_clone())
+
+
+_TraceKey = tuple[typing.Any, ...]
+
+
+def _index_rows(traced: pd.DataFrame, columns: list[str]) -> dict[_TraceKey, list[int]]:
+    """
+    Map each combination of values of the given columns to the positions of the rows holding it.
+    Missing values are represented by None.
+
+    :param traced: The trace data to index
+    :param columns: The columns that make up the keys
+    :returns: The positions of the rows of each key, in ascending order
+    """
+    values = [
+        traced[column].astype(object).where(traced[column].notna(), None).tolist()
+        for column in columns
+    ]
+
+    index: dict[_TraceKey, list[int]] = dict()
+    for position, key in enumerate(zip(*values)):
+        index.setdefault(key, []).append(position)
+    return index
 
 
 class PyTypesTypeHintApplier(AnnotationProvider):
     """Transforms the CST by adding the traced type hints without modifying the original type hints."""
 
-    METADATA_DEPENDENCIES = (metadata.PositionProvider, metadata.ScopeProvider)
+    METADATA_DEPENDENCIES = (metadata.PositionProvider,)
 
     ident = "pytypes"
 
@@ -226,22 +259,62 @@ class PyTypesTypeHintApplier(AnnotationProvider):
         mask = functools.reduce(operator.and_, [builtin_mask, nonetype_mask])
         self.traced.loc[mask, Column.VARTYPE] = "None"
 
+        # Every visited node looks up the trace data of its own variables, so the rows are indexed once
+        # by the columns they are looked up by, instead of masking the entire trace data per node.
+        # Parameters are identified by their function, everything else by its line.
+        # Lookups yield the positions of the matching rows
+        self._varnames = self.traced[Column.VARNAME].tolist()
+        self._linenos = self.traced[Column.LINENO].tolist()
+        self._vartypes = self.traced[Column.VARTYPE].tolist()
+        self._rows_by_line = _index_rows(
+            self.traced,
+            [Column.CATEGORY, Column.CLASS_MODULE, Column.CLASS, Column.LINENO, Column.VARNAME],
+        )
+        self._rows_by_function = _index_rows(
+            self.traced,
+            [Column.CATEGORY, Column.CLASS_MODULE, Column.CLASS, Column.FUNCNAME, Column.VARNAME],
+        )
+
         self._scope_stack: list[cst.FunctionDef | cst.ClassDef] = []
 
         self._globals_by_scope: dict[cst.FunctionDef, set[str]] = {}
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    def _lookup(self, index: dict[_TraceKey, list[int]], keys: typing.Iterable[_TraceKey]) -> list[int]:
+        """
+        :param index: Either of the indices built on construction
+        :param keys: The keys to look up
+        :returns: The positions of the rows of all given keys, in the order of the trace data
+        """
+        return sorted(
+            itertools.chain.from_iterable(index.get(key, ()) for key in dict.fromkeys(keys))
+        )
+
+    def _class_keys(self, class_names: typing.Iterable[str]) -> list[tuple[str | None, str | None]]:
+        """
+        :param class_names: Names of classes of the module that is being transformed, or nothing if not within a class
+        :returns: The values of the class module and class columns of the given classes
+        """
+        class_names = list(class_names)
+        if not class_names:
+            return [(None, None)]
+
+        # The class module column can only ever contain project files, as we never
+        # trace the internals of files outside of the given project
+        # (i.e. no stdlib, no venv etc.), so this check is safe
+        if self.context.full_module_name is None:
+            return []
+        return [(self.context.full_module_name, class_name) for class_name in class_names]
+
     def _is_global_scope(self) -> bool:
         return len(self._scope_stack) == 0
 
-    def _all_scopes_of(self, node: cst.CSTNode) -> typing.Iterator[cst.CSTNode]:
-        yield (scope := self.get_metadata(metadata.ScopeProvider, node).parent)
-
-        match scope:
-            case metadata.ClassScope(node=p) | metadata.FunctionScope(node=p):
-                yield from self._all_scopes_of(p)
-            case _:
-                return
+    def _all_scopes_of(self, fdef: cst.FunctionDef) -> typing.Iterator[cst.FunctionDef | cst.ClassDef]:
+        # Walk the scopes like the parents of libcst's scopes were walked,
+        # i.e. continue from the scope enclosing the scope a class or function is defined in,
+        # without the cost of libcst's scope analysis
+        position = next(i for i, scope in enumerate(self._scope_stack) if scope is fdef)
+        yield from self._scope_stack[position - 1 :: -2] if position > 0 else ()
 
     def _innermost_class(self) -> cst.ClassDef | None:
         fromtop = reversed(self._scope_stack)
@@ -284,9 +357,9 @@ class PyTypesTypeHintApplier(AnnotationProvider):
 
     def _get_trace_for_targets(
         self, node: cst.Assign | cst.AnnAssign | cst.AugAssign
-    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, Targets]:
+    ) -> tuple[list[int], list[int], list[int], Targets]:
         """
-        Fetches trace data for the targets from the given assignment statement.
+        Fetches the positions of the trace data rows for the targets from the given assignment statement.
         Return order is (global variables, local variables, class attributes, targets)
         """
         targets = _find_targets(node)
@@ -318,119 +391,99 @@ class PyTypesTypeHintApplier(AnnotationProvider):
             if isinstance(scope, cst.ClassDef):
                 containing_classes.append(scope)
 
-        if not len(containing_classes):
-            class_mask = self.traced[Column.CLASS].isnull()
-            class_module_mask = self.traced[Column.CLASS_MODULE].isnull()
-        else:
-            class_names = list(map(lambda c: c.name.value, containing_classes))
-            class_mask = self.traced[Column.CLASS].isin(class_names)
-
-            # This column can only ever contain project files, as we never
-            # trace the internals of files outside of the given project
-            # (i.e. no stdlib, no venv etc.), so this check is safe
-            class_module_mask = self.traced[Column.CLASS_MODULE] == self.context.full_module_name
+        class_keys = self._class_keys(map(lambda c: c.name.value, containing_classes))
 
         pos = self.get_metadata(metadata.PositionProvider, node).start
 
-        local_var_mask = [
-            class_module_mask,
-            class_mask,
-            self.traced[Column.LINENO] == pos.line,
-            self.traced[Column.CATEGORY] == TraceDataCategory.LOCAL_VARIABLE,
-            self.traced[Column.VARNAME].isin(local_var_idents),
-        ]
-        attr_mask = [
-            class_module_mask,
-            class_mask,
-            self.traced[Column.LINENO] == 0,
-            self.traced[Column.CATEGORY] == TraceDataCategory.CLASS_MEMBER,
-            self.traced[Column.VARNAME].isin(attr_idents),
-        ]
-
-        global_var_mask = [
-            self.traced[Column.CLASS_MODULE].isnull(),
-            self.traced[Column.CLASS].isnull(),
-            self.traced[Column.LINENO] == 0,
-            self.traced[Column.CATEGORY] == TraceDataCategory.GLOBAL_VARIABLE,
-            self.traced[Column.VARNAME].isin(global_var_idents),
-        ]
-
-        local_vars = self.traced[functools.reduce(operator.and_, local_var_mask)]
-        attrs = self.traced[functools.reduce(operator.and_, attr_mask)]
-        global_vars = self.traced[functools.reduce(operator.and_, global_var_mask)]
+        local_vars = self._lookup(
+            self._rows_by_line,
+            (
+                (TraceDataCategory.LOCAL_VARIABLE, *class_key, pos.line, ident)
+                for class_key in class_keys
+                for ident in local_var_idents
+            ),
+        )
+        attrs = self._lookup(
+            self._rows_by_line,
+            (
+                (TraceDataCategory.CLASS_MEMBER, *class_key, 0, ident)
+                for class_key in class_keys
+                for ident in attr_idents
+            ),
+        )
+        global_vars = self._lookup(
+            self._rows_by_line,
+            ((TraceDataCategory.GLOBAL_VARIABLE, None, None, 0, ident) for ident in global_var_idents),
+        )
 
         return global_vars, local_vars, attrs, targets
 
-    def _load_hint_row_from_frames(
+    def _load_hint_rows(
         self,
-        global_vars: pd.DataFrame,
-        local_vars: pd.DataFrame,
-        class_members: pd.DataFrame,
+        global_vars: list[int],
+        local_vars: list[int],
+        class_members: list[int],
         ident: str,
         var: cst.BaseAssignTargetExpression,
-    ) -> pd.DataFrame:
+    ) -> list[int]:
         if isinstance(var, cst.Name):
             if self._is_global_scope():
                 self.logger.debug(f"Searching for '{ident}' in global variables")
-                hinted = global_vars[global_vars[Column.VARNAME] == ident]
+                hinted = [row for row in global_vars if self._varnames[row] == ident]
             else:
                 line_no = self.get_metadata(metadata.PositionProvider, var).start.line
                 self.logger.debug(f"Searching for '{ident}' in local variables on line {line_no}")
-                hinted = local_vars[
-                    (local_vars[Column.VARNAME] == ident) & (local_vars[Column.LINENO] == line_no)
+                hinted = [
+                    row
+                    for row in local_vars
+                    if self._varnames[row] == ident and self._linenos[row] == line_no
                 ]
         elif isinstance(var, cst.Attribute):
             self.logger.debug(f"Searching for '{ident}' in class attributes")
-            hinted = class_members[class_members[Column.VARNAME] == ident]
+            hinted = [row for row in class_members if self._varnames[row] == ident]
         else:
             raise TypeError(f"Unhandled subtype: {type(var)}")
         return hinted
 
-    def _get_trace_for_param(self, node: cst.Param) -> pd.DataFrame:
+    def _get_trace_for_param(self, node: cst.Param) -> list[int]:
         # Retrieve outermost function from parent stack
         fdef = self._innermost_function()
         assert fdef is not None, f"param {node.name.value} has not been associated with a function"
 
-        scopes = self._all_scopes_of(node)
-        if any(isinstance(s := scope, metadata.ClassScope) for scope in scopes):
-            self.logger.debug(f"Searching for {node.name} in {s.name}")
-            clazz_mask = self.traced[Column.CLASS] == s.name
-            class_module_mask = self.traced[Column.CLASS_MODULE] == self.context.full_module_name
+        scopes = self._all_scopes_of(fdef)
+        if any(isinstance(s := scope, cst.ClassDef) for scope in scopes):
+            self.logger.debug(f"Searching for {node.name} in {s.name.value}")
+            class_keys = self._class_keys([s.name.value])
         else:
             self.logger.debug(f"Searching for {node.name} outside of class scope")
-            clazz_mask = self.traced[Column.CLASS].isnull()
-            class_module_mask = self.traced[Column.CLASS_MODULE].isnull()
-
-        param_masks = [
-            clazz_mask,
-            class_module_mask,
-            self.traced[Column.CATEGORY] == TraceDataCategory.CALLABLE_PARAMETER,
-            self.traced[Column.FUNCNAME] == fdef.name.value,
-            self.traced[Column.VARNAME] == node.name.value,
-        ]
-        params = self.traced[functools.reduce(operator.and_, param_masks)]
-        return params
+            class_keys = self._class_keys([])
+
+        return self._lookup(
+            self._rows_by_function,
+            (
+                (TraceDataCategory.CALLABLE_PARAMETER, *class_key, fdef.name.value, node.name.value)
+                for class_key in class_keys
+            ),
+        )
 
-    def _get_trace_for_rettype(self, node: cst.FunctionDef) -> pd.DataFrame:
+    def _get_trace_for_rettype(self, node: cst.FunctionDef) -> list[int]:
         # Retrieve outermost class from parent stack
         # to disambig. methods and functions
         cdef = self._innermost_class()
-        if cdef is not None:
-            clazz_mask = self.traced[Column.CLASS] == cdef.name.value
-            class_module_mask = self.traced[Column.CLASS_MODULE] == self.context.full_module_name
-        else:
-            clazz_mask = self.traced[Column.CLASS].isnull()
-            class_module_mask = self.traced[Column.CLASS_MODULE].isnull()
-
-        rettype_masks = [
-            class_module_mask,
-            clazz_mask,
-            self.traced[Column.LINENO] == 0,  # return type, always stored at line 0
-            self.traced[Column.CATEGORY] == TraceDataCategory.CALLABLE_RETURN,
-            self.traced[Column.VARNAME] == node.name.value,
-        ]
-        rettypes = self.traced[functools.reduce(operator.and_, rettype_masks)]
-        return rettypes
+        class_keys = self._class_keys([cdef.name.value] if cdef is not None else [])
+
+        # return type, always stored at line 0
+        return self._lookup(
+            self._rows_by_line,
+            (
+                (TraceDataCategory.CALLABLE_RETURN, *class_key, 0, node.name.value)
+                for class_key in class_keys
+            ),
+        )
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Only statements and parameters are annotated; parameters of lambdas cannot be
+        return super().on_visit(node) and isinstance(node, STATEMENT_CONTAINERS)
 
     def visit_ClassDef(self, cdef: cst.ClassDef) -> bool | None:
         self.logger.info(f"Entering class '{cdef.name.value}'")
@@ -478,17 +531,17 @@ class PyTypesTypeHintApplier(AnnotationProvider):
 
         rettypes = self._get_trace_for_rettype(original_node)
 
-        if rettypes.shape[0] > 1:
+        if len(rettypes) > 1:
             self._on_multiple_hints_found(original_node.name.value, rettypes, original_node)
 
         returns: cst.Annotation | None
 
         # no type hint, skip
-        if rettypes.empty:
+        if not rettypes:
             self.logger.warning(f"No return type hint found for {original_node.name.value}")
             return updated_node
         else:
-            rettype = rettypes[Column.VARTYPE].values[0]
+            rettype = self._vartypes[rettypes[0]]
             assert rettype is not None
 
             self.logger.info(
@@ -500,7 +553,7 @@ class PyTypesTypeHintApplier(AnnotationProvider):
 
     def leave_Param(self, original_node: cst.Param, updated_node: cst.Param) -> cst.Param:
         params = self._get_trace_for_param(original_node)
-        if params.shape[0] > 1:
+        if len(params) > 1:
             self._on_multiple_hints_found(
                 updated_node.name.value,
                 params,
@@ -514,11 +567,11 @@ class PyTypesTypeHintApplier(AnnotationProvider):
             return updated_node
 
         # no type hint, skip
-        if params.empty:
+        if not params:
             self.logger.warning(f"No hint found for parameter '{original_node.name.value}'")
             return updated_node
 
-        argtype = params[Column.VARTYPE].values[0]
+        argtype = self._vartypes[params[0]]
         assert argtype is not None
 
         self.logger.info(f"Applying hint '{argtype}' to parameter '{original_node.name.value}'")
@@ -531,18 +584,16 @@ class PyTypesTypeHintApplier(AnnotationProvider):
         hinted_targets: list[cst.AnnAssign] = []
 
         for ident, var in itertools.chain(targets.attrs, targets.names):
-            hinted = self._load_hint_row_from_frames(
-                global_vars, local_vars, class_members, ident, var
-            )
-            if hinted.empty:
+            hinted = self._load_hint_rows(global_vars, local_vars, class_members, ident, var)
+            if not hinted:
                 self.logger.warning(
                     f"No type hint stored for {ident} in AugAssign; Not adding AnnAssign for AugAssign"
                 )
                 continue
-            if hinted.shape[0] > 1:
+            if len(hinted) > 1:
                 self._on_multiple_hints_found(ident, hinted, original_node)
 
-            hint = hinted[Column.VARTYPE].values[0]
+            hint = self._vartypes[hinted[0]]
             assert hint is not None
 
             hinted_targets.append(
@@ -566,10 +617,8 @@ class PyTypesTypeHintApplier(AnnotationProvider):
         hinted_targets: list[cst.AnnAssign] = []
 
         for ident, var in itertools.chain(targets.attrs, targets.names):
-            hinted = self._load_hint_row_from_frames(
-                global_vars, local_vars, class_members, ident, var
-            )
-            if hinted.empty:
+            hinted = self._load_hint_rows(global_vars, local_vars, class_members, ident, var)
+            if not hinted:
                 if isinstance(var, cst.Attribute):
                     self.logger.debug(
                         f"Skipping hint for '{ident}', as annotating "
@@ -586,10 +635,10 @@ class PyTypesTypeHintApplier(AnnotationProvider):
                 self.logger.warning("Not adding AnnAssign for Assign")
                 continue
 
-            if hinted.shape[0] > 1:
+            if len(hinted) > 1:
                 self._on_multiple_hints_found(ident, hinted, original_node)
 
-            hint_ty = hinted[Column.VARTYPE].values[0]
+            hint_ty = self._vartypes[hinted[0]]
             assert hint_ty is not None
 
             self.logger.info(f"Found '{hint_ty}' for '{ident}'")
@@ -626,17 +675,17 @@ class PyTypesTypeHintApplier(AnnotationProvider):
         ident, var = next(itertools.chain(targets.attrs, targets.names))
         self.logger.debug(f"Searching for hints to '{ident}' for an AnnAssign")
 
-        hinted = self._load_hint_row_from_frames(global_vars, local_vars, class_members, ident, var)
-        if hinted.shape[0] > 1:
+        hinted = self._load_hint_rows(global_vars, local_vars, class_members, ident, var)
+        if len(hinted) > 1:
             self._on_multiple_hints_found(ident, hinted, original_node)
 
-        if hinted.empty and original_node.value is None:
+        if not hinted and original_node.value is None:
             self.logger.info(
                 "Removing AnnAssign without value because no type hint can be provided"
             )
             return cst.RemoveFromParent()
 
-        elif hinted.empty and original_node.value is not None:
+        elif not hinted and original_node.value is not None:
             self.logger.info(
                 "Replacing AnnAssign with value by Assign without type hint because no type hint can be provided"
             )
@@ -646,7 +695,7 @@ class PyTypesTypeHintApplier(AnnotationProvider):
             )
 
         else:
-            hint_ty = hinted[Column.VARTYPE].values[0]
+            hint_ty = self._vartypes[hinted[0]]
             assert hint_ty is not None
 
             self.logger.info(f"Using '{hint_ty}' for the AnnAssign with '{ident}'")
@@ -659,7 +708,7 @@ class PyTypesTypeHintApplier(AnnotationProvider):
             )
 
     def _on_multiple_hints_found(
-        self, ident: str, hints_found: pd.DataFrame, node: cst.CSTNode
+        self, ident: str, hints_found: list[int], node: cst.CSTNode
     ) -> typing.NoReturn:
         try:
             stringified = cst.Module([]).code_for_node(node)
@@ -668,5 +717,5 @@ class PyTypesTypeHintApplier(AnnotationProvider):
         file = self.traced[Column.FILENAME].values[0]
         with pd.option_context("display.max_rows", None, "display.max_columns", None):
             raise ValueError(
-                f"In {file}: found more than one type hint for {ident}\nNode: {stringified}\n{hints_found}"
+                f"In {file}: found more than one type hint for {ident}\nNode: {stringified}\n{self.traced.iloc[hints_found]}"
             )
@@ -17,6 +17,10 @@ class AddImportTransformer(cst.CSTTransformer):
         self.context = context
         self.traced = traced.copy()
 
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Imports are added to the module as a whole
+        return isinstance(node, cst.Module)
+
     def leave_Module(self, _: cst.Module, tree: cst.Module) -> cst.Module:
         from libcst.codemod.visitors._add_imports import AddHintableImportsVisitor
 
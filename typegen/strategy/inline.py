@@ -3,6 +3,7 @@ import typing
 import libcst as cst
 
 from . import AnnotationGeneratorStrategy
+from .composite import CompositeTransformer
 from .imports import AddImportTransformer
 
 from .remover import HintRemover
@@ -14,10 +15,12 @@ class BruteInlineGenerator(AnnotationGeneratorStrategy):
     ident = "brute"
 
     def transformers(self) -> typing.Iterator[cst.CSTTransformer]:
-        yield from (
-            HintRemover(),
-            self.provider(context=self.context, traced=self.traced),
-            AddImportTransformer(context=self.context, traced=self.traced),
+        yield CompositeTransformer(
+            (
+                HintRemover(),
+                self.provider(context=self.context, traced=self.traced),
+                AddImportTransformer(context=self.context, traced=self.traced),
+            )
         )
 
 
@@ -27,7 +30,9 @@ class RetentiveInlineGenerator(AnnotationGeneratorStrategy):
     ident = "retentive"
 
     def transformers(self) -> typing.Iterator[cst.CSTTransformer]:
-        yield from (
-            self.provider(context=self.context, traced=self.traced),
-            AddImportTransformer(context=self.context, traced=self.traced),
+        yield CompositeTransformer(
+            (
+                self.provider(context=self.context, traced=self.traced),
+                AddImportTransformer(context=self.context, traced=self.traced),
+            )
         )
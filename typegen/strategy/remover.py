@@ -1,5 +1,7 @@
 import libcst as cst
 
+from .composite import STATEMENT_CONTAINERS
+
 
 class ParameterHintRemover(cst.CSTTransformer):
     def leave_Param(self, _: cst.Param, updated_node: cst.Param) -> cst.Param:
@@ -26,4 +28,6 @@ class AssignHintRemover(cst.CSTTransformer):
 
 
 class HintRemover(AssignHintRemover, ParameterHintRemover, ReturnHintRemover):
-    pass
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Hints are part of statements and parameters; parameters of lambdas cannot be hinted
+        return super().on_visit(node) and isinstance(node, STATEMENT_CONTAINERS)
@@ -7,6 +7,7 @@ import pandas as pd
 import libcst as cst
 
 from . import AnnotationGeneratorStrategy
+from .composite import CompositeTransformer
 from .imports import AddImportTransformer
 from .hinter import LibCSTTypeHintApplier
 
@@ -56,6 +57,10 @@ class ImportUnionTransformer(cst.CSTTransformer):
 class MyPyHintTransformer(cst.CSTTransformer):
     """Replaces the CST with the corresponding stub CST, generated using mypy.stubgen."""
 
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # The stub is generated from the module as a whole
+        return isinstance(node, cst.Module)
+
     def leave_Module(self, _: cst.Module, updated_node: cst.Module) -> cst.Module:
         # Store inline hinted ast in temporary file so that mypy can
         # extract our applied hints to it
@@ -93,15 +98,469 @@ class MyPyHintTransformer(cst.CSTTransformer):
             return cst.parse_module(stub_file_content)
 
 
+_NO_WHITESPACE = cst.SimpleWhitespace("")
+_TIGHT_EQUAL = cst.AssignEqual(whitespace_before=_NO_WHITESPACE, whitespace_after=_NO_WHITESPACE)
+_ELLIPSIS_SUITE = cst.SimpleStatementSuite(body=[cst.Expr(cst.Ellipsis())])
+
+
+def _is_type_checking_guard(node: cst.If) -> bool:
+    match node.test:
+        case cst.Name(value="TYPE_CHECKING") | cst.Attribute(
+            value=cst.Name(value="typing"), attr=cst.Name(value="TYPE_CHECKING")
+        ):
+            return True
+        case _:
+            return False
+
+
+def _literal_type(value: cst.BaseExpression) -> str | None:
+    match value:
+        case cst.Integer():
+            return "int"
+        case cst.Float():
+            return "float"
+        case cst.Imaginary():
+            return "complex"
+        case cst.Name(value="True" | "False"):
+            return "bool"
+        case cst.SimpleString() | cst.FormattedString():
+            return "bytes" if "b" in value.prefix.lower() else "str"
+        case cst.ConcatenatedString(left=left):
+            return _literal_type(left)
+        case cst.UnaryOperation(operator=cst.Minus() | cst.Plus(), expression=operand):
+            return _literal_type(operand)
+        case _:
+            return None
+
+
+_TYPE_DEFINING_CALLS = frozenset(
+    ("TypeVar", "ParamSpec", "TypeVarTuple", "NewType", "NamedTuple", "TypedDict")
+)
+
+
+def _is_type_definition(value: cst.BaseExpression) -> bool:
+    # Type aliases and the definitions of types that stubs refer to, which are kept as assigned
+    match value:
+        case cst.Call(func=cst.Name(value=name) | cst.Attribute(attr=cst.Name(value=name))):
+            return name in _TYPE_DEFINING_CALLS
+        case cst.Subscript():
+            return True
+        case cst.Name(value=name):
+            return name not in ("None", "True", "False")
+        case cst.Attribute(value=inner):
+            return _is_type_definition(inner)
+        case cst.BinaryOperation(operator=cst.BitOr(), left=left, right=right):
+            return all(
+                (isinstance(operand, cst.Name) and operand.value == "None") or _is_type_definition(operand)
+                for operand in (left, right)
+            )
+        case _:
+            return False
+
+
+class _ReturnsNoneVisitor(cst.CSTVisitor):
+    """
+    Determines whether a function evidently returns None, i.e. it neither returns nor yields a value,
+    nor raises, which abstract functions tend to do; nested functions and classes are disregarded
+    """
+
+    def __init__(self) -> None:
+        self.returns_none = True
+
+    def visit_Return(self, node: cst.Return) -> bool | None:
+        if node.value is not None:
+            self.returns_none = False
+        return False
+
+    def visit_Yield(self, _: cst.Yield) -> bool | None:
+        self.returns_none = False
+        return False
+
+    def visit_Raise(self, _: cst.Raise) -> bool | None:
+        self.returns_none = False
+        return False
+
+    def visit_FunctionDef(self, _: cst.FunctionDef) -> bool | None:
+        return False
+
+    def visit_ClassDef(self, _: cst.ClassDef) -> bool | None:
+        return False
+
+    def visit_Lambda(self, _: cst.Lambda) -> bool | None:
+        return False
+
+
+class _InstanceAttributeVisitor(cst.CSTVisitor):
+    """Collects the attributes that a method assigns to its instance, with their annotations if given"""
+
+    def __init__(self, instance: str) -> None:
+        self.instance = instance
+        self.attributes: dict[str, cst.Annotation | None] = dict()
+
+    def _is_instance_attribute(self, target: cst.BaseExpression) -> bool:
+        return (
+            isinstance(target, cst.Attribute)
+            and isinstance(target.value, cst.Name)
+            and target.value.value == self.instance
+        )
+
+    def visit_AnnAssign(self, node: cst.AnnAssign) -> bool | None:
+        if self._is_instance_attribute(node.target):
+            assert isinstance(node.target, cst.Attribute)
+            if self.attributes.get(node.target.attr.value) is None:
+                self.attributes[node.target.attr.value] = node.annotation
+        return False
+
+    def visit_Assign(self, node: cst.Assign) -> bool | None:
+        literal = _literal_type(node.value)
+        for target in node.targets:
+            if self._is_instance_attribute(target.target):
+                assert isinstance(target.target, cst.Attribute)
+                if self.attributes.get(target.target.attr.value) is None and literal is not None:
+                    self.attributes[target.target.attr.value] = cst.Annotation(cst.Name(literal))
+                else:
+                    self.attributes.setdefault(target.target.attr.value, None)
+        return False
+
+
+class CSTStubTransformer(cst.CSTTransformer):
+    """
+    Replaces the CST with the corresponding stub CST, derived from the CST itself instead of generated by mypy.stubgen.
+
+    Function and method bodies are dropped, while their signatures and annotations are kept.
+    Variables and attributes, including those assigned to instances within methods, are declared with their annotations.
+    Imports are kept, and lifted out of `if TYPE_CHECKING:` blocks.
+    Declarations within `try`, `with`, `for` and `while` blocks, including their handlers and `else` and `finally` blocks,
+    are lifted out of them as well, while other `if` blocks are kept.
+    Type aliases, i.e. assignments of subscripts, names or unions of them, and definitions of `TypeVar`s, `ParamSpec`s,
+    `NewType`s, `NamedTuple`s and `TypedDict`s by calls are kept as they are.
+    Unlike mypy.stubgen, no semantic analysis is performed, so types are only inferred
+    for variables that are assigned literals, and for functions that never return a value,
+    which are annotated to return None. Other unannotated variables are declared as `Incomplete`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._requires_incomplete = False
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # The stub is derived from the module as a whole
+        return isinstance(node, cst.Module)
+
+    def leave_Module(self, _: cst.Module, updated_node: cst.Module) -> cst.Module:
+        self._requires_incomplete = False
+        body = self._stub_body(updated_node.body, in_class=False)
+
+        if self._requires_incomplete:
+            imports = 0
+            while imports < len(body) and _statement_kind(body[imports]) == "import":
+                imports += 1
+            body.insert(imports, cst.parse_statement("from _typeshed import Incomplete"))
+
+        # Group statements of the same kind, and set classes apart
+        separated: list[cst.SimpleStatementLine | cst.BaseCompoundStatement] = list()
+        for i, statement in enumerate(body):
+            if i > 0:
+                kind, previous = _statement_kind(statement), _statement_kind(body[i - 1])
+                if kind != previous or kind == "class":
+                    statement = statement.with_changes(leading_lines=[cst.EmptyLine()])
+            separated.append(statement)
+
+        return cst.Module(body=separated)
+
+    def _stub_body(
+        self, statements: typing.Iterable[cst.BaseStatement], in_class: bool
+    ) -> list[cst.SimpleStatementLine | cst.BaseCompoundStatement]:
+        stubbed: list[cst.SimpleStatementLine | cst.BaseCompoundStatement] = list()
+        declared: set[str] = set()
+
+        def declare(name: str, annotation: cst.Annotation | None) -> None:
+            if name in declared:
+                return
+            declared.add(name)
+
+            if annotation is None:
+                self._requires_incomplete = True
+                annotation = cst.Annotation(cst.Name("Incomplete"))
+            stubbed.append(
+                cst.SimpleStatementLine(
+                    body=[
+                        cst.AnnAssign(
+                            target=cst.Name(name),
+                            annotation=cst.Annotation(annotation.annotation),
+                        )
+                    ]
+                )
+            )
+
+        for statement in _lifted(statements):
+            match statement:
+                case cst.SimpleStatementLine(body=small_statements):
+                    for small in small_statements:
+                        match small:
+                            case cst.ImportFrom(module=cst.Name(value="__future__")):
+                                pass
+                            case cst.Import() | cst.ImportFrom():
+                                if (kept := _without_type_checking_import(small)) is not None:
+                                    stubbed.append(
+                                        cst.SimpleStatementLine(
+                                            body=[kept.with_changes(semicolon=cst.MaybeSentinel.DEFAULT)]
+                                        )
+                                    )
+                            case cst.AnnAssign(target=cst.Name(value=name), annotation=annotation):
+                                declare(name, annotation)
+                            case cst.Assign(
+                                targets=[cst.AssignTarget(target=cst.Name(value="__all__"))]
+                            ) if not in_class:
+                                stubbed.append(
+                                    cst.SimpleStatementLine(
+                                        body=[small.with_changes(semicolon=cst.MaybeSentinel.DEFAULT)]
+                                    )
+                                )
+                                declared.add("__all__")
+                            case cst.Assign(
+                                targets=[cst.AssignTarget(target=cst.Name(value=name))], value=value
+                            ) if _is_type_definition(value):
+                                if name not in declared:
+                                    stubbed.append(
+                                        cst.SimpleStatementLine(
+                                            body=[small.with_changes(semicolon=cst.MaybeSentinel.DEFAULT)]
+                                        )
+                                    )
+                                    declared.add(name)
+                            case cst.Assign(targets=targets, value=value):
+                                literal = _literal_type(value)
+                                for target in targets:
+                                    if isinstance(target.target, cst.Name):
+                                        inferred = (
+                                            cst.Annotation(cst.Name(literal)) if literal is not None else None
+                                        )
+                                        declare(target.target.value, inferred)
+                                    elif isinstance(target.target, cst.Tuple | cst.List):
+                                        for element in target.target.elements:
+                                            if isinstance(element.value, cst.Name):
+                                                declare(element.value.value, None)
+
+                case cst.FunctionDef():
+                    if in_class:
+                        for name, attribute_annotation in _instance_attributes(statement).items():
+                            declare(name, attribute_annotation)
+                    stubbed.append(_stub_function(statement))
+                    declared.add(statement.name.value)
+
+                case cst.ClassDef():
+                    stubbed.append(self._stub_class(statement))
+                    declared.add(statement.name.value)
+
+                case cst.If():
+                    if (conditional := self._stub_if(statement, in_class)) is not None:
+                        stubbed.append(conditional)
+
+        return stubbed
+
+    def _stub_class(self, node: cst.ClassDef) -> cst.ClassDef:
+        body = self._stub_body(_block_statements(node.body), in_class=True)
+        return cst.ClassDef(
+            name=node.name,
+            body=cst.IndentedBlock(body=body) if body else _ELLIPSIS_SUITE,
+            bases=[_stub_arg(arg) for arg in node.bases],
+            keywords=[_stub_arg(arg) for arg in node.keywords],
+            decorators=[cst.Decorator(decorator=d.decorator) for d in node.decorators],
+        )
+
+    def _stub_if(self, node: cst.If, in_class: bool) -> cst.If | None:
+        body = self._stub_body(_block_statements(node.body), in_class)
+
+        orelse: cst.If | cst.Else | None = None
+        if isinstance(node.orelse, cst.If):
+            orelse = self._stub_if(node.orelse, in_class)
+        elif isinstance(node.orelse, cst.Else):
+            if else_body := self._stub_body(_block_statements(node.orelse.body), in_class):
+                orelse = cst.Else(body=cst.IndentedBlock(body=else_body))
+
+        if not body and orelse is None:
+            return None
+        return cst.If(
+            test=node.test,
+            body=cst.IndentedBlock(body=body) if body else _ELLIPSIS_SUITE,
+            orelse=orelse,
+        )
+
+
+def _block_statements(block: cst.BaseSuite) -> typing.Sequence[cst.BaseStatement]:
+    # Blocks on the same line as their header consist of small statements, as in `with lock: value = 1`
+    if isinstance(block, cst.SimpleStatementSuite):
+        return [cst.SimpleStatementLine(body=block.body)]
+    return typing.cast(cst.IndentedBlock, block).body
+
+
+def _lifted(statements: typing.Iterable[cst.BaseStatement]) -> typing.Iterator[cst.BaseStatement]:
+    """
+    Replace blocks whose declarations are unconditional in stubs by the statements of their bodies, recursively.
+
+    :param statements: The statements of a module's or class' body
+    :returns: The statements, where `if TYPE_CHECKING:`, `try`, `with`, `for` and `while` blocks are replaced
+        by the statements of all of their bodies, in order
+    """
+    for statement in statements:
+        blocks: list[cst.BaseSuite] = list()
+        match statement:
+            case cst.If() if _is_type_checking_guard(statement):
+                blocks.append(statement.body)
+            case cst.Try() | cst.TryStar():
+                blocks.append(statement.body)
+                blocks.extend(handler.body for handler in statement.handlers)
+                if statement.orelse is not None:
+                    blocks.append(statement.orelse.body)
+                if statement.finalbody is not None:
+                    blocks.append(statement.finalbody.body)
+            case cst.With():
+                blocks.append(statement.body)
+            case cst.For() | cst.While():
+                blocks.append(statement.body)
+                if statement.orelse is not None:
+                    blocks.append(statement.orelse.body)
+            case _:
+                yield statement
+                continue
+
+        for block in blocks:
+            yield from _lifted(_block_statements(block))
+
+
+def _without_type_checking_import(
+    node: cst.Import | cst.ImportFrom,
+) -> cst.Import | cst.ImportFrom | None:
+    # TYPE_CHECKING guards are lifted, so importing it is not needed anymore
+    if not (
+        isinstance(node, cst.ImportFrom)
+        and isinstance(node.module, cst.Name)
+        and node.module.value == "typing"
+        and not isinstance(node.names, cst.ImportStar)
+    ):
+        return node
+
+    names = [
+        alias.with_changes(comma=cst.MaybeSentinel.DEFAULT)
+        for alias in node.names
+        if not (isinstance(alias.name, cst.Name) and alias.name.value == "TYPE_CHECKING")
+    ]
+    if not names:
+        return None
+    return node.with_changes(names=names, lpar=None, rpar=None)
+
+
+def _statement_kind(statement: cst.BaseStatement) -> str:
+    match statement:
+        case cst.SimpleStatementLine(body=[cst.Import() | cst.ImportFrom()]):
+            return "import"
+        case cst.SimpleStatementLine():
+            return "variable"
+        case cst.FunctionDef():
+            return "function"
+        case cst.ClassDef():
+            return "class"
+        case _:
+            return "other"
+
+
+def _instance_attributes(method: cst.FunctionDef) -> dict[str, cst.Annotation | None]:
+    decorators = {d.decorator.value for d in method.decorators if isinstance(d.decorator, cst.Name)}
+    parameters = [*method.params.posonly_params, *method.params.params]
+    if not parameters or decorators & {"staticmethod", "classmethod"}:
+        return dict()
+
+    visitor = _InstanceAttributeVisitor(instance=parameters[0].name.value)
+    method.body.visit(visitor)
+    return visitor.attributes
+
+
+def _stub_function(node: cst.FunctionDef) -> cst.FunctionDef:
+    returns = node.returns
+    if returns is None:
+        visitor = _ReturnsNoneVisitor()
+        node.body.visit(visitor)
+        if visitor.returns_none:
+            returns = cst.Annotation(cst.Name("None"))
+
+    return cst.FunctionDef(
+        name=node.name,
+        params=_stub_parameters(node.params),
+        body=_ELLIPSIS_SUITE,
+        decorators=[cst.Decorator(decorator=d.decorator) for d in node.decorators],
+        returns=cst.Annotation(returns.annotation) if returns is not None else None,
+        asynchronous=cst.Asynchronous() if node.asynchronous is not None else None,
+    )
+
+
+def _stub_parameters(params: cst.Parameters) -> cst.Parameters:
+    star_arg: cst.Param | cst.ParamStar | cst.MaybeSentinel = cst.MaybeSentinel.DEFAULT
+    if isinstance(params.star_arg, cst.Param):
+        star_arg = _stub_param(params.star_arg)
+    elif isinstance(params.star_arg, cst.ParamStar):
+        star_arg = cst.ParamStar()
+
+    return cst.Parameters(
+        params=[_stub_param(param) for param in params.params],
+        star_arg=star_arg,
+        kwonly_params=[_stub_param(param) for param in params.kwonly_params],
+        star_kwarg=_stub_param(params.star_kwarg) if params.star_kwarg is not None else None,
+        posonly_params=[_stub_param(param) for param in params.posonly_params],
+        posonly_ind=cst.ParamSlash() if params.posonly_params else cst.MaybeSentinel.DEFAULT,
+    )
+
+
+def _stub_param(param: cst.Param) -> cst.Param:
+    # Default values are replaced by ellipses, as in stubs generated by mypy.stubgen
+    return cst.Param(
+        name=param.name,
+        annotation=cst.Annotation(param.annotation.annotation) if param.annotation is not None else None,
+        default=cst.Ellipsis() if param.default is not None else None,
+        equal=_TIGHT_EQUAL
+        if param.annotation is None and param.default is not None
+        else cst.MaybeSentinel.DEFAULT,
+        star=param.star,
+    )
+
+
+def _stub_arg(arg: cst.Arg) -> cst.Arg:
+    return cst.Arg(
+        value=arg.value,
+        keyword=arg.keyword,
+        equal=_TIGHT_EQUAL if arg.keyword is not None else cst.MaybeSentinel.DEFAULT,
+        star=arg.star,
+    )
+
+
 class StubFileGenerator(AnnotationGeneratorStrategy):
     """Generates stub files using mypy.stubgen."""
 
     ident = "stub"
 
     def transformers(self) -> typing.Iterator[cst.CSTTransformer]:
-        yield from (
-            self.provider(context=self.context, traced=self.traced),
-            AddImportTransformer(context=self.context, traced=self.traced),
-            MyPyHintTransformer(),
-            ImportUnionTransformer(),
+        # The stub is derived from the hinted module as a whole, but its unions are only found by traversing it
+        yield CompositeTransformer(
+            (
+                self.provider(context=self.context, traced=self.traced),
+                AddImportTransformer(context=self.context, traced=self.traced),
+                MyPyHintTransformer(),
+            )
+        )
+        yield ImportUnionTransformer()
+
+
+class CSTStubFileGenerator(AnnotationGeneratorStrategy):
+    """Generates stub files from the hinted CST directly, without running mypy.stubgen, see `CSTStubTransformer`."""
+
+    ident = "cst-stub"
+
+    def transformers(self) -> typing.Iterator[cst.CSTTransformer]:
+        # The stub is derived from the hinted module as a whole, but its unions are only found by traversing it
+        yield CompositeTransformer(
+            (
+                self.provider(context=self.context, traced=self.traced),
+                AddImportTransformer(context=self.context, traced=self.traced),
+                CSTStubTransformer(),
+            )
         )
+        yield ImportUnionTransformer()
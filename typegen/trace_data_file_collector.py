@@ -3,8 +3,10 @@ import pathlib
 
 import pandas as pd
 import constants
-from common import DataFileCollector
+from common import CompactTraceDataSchema, DataFileCollector, TraceDataCategory, read_trace_data
+from common.compact_schema import STRING_COLUMNS, is_compact
 from constants import Schema
+from typegen.trace_data_index import TraceDataIndex
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,11 +15,41 @@ logger = logging.getLogger(__name__)
 class TraceDataFileCollector(DataFileCollector):
     """Collects trace data files in a given path."""
 
-    def __init__(self):
-        """Creates an instance of TraceDataFileCollector."""
-        super().__init__(f"*{constants.TRACE_DATA_FILE_ENDING}")
-        self.trace_data = pd.DataFrame(columns=Schema.TraceData.keys())
-        self.trace_data = self.trace_data.astype(Schema.TraceData)
+    _DTYPES = pd.DataFrame(columns=Schema.TraceData.keys()).astype(Schema.TraceData).dtypes
+
+    def __init__(
+        self,
+        file_names: typing.Iterable[str] | None = None,
+        categories: typing.Iterable[TraceDataCategory] | None = None,
+        jobs: int = 1,
+        use_processes: bool = False,
+        incremental: bool = False,
+        compact_schema: CompactTraceDataSchema | None = None,
+    ):
+        """Creates an instance of TraceDataFileCollector.
+        :param file_names: If given, only trace data of these files is collected.
+        :param categories: If given, only trace data of these categories is collected.
+        :param jobs: The amount of workers that load files concurrently.
+        :param use_processes: Whether the workers are processes instead of threads.
+        :param incremental: Whether to keep an index of the collected files in the collected folder,
+        so that later collections only read files that are new or have changed, see `TraceDataIndex`.
+        :param compact_schema: If given, the collected trace data is stored with categorical string columns of this schema,
+        see `CompactTraceDataSchema`."""
+        super().__init__(f"*{constants.TRACE_DATA_FILE_ENDING}", jobs, use_processes)
+        self.file_names = list(file_names) if file_names is not None else None
+        self.categories = list(categories) if categories is not None else None
+        self.incremental = incremental
+        self.compact_schema = compact_schema
+        if self.compact_schema is not None:
+            self.trace_data = self.compact_schema.empty()
+        else:
+            self.trace_data = pd.DataFrame(columns=Schema.TraceData.keys())
+            self.trace_data = self.trace_data.astype(Schema.TraceData)
+
+    def __getstate__(self) -> dict[str, typing.Any]:
+        state = super().__getstate__()
+        state.pop("trace_data")
+        return state
 
     def collect_data(
         self, path: pathlib.Path, include_also_files_in_subdirectories: bool = True
@@ -25,17 +57,55 @@ class TraceDataFileCollector(DataFileCollector):
         """Collects the data in a given path.
         :param path: The path of the folder containing the files. 
         :param include_also_files_in_subdirectories: Whether the data files in the subfolders should also be collected."""
+        if self.incremental:
+            self.collected_data.clear()
+            index = TraceDataIndex(path / constants.TRACE_DATA_INDEX_FOLDER_NAME)
+            self.trace_data = index.update(
+                self._find_data_files(path, include_also_files_in_subdirectories),
+                load=lambda file_paths: self._load_files(file_paths, combine=False),
+                file_names=self.file_names,
+                categories=self.categories,
+            )
+            if self.compact_schema is not None:
+                self.trace_data = self.compact_schema.encode(self.trace_data)
+            return
+
         super().collect_data(path, include_also_files_in_subdirectories)
 
-        if len(self.collected_data) > 0:
+        if self.compact_schema is not None:
+            self.trace_data = self.compact_schema.concat(self.collected_data)
+        elif len(self.collected_data) > 0:
             self.trace_data = pd.concat(
                 self.collected_data, ignore_index=True, sort=False
             )
 
     def _on_potential_file_path_found(self, file_path: pathlib.Path) -> typing.Any:
-        potential_trace_data = pd.read_pickle(file_path)
-        if (self.trace_data.dtypes == potential_trace_data.dtypes).all():
+        # The index stores all trace data, and filters when it is read
+        if self.incremental:
+            potential_trace_data = read_trace_data(file_path)
+        else:
+            potential_trace_data = read_trace_data(
+                file_path,
+                file_names=self.file_names,
+                categories=self.categories,
+                compact=self.compact_schema is not None,
+            )
+        if self._has_valid_dtypes(potential_trace_data):
             return potential_trace_data
         else:
             logger.info(f"Invalid column types for file: {str(file_path)}")
             return None
+
+    def _has_valid_dtypes(self, trace_data: pd.DataFrame) -> bool:
+        if self.compact_schema is None or not is_compact(trace_data):
+            return (TraceDataFileCollector._DTYPES == trace_data.dtypes).all()
+
+        # The categories of compact trace data are only unified by the schema, once all files are collected
+        others = TraceDataFileCollector._DTYPES.drop(STRING_COLUMNS)
+        return (others == trace_data.dtypes[others.index]).all()
+
+    def _combine_batch(self, loaded: list[typing.Any]) -> list[typing.Any]:
+        # Concatenating categoricals with differing categories would turn them into plain objects
+        if len(loaded) <= 1 or self.compact_schema is not None:
+            return loaded
+        return [pd.concat(loaded, ignore_index=True, sort=False)]
@@ -0,0 +1,221 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import pathlib
+import typing
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from common import TraceDataCategory
+from common.trace_data_file import ARROW_SCHEMA, PANDAS_DTYPES
+from constants import Column, Schema
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class ManifestEntry:
+    """What is known about an ingested trace data file"""
+
+    size: int
+    """Size of the file in bytes"""
+
+    mtime_ns: int
+    """Modification time of the file in nanoseconds"""
+
+    digest: str
+    """Hash of the file's contents"""
+
+
+class TraceDataIndex:
+    """
+    Incrementally maintained copy of the trace data of a set of trace data files.
+
+    The index consists of a manifest, which records the size, modification time and content hash
+    of every file that has been ingested, and a store that holds the trace data of these files,
+    with each row tagged by the file it stems from.
+    When updating the index, only files that are new or whose contents have changed are read;
+    the trace data of files that no longer exist is removed from the store.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.json"
+    STORE_FILE_NAME = "store.parquet"
+
+    _MANIFEST_VERSION = 1
+
+    _SOURCE = "SourceFile"
+    _STORE_SCHEMA = ARROW_SCHEMA.append(pa.field(_SOURCE, pa.string()))
+
+    def __init__(self, folder: pathlib.Path):
+        """
+        :param folder: The folder the manifest and the store are kept in
+        """
+        self.folder = folder
+        self.manifest_path = folder / TraceDataIndex.MANIFEST_FILE_NAME
+        self.store_path = folder / TraceDataIndex.STORE_FILE_NAME
+
+    def update(
+        self,
+        file_paths: list[pathlib.Path],
+        load: typing.Callable[[list[pathlib.Path]], list[tuple[str, pd.DataFrame]]],
+        file_names: list[str] | None = None,
+        categories: list[TraceDataCategory] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Bring the index up to date with the given trace data files, and return their trace data.
+
+        :param file_paths: The trace data files that are to be indexed, sorted
+        :param load: Loads the given files, returning each valid file's path together with its trace data
+        :param file_names: If given, only trace data of these files is returned
+        :param categories: If given, only trace data of these categories is returned
+        :returns: The trace data of all files, in the order of the given paths, as if they were concatenated
+        """
+        manifest = self._read_manifest()
+        if manifest and not self._store_is_readable():
+            # The trace data of the files in the manifest has been lost, so all of them are read again
+            manifest = dict()
+
+        current: dict[str, ManifestEntry] = dict()
+        stale: list[pathlib.Path] = list()
+        for file_path in file_paths:
+            key = str(file_path)
+            stat = file_path.stat()
+            known = manifest.get(key)
+
+            if known is not None and (known.size, known.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                current[key] = known
+                continue
+
+            entry = ManifestEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, digest=_digest(file_path))
+            current[key] = entry
+            if known is None or known.digest != entry.digest:
+                stale.append(file_path)
+
+        removed = manifest.keys() - current.keys()
+        logger.info(
+            f"Trace data index: {len(current) - len(stale)} unchanged, "
+            f"{len(stale)} new or changed, {len(removed)} removed files"
+        )
+
+        if not stale and not removed and manifest:
+            if current != manifest:
+                self._write_manifest(current)
+            return self._read_store(file_names=file_names, categories=categories)
+
+        stale_keys = {str(file_path) for file_path in stale}
+        kept_keys = [key for key in current.keys() if key not in stale_keys and key in manifest]
+
+        frames = list()
+        if kept_keys:
+            frames.append(self._read_store(sources=kept_keys, with_source=True))
+        for source, trace_data in load(stale):
+            frames.append(trace_data.assign(**{TraceDataIndex._SOURCE: source}))
+
+        if frames:
+            merged = pd.concat(frames, ignore_index=True, sort=False)
+
+            # Restore the order of the given paths; rows of the same file keep their order
+            order = pd.Categorical(merged[TraceDataIndex._SOURCE], categories=list(current.keys())).codes
+            merged = merged.iloc[order.argsort(kind="stable")].reset_index(drop=True)
+        else:
+            merged = _empty_store()
+
+        self._write_store(merged)
+        self._write_manifest(current)
+
+        trace_data = merged.drop(columns=TraceDataIndex._SOURCE)
+        if file_names is not None or categories is not None:
+            mask = pd.Series(True, index=trace_data.index)
+            if file_names is not None:
+                mask &= trace_data[Column.FILENAME].isin(file_names)
+            if categories is not None:
+                mask &= trace_data[Column.CATEGORY].isin([int(category) for category in categories])
+            trace_data = trace_data[mask].reset_index(drop=True)
+        return trace_data
+
+    def _read_manifest(self) -> dict[str, ManifestEntry]:
+        if not self.manifest_path.exists():
+            return dict()
+
+        try:
+            contents = json.loads(self.manifest_path.read_text())
+            if contents["version"] != TraceDataIndex._MANIFEST_VERSION:
+                return dict()
+            return {key: ManifestEntry(**entry) for key, entry in contents["files"].items()}
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable trace data manifest {self.manifest_path}: {e}")
+            return dict()
+
+    def _write_manifest(self, manifest: dict[str, ManifestEntry]) -> None:
+        contents = {
+            "version": TraceDataIndex._MANIFEST_VERSION,
+            "files": {key: dataclasses.asdict(entry) for key, entry in manifest.items()},
+        }
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        partial_path = self.manifest_path.with_suffix(".partial")
+        partial_path.write_text(json.dumps(contents))
+        partial_path.replace(self.manifest_path)
+
+    def _store_is_readable(self) -> bool:
+        if not self.store_path.exists():
+            logger.warning(f"Trace data store {self.store_path} is missing, reading all trace data files again")
+            return False
+
+        try:
+            pq.read_schema(self.store_path)
+            return True
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Ignoring unreadable trace data store {self.store_path}: {e}")
+            return False
+
+    def _read_store(
+        self,
+        sources: list[str] | None = None,
+        file_names: list[str] | None = None,
+        categories: list[TraceDataCategory] | None = None,
+        with_source: bool = False,
+    ) -> pd.DataFrame:
+        filters: list[tuple[str, str, list]] = list()
+        if sources is not None:
+            filters.append((TraceDataIndex._SOURCE, "in", sources))
+        if file_names is not None:
+            filters.append((Column.FILENAME, "in", list(file_names)))
+        if categories is not None:
+            filters.append((Column.CATEGORY, "in", [int(category) for category in categories]))
+
+        columns = list(Schema.TraceData.keys())
+        if with_source:
+            columns.append(TraceDataIndex._SOURCE)
+
+        table = pq.read_table(
+            self.store_path,
+            columns=columns,
+            schema=TraceDataIndex._STORE_SCHEMA,
+            filters=filters or None,
+        )
+        return table.to_pandas(types_mapper=PANDAS_DTYPES.get, ignore_metadata=True)
+
+    def _write_store(self, store: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(store, schema=TraceDataIndex._STORE_SCHEMA, preserve_index=False)
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        partial_path = self.store_path.with_suffix(".partial")
+        pq.write_table(table, partial_path, compression="zstd", use_dictionary=True)
+        partial_path.replace(self.store_path)
+
+
+def _empty_store() -> pd.DataFrame:
+    store = pd.DataFrame(columns=Schema.TraceData.keys()).astype(Schema.TraceData)
+    return store.assign(**{TraceDataIndex._SOURCE: pd.Series(dtype=pd.StringDtype())})
+
+
+def _digest(file_path: pathlib.Path) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    with file_path.open("rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
@@ -0,0 +1,47 @@
+import pathlib
+
+import pandas as pd
+
+from common.trace_data_file import TraceDataWriter, read_trace_data
+from constants import Column
+
+
+class TraceDataPartitionFile:
+    """
+    Trace data that is partitioned by the file it was traced in, and stored in a trace data file
+    with one row group per partition.
+
+    Codemods that are run by multiple processes are pickled for every file they transform.
+    Instances only consist of the path to the trace data file, and are therefore cheap to send to worker processes,
+    which read the rows of the file they transform, while the row groups of all other files are skipped, see `read_trace_data`.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        """
+        :param path: Path to a trace data file written by `write`
+        """
+        self.path = path
+
+    @staticmethod
+    def write(path: pathlib.Path, trace_data: pd.DataFrame) -> "TraceDataPartitionFile":
+        """
+        Partition trace data by `Column.FILENAME` and store it.
+
+        :param path: Path to the trace data file; it is created, or truncated if it exists
+        :param trace_data: Trace data adhering to `Schema.TraceData`
+        :returns: The stored partitions
+        """
+        writer = TraceDataWriter(path)
+        try:
+            for _, partition in trace_data.groupby(Column.FILENAME, sort=False, dropna=True):
+                writer.write(partition)
+        finally:
+            writer.close()
+        return TraceDataPartitionFile(path)
+
+    def partition(self, file_name: str) -> pd.DataFrame:
+        """
+        :param file_name: The file to retrieve the trace data of, as stored in `Column.FILENAME`
+        :returns: The trace data of the given file, in the order it was written in
+        """
+        return read_trace_data(self.path, file_names=[file_name])
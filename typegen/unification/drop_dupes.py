@@ -1,15 +1,12 @@
-import pandas as pd
+from .filter_base import GroupedTraceDataFilter
+from .grouped_trace_data import ALL_COLUMNS, GroupedTraceData, first_of_groups
 
-from .filter_base import TraceDataFilter
 
-from constants import Schema
-
-
-class DropDuplicatesFilter(TraceDataFilter):
+class DropDuplicatesFilter(GroupedTraceDataFilter):
     """Drops all duplicates in the trace data."""
 
     ident = "dedup"
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
-        processed_trace_data = trace_data.drop_duplicates(ignore_index=True)
-        return processed_trace_data.reset_index(drop=True).astype(Schema.TraceData)
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        trace_data.take(first_of_groups(trace_data.group_ids(ALL_COLUMNS)))
+        trace_data.reset_index()
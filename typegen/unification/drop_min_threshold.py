@@ -1,53 +1,42 @@
+import numpy as np
 import pandas as pd
 
-from .filter_base import TraceDataFilter
+from .filter_base import GroupedTraceDataFilter
+from .grouped_trace_data import (
+    ALL_COLUMNS,
+    VARIABLE_COLUMNS,
+    GroupedTraceData,
+    ordered_by_group,
+)
 
-from constants import Column, Schema
+from constants import Column
 
 
-class MinThresholdFilter(TraceDataFilter):
+class MinThresholdFilter(GroupedTraceDataFilter):
     """Drops all rows whose types appear less often than the minimum threshold."""
 
-    COUNT_COLUMN = "count"
-    MAX_COUNT_COLUMN = "max_count"
-
     ident = "drop_min_threshold"
 
     min_threshold: float = 0.25
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
-        subset = list(Schema.TraceData.keys())
-        grouped_trace_data = (
-            trace_data.groupby(subset, dropna=False)[Column.VARTYPE]
-            .count()
-            .reset_index(name=MinThresholdFilter.COUNT_COLUMN)
-        )
-        joined_trace_data = pd.merge(
-            trace_data, grouped_trace_data, on=subset, how="inner"
-        )
-        subset.remove(Column.VARTYPE_MODULE)
-        subset.remove(Column.VARTYPE)
-
-        grouped_trace_data = (
-            joined_trace_data.groupby(subset, dropna=False)[
-                MinThresholdFilter.COUNT_COLUMN
-            ]
-            .max()
-            .reset_index(name=MinThresholdFilter.MAX_COUNT_COLUMN)
-        )
-
-        joined_trace_data = pd.merge(
-            joined_trace_data, grouped_trace_data, on=subset, how="inner"
-        )
-
-        indices = (
-            joined_trace_data[MinThresholdFilter.COUNT_COLUMN]
-            / joined_trace_data[MinThresholdFilter.MAX_COUNT_COLUMN]
-            > self.min_threshold
-        )
-        processed_data = joined_trace_data[indices]
-        processed_data = processed_data.drop(
-            [MinThresholdFilter.COUNT_COLUMN, MinThresholdFilter.MAX_COUNT_COLUMN],
-            axis=1,
-        )
-        return processed_data.reset_index(drop=True).astype(Schema.TraceData)
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        # How often each row occurs; rows with a missing type are not counted
+        row_ids = trace_data.group_ids(ALL_COLUMNS)
+        typed = ~np.asarray(pd.isna(trace_data.column(Column.VARTYPE)), dtype=bool)
+        counts = np.bincount(row_ids[typed], minlength=row_ids.max(initial=-1) + 1)[row_ids]
+
+        # How often the most common type of each variable occurs
+        variable_ids = trace_data.group_ids(VARIABLE_COLUMNS)
+        max_counts = np.zeros(variable_ids.max(initial=-1) + 1, dtype=counts.dtype)
+        np.maximum.at(max_counts, variable_ids, counts)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kept = counts / max_counts[variable_ids] > self.min_threshold
+
+        # Rows are arranged as joining them with their counts does:
+        # group by group of equal rows, and then group by group of the same variable
+        by_rows = ordered_by_group(row_ids)
+        by_variables = by_rows[ordered_by_group(pd.factorize(variable_ids[by_rows])[0])]
+
+        trace_data.take(by_variables[kept[by_variables]])
+        trace_data.reset_index()
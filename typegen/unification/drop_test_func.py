@@ -1,26 +1,31 @@
 from re import Pattern
 
+import numpy as np
 import pandas as pd
 
-from .filter_base import TraceDataFilter
+from .filter_base import GroupedTraceDataFilter
+from .grouped_trace_data import GroupedTraceData, first_of_groups
 
-from constants import Column, Schema
+from constants import Column
 
 
-class DropTestFunctionDataFilter(TraceDataFilter):
+class DropTestFunctionDataFilter(GroupedTraceDataFilter):
     """Drops all data about test functions."""
 
     ident = "drop_test"
 
     test_name_pat: Pattern[str] | None = None
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
         if self.test_name_pat is None:
             raise AttributeError(
                 f"{DropTestFunctionDataFilter.__name__} was not initialised properly: {self.test_name_pat=}"
             )
 
-        processed_trace_data = trace_data[
-            ~trace_data[Column.FUNCNAME].str.match(self.test_name_pat, na=False)
-        ]
-        return processed_trace_data.astype(Schema.TraceData)
+        # Function names repeat, so only match each distinct one
+        function_ids = trace_data.group_ids({Column.FUNCNAME})
+        function_names = trace_data.column(Column.FUNCNAME).take(
+            np.flatnonzero(first_of_groups(function_ids))
+        )
+        is_test_function = pd.Series(function_names).str.match(self.test_name_pat, na=False)
+        trace_data.take(~is_test_function.to_numpy(dtype=bool)[function_ids])
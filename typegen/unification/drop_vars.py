@@ -1,32 +1,31 @@
+import numpy as np
 import pandas as pd
 
-from .filter_base import TraceDataFilter
+from .filter_base import GroupedTraceDataFilter
+from .grouped_trace_data import ALL_COLUMNS, GroupedTraceData, ordered_by_group
 
-from constants import Column, Schema
+from constants import Column
 
 
-class DropVariablesOfMultipleTypesFilter(TraceDataFilter):
+class DropVariablesOfMultipleTypesFilter(GroupedTraceDataFilter):
     """Drops rows containing variables the amount of the corresponding types is higher or equal than the specified min amount."""
 
     ident = "drop_mult_var"
 
     min_amount_types_to_drop: int = 2
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
-        subset = list(Schema.TraceData.keys())
-        subset.remove(Column.VARTYPE)
-        grouped_trace_data_with_unique_count = (
-            trace_data.groupby(subset, dropna=False)[Column.VARTYPE]
-            .nunique()
-            .reset_index(name="amount_types")
-        )
-        joined_trace_data = pd.merge(
-            trace_data, grouped_trace_data_with_unique_count, on=subset, how="inner"
-        )
-        trace_data_with_dropped_variables = joined_trace_data[
-            joined_trace_data["amount_types"] < self.min_amount_types_to_drop
-        ]
-        processed_data = trace_data_with_dropped_variables.drop(
-            ["amount_types"], axis=1
-        )
-        return processed_data.reset_index(drop=True).astype(Schema.TraceData)
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        group_ids = trace_data.group_ids(ALL_COLUMNS - {Column.VARTYPE})
+
+        # Count the distinct types of each group; missing types are not counted
+        vartypes = trace_data.column(Column.VARTYPE)
+        typed = ~np.asarray(pd.isna(vartypes), dtype=bool)
+        distinct = pd.DataFrame(
+            {"group": group_ids[typed], "type": trace_data.group_ids({Column.VARTYPE})[typed]}
+        ).drop_duplicates()
+        amount_types = np.bincount(distinct["group"], minlength=group_ids.max(initial=-1) + 1)
+
+        # Rows are arranged group by group, as joining them with their amount of types does
+        order = ordered_by_group(group_ids)
+        trace_data.take(order[amount_types[group_ids[order]] < self.min_amount_types_to_drop])
+        trace_data.reset_index()
@@ -4,6 +4,8 @@ import typing
 
 import pandas as pd
 
+from .grouped_trace_data import GroupedTraceData
+
 
 class TraceDataFilter(abc.ABC):
     """Base class for different trace data filters.
@@ -15,7 +17,9 @@ class TraceDataFilter(abc.ABC):
     @classmethod
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        TraceDataFilter._REGISTRY[cls.ident] = cls
+        # Intermediate base classes do not declare an identifier
+        if "ident" in cls.__dict__:
+            TraceDataFilter._REGISTRY[cls.ident] = cls
 
     def __new__(
         cls: typing.Type["TraceDataFilter"], /, ident: str, **kwargs
@@ -41,6 +45,15 @@ class TraceDataFilter(abc.ABC):
         """
         pass
 
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        """
+        Processes the provided trace data in place, as part of a sequence of filters.
+        Unless overridden, the trace data is converted into a `pd.DataFrame` to be processed by `apply`.
+
+        :param trace_data: The provided trace data to process.
+        """
+        trace_data.replace(self.apply(trace_data.to_frame()))
+
     @property
     @abc.abstractmethod
     def ident(self): 
@@ -49,7 +62,23 @@ class TraceDataFilter(abc.ABC):
         pass
 
 
-class TraceDataFilterList(TraceDataFilter):
+class GroupedTraceDataFilter(TraceDataFilter):
+    """Base class for filters that process `GroupedTraceData`.
+
+    When applied in sequence, such filters share their groupings of the trace data,
+    and the trace data is only converted into a `pd.DataFrame` once all of them have been applied."""
+
+    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
+        grouped = GroupedTraceData(trace_data)
+        self.apply_grouped(grouped)
+        return grouped.to_frame()
+
+    @abc.abstractmethod
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        pass
+
+
+class TraceDataFilterList(GroupedTraceDataFilter):
     """Applies the filters in this list on the trace data in the order they were appended"""
 
     ident = "list"
@@ -67,6 +96,11 @@ class TraceDataFilterList(TraceDataFilter):
         :param trace_data: The provided trace data to process.
         :returns: The processed trace data.
         """
+        grouped = GroupedTraceData(trace_data)
+        self.apply_grouped(grouped)
+        grouped.reset_index()
+        return grouped.to_frame()
+
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
         for trace_data_filter in self.filters:
-            trace_data = trace_data_filter.apply(trace_data)
-        return trace_data.reset_index(drop=True)
+            trace_data_filter.apply_grouped(trace_data)
@@ -0,0 +1,180 @@
+import typing
+
+import numpy as np
+import pandas as pd
+
+from common.compact_schema import is_compact
+from constants import Column, Schema
+
+
+ALL_COLUMNS: frozenset[str] = frozenset(Schema.TraceData.keys())
+"""Every column of the trace data; rows that agree on these are duplicates"""
+
+VARIABLE_COLUMNS: frozenset[str] = ALL_COLUMNS - {Column.VARTYPE_MODULE, Column.VARTYPE}
+"""Columns that identify a variable within a file"""
+
+UNIFICATION_COLUMNS: frozenset[str] = VARIABLE_COLUMNS - {Column.FILENAME}
+"""Columns that identify a variable independently of the file it was traced in, as used by unifiers"""
+
+
+class GroupedTraceData:
+    """
+    Trace data that a sequence of filters is applied to, see `TraceDataFilterList`.
+
+    Filters only ever drop or reorder rows, or replace the values of the type columns.
+    Hence, the group numbers of a set of key columns remain valid while rows are dropped,
+    and are computed at most once per set of key columns for the entire sequence of filters,
+    instead of once per filter that groups by them.
+    Group numbers of sets of columns are derived from the group numbers of the individual columns,
+    and of the largest set of key columns they contain; those of a replaced column are recomputed.
+
+    The trace data is only converted into a `pd.DataFrame` adhering to `Schema.TraceData` once,
+    when all filters have been applied, see `to_frame`.
+    Compact trace data keeps its categorical string columns, see `CompactTraceDataSchema`.
+    """
+
+    def __init__(self, trace_data: pd.DataFrame):
+        """
+        :param trace_data: The trace data to process
+        """
+        self.replace(trace_data)
+
+    def replace(self, trace_data: pd.DataFrame) -> None:
+        """
+        Replace the trace data entirely, discarding all group numbers.
+
+        :param trace_data: The trace data to process from now on
+        """
+        columns = list(Schema.TraceData.keys())
+        if list(trace_data.columns) != columns:
+            trace_data = pd.DataFrame(trace_data, columns=columns)
+
+        dtypes = Schema.TraceData
+        if is_compact(trace_data):
+            dtypes = {
+                column: trace_data[column].dtype
+                if isinstance(trace_data[column].dtype, pd.CategoricalDtype)
+                else dtype
+                for column, dtype in Schema.TraceData.items()
+            }
+        if not trace_data.dtypes.eq(pd.Series(dtypes)).all():
+            trace_data = trace_data.astype(dtypes)
+
+        self._columns: dict[str, pd.api.extensions.ExtensionArray] = {
+            column: trace_data[column].array for column in columns
+        }
+        self._index: pd.Index | None = trace_data.index
+        self._group_ids: dict[frozenset[str], np.ndarray] = dict()
+
+    def __len__(self) -> int:
+        return len(self._columns[Column.FILENAME])
+
+    def column(self, column: str) -> pd.api.extensions.ExtensionArray:
+        """
+        :param column: Name of the column
+        :returns: The values of the column, in the order of the rows
+        """
+        return self._columns[column]
+
+    def group_ids(self, keys: typing.AbstractSet[str]) -> np.ndarray:
+        """
+        Group the rows by the given key columns, treating missing values as equal.
+
+        :param keys: The key columns to group by
+        :returns: The group number of each row; groups are numbered in the order of their first occurrence
+        """
+        keys = frozenset(keys)
+        group_ids = self._group_ids.get(keys)
+        if group_ids is None:
+            group_ids = self._compute_group_ids(keys)
+            self._group_ids[keys] = group_ids
+        return group_ids
+
+    def take(self, indexer: np.ndarray) -> None:
+        """
+        Keep only the selected rows, in the given order.
+
+        :param indexer: Boolean mask or positions of the rows to keep
+        """
+        if indexer.dtype == bool:
+            indexer = np.flatnonzero(indexer)
+
+        self._columns = {column: values.take(indexer) for column, values in self._columns.items()}
+        if self._index is not None:
+            self._index = self._index.take(indexer)
+
+        # Keep the groups, but renumber them in order of their first occurrence among the remaining rows
+        self._group_ids = {
+            keys: pd.factorize(group_ids.take(indexer))[0] for keys, group_ids in self._group_ids.items()
+        }
+
+    def assign(self, column: str, values: typing.Any) -> None:
+        """
+        Replace the values of a column; group numbers of key columns including it are discarded.
+
+        :param column: Name of the column
+        :param values: The new values, in the order of the rows
+        """
+        current = self._columns[column]
+        if isinstance(current.dtype, pd.CategoricalDtype):
+            # Keep the column compact, adding the new values to its categories
+            values = pd.array(values, dtype=Schema.TraceData[column])
+            encountered = pd.Index(pd.unique(values[~values.isna()]), dtype=object)
+            categories = current.categories.append(encountered[~encountered.isin(current.categories)])
+            self._columns[column] = pd.Categorical(values, categories=categories)
+        else:
+            self._columns[column] = pd.array(values, dtype=Schema.TraceData[column])
+        self._group_ids = {
+            keys: group_ids for keys, group_ids in self._group_ids.items() if column not in keys
+        }
+
+    def reset_index(self) -> None:
+        """Number the rows consecutively when converted into a `pd.DataFrame`"""
+        self._index = None
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        :returns: The trace data, adhering to `Schema.TraceData`, or compact if it was given compact
+        """
+        index = self._index if self._index is not None else pd.RangeIndex(len(self))
+        return pd.DataFrame(self._columns, index=index, copy=False)
+
+    def _compute_group_ids(self, keys: frozenset[str]) -> np.ndarray:
+        if len(keys) == 1:
+            (column,) = keys
+            return pd.factorize(self._columns[column], use_na_sentinel=False)[0]
+
+        # Start from the group numbers of the largest set of contained key columns that is known,
+        # and refine them by the group numbers of each remaining column, which are cheap to combine
+        contained = [known for known in self._group_ids.keys() if known < keys]
+        if contained:
+            largest = max(contained, key=len)
+            group_ids = self._group_ids[largest]
+            remaining = sorted(keys - largest)
+        else:
+            first, *remaining = sorted(keys)
+            group_ids = self.group_ids({first})
+
+        for column in remaining:
+            column_ids = self.group_ids({column})
+            combined = group_ids.astype(np.int64) * (column_ids.max(initial=0) + 1) + column_ids
+            group_ids = pd.factorize(combined)[0]
+        return group_ids
+
+
+def first_of_groups(group_ids: np.ndarray) -> np.ndarray:
+    """
+    :param group_ids: Group number of each row
+    :returns: Mask of the first row of each group
+    """
+    first = np.zeros(len(group_ids), dtype=bool)
+    first[np.unique(group_ids, return_index=True)[1]] = True
+    return first
+
+
+def ordered_by_group(group_ids: np.ndarray) -> np.ndarray:
+    """
+    :param group_ids: Group number of each row, numbered in order of first occurrence
+    :returns: Positions of the rows, arranged group by group; rows of a group remain in their order
+    """
+    return np.argsort(group_ids, kind="stable")
@@ -1,20 +1,12 @@
-import pandas as pd
+from .filter_base import GroupedTraceDataFilter
+from .grouped_trace_data import VARIABLE_COLUMNS, GroupedTraceData, first_of_groups
 
-from .filter_base import TraceDataFilter
 
-from constants import Column, Schema
-
-
-class KeepOnlyFirstFilter(TraceDataFilter):
+class KeepOnlyFirstFilter(GroupedTraceDataFilter):
     """Keeps only the first row of each variable."""
 
     ident = "keep_only_first"
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
-        subset = list(Schema.TraceData.keys())
-        subset.remove(Column.VARTYPE_MODULE)
-        subset.remove(Column.VARTYPE)
-
-        grouped_data = trace_data.groupby(subset, as_index=False, dropna=False)
-        processed_data = grouped_data.nth(0)
-        return processed_data.reset_index(drop=True).astype(Schema.TraceData)
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        trace_data.take(first_of_groups(trace_data.group_ids(VARIABLE_COLUMNS)))
+        trace_data.reset_index()
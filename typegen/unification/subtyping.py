@@ -1,20 +1,29 @@
 import logging
+import numpy as np
 import pandas as pd
 import pathlib
 
 from common.resolver import Resolver
 
-from .filter_base import TraceDataFilter
-from constants import Column, Schema
+from .filter_base import GroupedTraceDataFilter
+from .grouped_trace_data import (
+    ALL_COLUMNS,
+    UNIFICATION_COLUMNS,
+    GroupedTraceData,
+    first_of_groups,
+    ordered_by_group,
+)
+from constants import Column
 
 logger = logging.getLogger(__name__)
 
 
-def _none_if_builtin(module: str) -> str | None:
-    return module if module != "builtins" else None
+def _traced_values(trace_data: GroupedTraceData, column: str) -> set[str | None]:
+    # Missing values, i.e. the modules of builtins, are represented by None
+    return {None if pd.isna(value) else value for value in pd.unique(trace_data.column(column))}
 
 
-class UnifySubTypesFilter(TraceDataFilter):
+class UnifySubTypesFilter(GroupedTraceDataFilter):
     """Unify rows containing types in the data with their common base type."""
 
     ident = "unify_subty"
@@ -23,75 +32,98 @@ class UnifySubTypesFilter(TraceDataFilter):
     proj_path: pathlib.Path
     venv_path: pathlib.Path
     only_unify_if_base_was_traced: bool = False
+    mro_cache_path: pathlib.Path | None = None
 
     _UNDESIRABLE_MODULES = ("abc",)
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
-        self._resolver = Resolver(self.stdlib_path, self.proj_path, self.venv_path)
-
-        grouped_trace_data = trace_data.groupby(
-            by=[
-                Column.CLASS_MODULE,
-                Column.CLASS,
-                Column.FUNCNAME,
-                Column.LINENO,
-                Column.CATEGORY,
-                Column.VARNAME,
-            ],
-            dropna=False,
-            sort=False,
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        self._resolver = Resolver(
+            self.stdlib_path, self.proj_path, self.venv_path, mro_cache_path=self.mro_cache_path
         )
 
-        unified = [
-            self._update_group(trace_data, group).drop_duplicates()
-            for _, group in grouped_trace_data
-        ]
-
-        processed_trace_data = pd.concat(unified)
-
-        restored = pd.DataFrame(
-            processed_trace_data.reset_index(drop=True),
-            columns=list(Schema.TraceData.keys()),
-        ).astype(Schema.TraceData)
-        return restored
-
-    def _update_group(self, entire: pd.DataFrame, group):
-        modules_with_types_in_group = group[
-            [
-                Column.FILENAME,
-                Column.VARTYPE_MODULE,
-                Column.VARTYPE,
-            ]
-        ]
-        common = self._get_common_base_type(modules_with_types_in_group)
+        groups = trace_data.group_ids(UNIFICATION_COLUMNS)
+        if self.only_unify_if_base_was_traced:
+            self._traced_modules = _traced_values(trace_data, Column.VARTYPE_MODULE)
+            self._traced_types = _traced_values(trace_data, Column.VARTYPE)
+
+        # The common base type only depends on the distinct types of a group, in order of their occurrence,
+        # so it is determined once per distinct sequence of types instead of once per group
+        vartype_modules = trace_data.column(Column.VARTYPE_MODULE)
+        distinct = pd.DataFrame(
+            {
+                "group": groups,
+                Column.VARTYPE_MODULE: pd.Series(vartype_modules).astype(object).where(
+                    ~np.asarray(pd.isna(vartype_modules), dtype=bool), None
+                ),
+                Column.VARTYPE: pd.Series(trace_data.column(Column.VARTYPE)).astype(object),
+            }
+        ).drop_duplicates()
+
+        types_of_groups: dict[int, list[tuple[str | None, str]]] = dict()
+        for group, module, vartype in zip(
+            distinct["group"], distinct[Column.VARTYPE_MODULE], distinct[Column.VARTYPE]
+        ):
+            types_of_groups.setdefault(group, list()).append((module, vartype))
+
+        common_of_types: dict[tuple[tuple[str | None, str], ...], tuple[str | None, str] | None] = dict()
+        common_of_groups: dict[int, tuple[str | None, str]] = dict()
+        for group, types in types_of_groups.items():
+            key = tuple(types)
+            if key not in common_of_types:
+                common_of_types[key] = self._get_unifying_base_type(types)
+
+            common = common_of_types[key]
+            if common is not None:
+                common_of_groups[group] = common
+
+        logger.debug(
+            f"Unified {len(common_of_groups)} of {len(types_of_groups)} groups "
+            f"from {len(common_of_types)} distinct sets of types"
+        )
+
+        # Every row of a group takes on the common base type
+        if common_of_groups:
+            unified = pd.Series(groups).isin(common_of_groups.keys()).to_numpy()
+            bases = [common_of_groups[group] for group in groups[unified]]
+
+            for column, position in ((Column.VARTYPE_MODULE, 0), (Column.VARTYPE, 1)):
+                values = trace_data.column(column).to_numpy(dtype=object, copy=True)
+                values[unified] = [base[position] for base in bases]
+                trace_data.assign(column, values)
+
+        # Arrange the rows group by group, in order of the groups' first occurrence;
+        # rows of a group that have become identical are only kept once.
+        # Rows of different groups always differ, so deduplicating all rows at once suffices
+        trace_data.take(ordered_by_group(groups))
+        trace_data.take(first_of_groups(trace_data.group_ids(ALL_COLUMNS)))
+        trace_data.reset_index()
+
+        self._resolver.save_mro_cache()
+
+    def _get_unifying_base_type(
+        self, modules_with_types: list[tuple[str | None, str]]
+    ) -> tuple[str | None, str] | None:
+        common = self._get_common_base_type(modules_with_types)
         if common is None:
-            return group
+            return None
 
         basetype_module, basetype = common
         if self.only_unify_if_base_was_traced:
-            if basetype_module not in entire[Column.VARTYPE_MODULE].values:
+            if basetype_module not in self._traced_modules:
                 logger.debug(f"Discarding {common}; module was not found in trace data")
-                return group
+                return None
 
-            if basetype not in entire[Column.VARTYPE].values:
+            if basetype not in self._traced_types:
                 logger.debug(f"Discarding {common}; type was not found in trace data")
-                return group
-
-        updated_group = group.copy()
+                return None
 
-        updated_group[Column.VARTYPE_MODULE] = basetype_module
-        updated_group[Column.VARTYPE] = basetype
-        return updated_group
+        return common
 
     def _get_common_base_type(
-        self, modules_with_types: pd.DataFrame
+        self, modules_with_types: list[tuple[str | None, str]]
     ) -> tuple[str | None, str] | None:
         type2bases = {}
-        for _, row in modules_with_types.iterrows():
-            varmodule, vartyp = (
-                row[Column.VARTYPE_MODULE],
-                row[Column.VARTYPE],
-            )
+        for varmodule, vartyp in modules_with_types:
             types_topologically_sorted = self._get_type_and_mro(varmodule, vartyp)
 
             # drop base types which are considered too common (ABC, ABCMeta, object)
@@ -131,14 +163,9 @@ class UnifySubTypesFilter(TraceDataFilter):
     def _get_type_and_mro(
         self, module_name: str | None, type_name: str
     ) -> list[tuple[str | None, str]]:
-        variable_type = self._resolver.type_lookup(module_name, type_name)
-        if variable_type is None:
+        module_and_name = self._resolver.mro_lookup(module_name, type_name)
+        if module_and_name is None:
             raise ImportError(
                 f"Failed to import {module_name}.{type_name} from {self.stdlib_path}, {self.venv_path}, {self.proj_path}"
             )
-        mros = variable_type.mro()
-
-        module_and_name = list()
-        for m in mros:
-            module_and_name.append((_none_if_builtin(m.__module__), m.__name__))
         return module_and_name
@@ -1,59 +1,62 @@
 import logging
-from typegen.unification.filter_base import TraceDataFilter
 
+import numpy as np
 import pandas as pd
 
-from constants import Column, Schema
+from typegen.unification.filter_base import GroupedTraceDataFilter
+from typegen.unification.grouped_trace_data import (
+    ALL_COLUMNS,
+    UNIFICATION_COLUMNS,
+    GroupedTraceData,
+    first_of_groups,
+    ordered_by_group,
+)
+
+from constants import Column
 
 
 logger = logging.getLogger(__name__)
 
 
-class UnionFilter(TraceDataFilter):
+class UnionFilter(GroupedTraceDataFilter):
     """Unify rows containing types in the data with the union of these types."""
 
     ident = "union"
 
-    def apply(self, trace_data: pd.DataFrame) -> pd.DataFrame:
-        grouped = trace_data.groupby(
-            by=[
-                Column.CLASS_MODULE,
-                Column.CLASS,
-                Column.FUNCNAME,
-                Column.LINENO,
-                Column.CATEGORY,
-                Column.VARNAME,
-            ],
-            dropna=False,
-            group_keys=False,
-            sort=False,
+    def apply_grouped(self, trace_data: GroupedTraceData) -> None:
+        groups = pd.Series(trace_data.group_ids(UNIFICATION_COLUMNS))
+
+        # Groups consisting of one row have no union to build and remain unchanged
+        in_union = groups.duplicated(keep=False).to_numpy()
+        logger.debug(
+            f"Building unions for {groups[in_union].nunique()} of {groups.nunique()} groups"
         )
 
-        # Update group changes the values of every element in the group; only keep the first occurrence
-        unions = [self._update_group(group).drop_duplicates() for _, group in grouped]
-        processed_trace_data = pd.concat(unions)
-
-        restored = pd.DataFrame(
-            processed_trace_data.reset_index(drop=True),
-            columns=list(Schema.TraceData.keys()),
-        ).astype(Schema.TraceData)
-        return restored
-
-    def _update_group(self, group):
-        if group.shape[0] == 1:
-            module = group[Column.VARTYPE_MODULE].values[0]
-            vartype = group[Column.VARTYPE].values[0]
-            logger.debug(
-                f"No union to build from module {module}, type {vartype}: Only one value in this group"
+        if in_union.any():
+            union_groups = groups[in_union]
+            modules = (
+                pd.Series(trace_data.column(Column.VARTYPE_MODULE)[in_union], index=union_groups.index)
+                .astype(object)
+                .fillna("")
+                .groupby(union_groups, sort=False)
+                .agg(",".join)
+            )
+            vartypes = (
+                pd.Series(trace_data.column(Column.VARTYPE)[in_union], index=union_groups.index)
+                .astype(object)
+                .groupby(union_groups, sort=False)
+                .agg(" | ".join)
             )
-            return group
-
-        new_module = ",".join(group[Column.VARTYPE_MODULE].fillna(""))
-        new_type = " | ".join(group[Column.VARTYPE])
-
-        updated_group = group.copy()
-
-        updated_group[Column.VARTYPE_MODULE] = new_module
-        updated_group[Column.VARTYPE] = new_type
 
-        return updated_group
+            # Every row of a group takes on the union, joined in the order of the rows
+            for column, unions in ((Column.VARTYPE_MODULE, modules), (Column.VARTYPE, vartypes)):
+                values = trace_data.column(column).to_numpy(dtype=object, copy=True)
+                values[in_union] = unions.reindex(union_groups).to_numpy()
+                trace_data.assign(column, values)
+
+        # Arrange the rows group by group, in order of the groups' first occurrence;
+        # rows of a group that have become identical are only kept once.
+        # Rows of different groups always differ, so deduplicating all rows at once suffices
+        trace_data.take(ordered_by_group(groups.to_numpy()))
+        trace_data.take(first_of_groups(trace_data.group_ids(ALL_COLUMNS)))
+        trace_data.reset_index()